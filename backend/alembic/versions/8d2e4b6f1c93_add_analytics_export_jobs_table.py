@@ -0,0 +1,55 @@
+"""add_analytics_export_jobs_table
+
+Revision ID: 8d2e4b6f1c93
+Revises: 466c379e2453
+Create Date: 2026-10-19 10:02:17.551930
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2e4b6f1c93"
+down_revision: Union[str, None] = "466c379e2453"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analytics_export_jobs",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("operator_id", sa.Integer(), nullable=False),
+        sa.Column("requested_by_user_id", sa.Integer(), nullable=True),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("file_path", sa.String(), nullable=True),
+        sa.Column("row_counts", sa.JSON(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.CheckConstraint(
+            "status IN ('pending','running','succeeded','failed')",
+            name="ck_analytics_export_jobs_status",
+        ),
+        sa.CheckConstraint("end_date >= start_date", name="ck_analytics_export_jobs_date_range"),
+        sa.ForeignKeyConstraint(["operator_id"], ["operators.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["requested_by_user_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_analytics_export_jobs_operator_id"),
+        "analytics_export_jobs",
+        ["operator_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_analytics_export_jobs_operator_id"), table_name="analytics_export_jobs")
+    op.drop_table("analytics_export_jobs")
@@ -0,0 +1,57 @@
+"""add_dashboard_notify_triggers
+
+Revision ID: b8e2f05d7c19
+Revises: a7d3e9c41b05
+Create Date: 2026-10-19 21:05:44.381902
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e2f05d7c19"
+down_revision: Union[str, None] = "a7d3e9c41b05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NOTIFY pacectrl_dashboard with {"operator_id", "voyage_id", "event"}; the event
+    # name is the trigger argument. Postgres delivers identical payloads sent in one
+    # transaction only once, so bulk writes notify once per voyage, not per row.
+    # choice_intents gets no trigger (widget traffic should not pay for it); open
+    # dashboard streams poll it by created_at instead.
+    op.execute(
+        """
+        CREATE FUNCTION notify_dashboard_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify(
+                'pacectrl_dashboard',
+                json_build_object(
+                    'operator_id', (SELECT operator_id FROM voyages WHERE id = NEW.voyage_id),
+                    'voyage_id', NEW.voyage_id,
+                    'event', TG_ARGV[0]
+                )::text
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_confirmed_choices_created_notify
+        AFTER INSERT ON confirmed_choices
+        FOR EACH ROW EXECUTE FUNCTION notify_dashboard_change('choice_confirmed')
+        """
+    )
+    op.create_index("ix_choice_intents_created_at", "choice_intents", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_choice_intents_created_at", table_name="choice_intents")
+    op.execute("DROP TRIGGER IF EXISTS trg_confirmed_choices_created_notify ON confirmed_choices")
+    op.execute("DROP FUNCTION IF EXISTS notify_dashboard_change()")
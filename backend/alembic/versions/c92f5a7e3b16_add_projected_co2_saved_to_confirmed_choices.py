@@ -0,0 +1,53 @@
+"""add_projected_co2_saved_to_confirmed_choices
+
+Revision ID: c92f5a7e3b16
+Revises: 8d2e4b6f1c93
+Create Date: 2026-10-19 12:40:08.734519
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c92f5a7e3b16"
+down_revision: Union[str, None] = "8d2e4b6f1c93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "confirmed_choices",
+        sa.Column("projected_co2_saved_kg", sa.Numeric(precision=12, scale=2), nullable=True),
+    )
+
+    # Backfill existing rows with the same slider-linear interpolation used at confirmation time
+    op.execute(
+        """
+        UPDATE confirmed_choices cc
+        SET projected_co2_saved_kg = a.standard - CASE
+            WHEN cc.slider_value <= 0.5 THEN a.slow + (a.standard - a.slow) * (cc.slider_value / 0.5)
+            ELSE a.standard + (a.fast - a.standard) * ((cc.slider_value - 0.5) / 0.5)
+        END
+        FROM voyages v
+        JOIN (
+            SELECT
+                route_id,
+                ship_id,
+                MAX(expected_emissions_kg_co2) FILTER (WHERE profile = 'slow') AS slow,
+                MAX(expected_emissions_kg_co2) FILTER (WHERE profile = 'standard') AS standard,
+                MAX(expected_emissions_kg_co2) FILTER (WHERE profile = 'fast') AS fast
+            FROM speed_to_emissions_estimates
+            GROUP BY route_id, ship_id
+        ) a ON a.route_id = v.route_id AND a.ship_id = v.ship_id
+        WHERE cc.voyage_id = v.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("confirmed_choices", "projected_co2_saved_kg")
@@ -0,0 +1,32 @@
+"""null_empty_api_log_path_params
+
+Revision ID: d3a7c6e9b415
+Revises: b8e2f05d7c19
+Create Date: 2026-10-19 23:48:31.204118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d3a7c6e9b415"
+down_revision: Union[str, None] = "b8e2f05d7c19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows for routes without path parameters stored the JSON value null
+    # instead of SQL NULL; ApiLog.path_params now writes SQL NULL
+    op.execute(
+        sa.text("UPDATE api_logs SET path_params = NULL WHERE CAST(path_params AS TEXT) = 'null'")
+    )
+
+
+def downgrade() -> None:
+    # SQL NULL is what the column meant all along; nothing to restore
+    pass
@@ -0,0 +1,31 @@
+"""add_db_metrics_to_api_logs
+
+Revision ID: d3a8f61c2e57
+Revises: c92f5a7e3b16
+Create Date: 2026-10-19 14:05:21.318406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d3a8f61c2e57"
+down_revision: Union[str, None] = "c92f5a7e3b16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("api_logs", sa.Column("db_query_count", sa.Integer(), nullable=True))
+    op.add_column("api_logs", sa.Column("db_time_ms", sa.Integer(), nullable=True))
+    op.add_column("api_logs", sa.Column("slowest_query", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("api_logs", "slowest_query")
+    op.drop_column("api_logs", "db_time_ms")
+    op.drop_column("api_logs", "db_query_count")
@@ -0,0 +1,35 @@
+"""add_route_template_to_api_logs
+
+Revision ID: e61b2d9f4a83
+Revises: d3a8f61c2e57
+Create Date: 2026-10-19 15:22:47.905113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e61b2d9f4a83"
+down_revision: Union[str, None] = "d3a8f61c2e57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("api_logs", sa.Column("route", sa.String(), nullable=True))
+    op.add_column("api_logs", sa.Column("path_params", sa.JSON(), nullable=True))
+    op.create_index(
+        "ix_api_logs_operator_route_created_at",
+        "api_logs",
+        ["operator_id", "route", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_api_logs_operator_route_created_at", table_name="api_logs")
+    op.drop_column("api_logs", "path_params")
+    op.drop_column("api_logs", "route")
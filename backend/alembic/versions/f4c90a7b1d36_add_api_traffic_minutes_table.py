@@ -0,0 +1,42 @@
+"""add_api_traffic_minutes_table
+
+Revision ID: f4c90a7b1d36
+Revises: e61b2d9f4a83
+Create Date: 2026-10-19 16:10:03.552871
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f4c90a7b1d36"
+down_revision: Union[str, None] = "e61b2d9f4a83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "api_traffic_minutes",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("minute", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("method", sa.String(), nullable=False),
+        sa.Column("route", sa.String(), nullable=False),
+        sa.Column("voyage_id", sa.Integer(), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=False),
+        sa.Column("request_count", sa.Integer(), nullable=False),
+        sa.Column("total_response_ms", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "minute", "route", "method", "voyage_id", "status_code",
+            name="uq_api_traffic_minutes_bucket",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("api_traffic_minutes")
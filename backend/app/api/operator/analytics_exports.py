@@ -0,0 +1,107 @@
+import os
+import secrets
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.core.analytics_export import expire_jobs, pyarrow_available, run_export_job
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.models.analytics_export_job import AnalyticsExportJob
+from app.models.user import User
+from app.schemas.analytics_export import AnalyticsExportCreate, AnalyticsExportJob as AnalyticsExportJobSchema
+
+router = APIRouter(
+    prefix="/analytics-exports",
+    tags=["analytics-exports"],
+    dependencies=[Depends(get_current_user)],
+)
+
+
+def _to_schema(job: AnalyticsExportJob) -> AnalyticsExportJobSchema:
+    out = AnalyticsExportJobSchema.model_validate(job)
+    if job.status == "succeeded":
+        out.download_url = f"/api/v1/operator/analytics-exports/{job.id}/download"
+    return out
+
+
+def _get_operator_job(db: Session, current_user: User, job_id: str) -> AnalyticsExportJob:
+    job = (
+        db.query(AnalyticsExportJob)
+        .filter(AnalyticsExportJob.id == job_id, AnalyticsExportJob.operator_id == current_user.operator_id)
+        .first()
+    )
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    return job
+
+
+@router.post("/", response_model=AnalyticsExportJobSchema, status_code=status.HTTP_202_ACCEPTED)
+def create_analytics_export(
+    payload: AnalyticsExportCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Start a Parquet export of choice intents, confirmed choices and voyage
+    dimensions for the current operator and date range.
+
+    Returns immediately with the job; poll GET /analytics-exports/{job_id}
+    until status is 'succeeded', then fetch the download_url.
+    """
+    if not pyarrow_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Analytics export requires the 'pyarrow' package on the server",
+        )
+
+    expire_jobs(db)
+
+    job = AnalyticsExportJob(
+        id=secrets.token_hex(16),
+        operator_id=current_user.operator_id,
+        requested_by_user_id=current_user.id,
+        start_date=payload.start_date,
+        end_date=payload.end_date,
+        status="pending",
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    background_tasks.add_task(run_export_job, job.id)
+    return _to_schema(job)
+
+
+@router.get("/{job_id}", response_model=AnalyticsExportJobSchema)
+def get_analytics_export(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Return the status of an export job owned by the current operator."""
+    expire_jobs(db)
+    return _to_schema(_get_operator_job(db, current_user, job_id))
+
+
+@router.get("/{job_id}/download")
+def download_analytics_export(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Download the zip archive of Parquet files produced by a succeeded job."""
+    expire_jobs(db)
+    job = _get_operator_job(db, current_user, job_id)
+    if job.status != "succeeded":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Export job is '{job.status}'")
+    if not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Export file is no longer available")
+
+    return FileResponse(
+        job.file_path,
+        media_type="application/zip",
+        filename=os.path.basename(job.file_path),
+    )
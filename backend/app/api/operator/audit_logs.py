@@ -25,6 +25,7 @@ class AuditLogEntry(BaseModel):
     created_at: datetime
     method: str
     path: str
+    route: Optional[str] = None
     status_code: int
     response_ms: int
     user_id: Optional[int] = None
@@ -51,6 +52,7 @@ def get_audit_logs(
     current_user: User = Depends(get_current_user),
     # Filtering parameters
     path: Optional[str] = Query(None, description="Filter by path (partial match)"),
+    route: Optional[str] = Query(None, description="Filter by route template, e.g. /api/v1/operator/voyages/{voyage_id} (exact match)"),
     method: Optional[str] = Query(None, description="Filter by HTTP method (GET, POST, etc.)"),
     start_datetime: Optional[datetime] = Query(None, description="Filter logs after this datetime"),
     end_datetime: Optional[datetime] = Query(None, description="Filter logs before this datetime"),
@@ -67,6 +69,7 @@ def get_audit_logs(
     
     Supports filtering by:
     - path: Partial match on the request path
+    - route: Exact match on the route template (indexed; prefer over path)
     - method: HTTP method (GET, POST, PATCH, DELETE)
     - start_datetime / end_datetime: Date range filter
     - user_id: Filter by specific user
@@ -100,6 +103,9 @@ def get_audit_logs(
         # Partial match on path using LIKE
         query = query.filter(ApiLog.path.ilike(f"%{path}%"))
 
+    if route:
+        query = query.filter(ApiLog.route == route)
+
     if method:
         query = query.filter(ApiLog.method == method.upper())
 
@@ -139,6 +145,7 @@ def get_audit_logs(
                 created_at=item.created_at,
                 method=item.method,
                 path=item.path,
+                route=item.route,
                 status_code=item.status_code,
                 response_ms=item.response_ms,
                 user_id=item.user_id,
@@ -1,36 +1,107 @@
 from datetime import timedelta
+from hashlib import sha256
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.core import security
+from app.core import metrics, password_hashing, refresh_tokens, security
 from app.core.deps import get_current_user
 from app.core.database import get_db
 from app.core.config import settings
+from app.core.rate_limit import enforce_rate_limit
 from app.models.user import User
-from app.schemas.auth import LoginRequest, MeResponse, Token
+from app.schemas.auth import LoginRequest, MeResponse, RefreshRequest, Token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/login", response_model=Token)
-def login(credentials: LoginRequest, db: Session = Depends(get_db)):
-    """Authenticate a user and issue a JWT access token."""
+def _get_user_by_username(db: Session, username: str) -> Optional[User]:
+    return db.query(User).filter(User.username == username).first()
 
-    user = db.query(User).filter(User.username == credentials.username).first()
-    if not user or not security.verify_password(credentials.password, user.password_hash):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-        )
 
+def _throttle_login(request: Request, username: str) -> None:
+    """Per-IP and per-username login limits, checked before any bcrypt work."""
+    try:
+        enforce_rate_limit("login_ip", security.hash_ip(security.client_ip(request)) or "unknown")
+        enforce_rate_limit("login_username", sha256(username.lower().encode("utf-8")).hexdigest())
+    except HTTPException:
+        metrics.LOGIN_ATTEMPTS.labels("throttled").inc()
+        raise
+
+
+def _issue_refresh_token(db: Session, user_id: int) -> str:
+    refresh_tokens.prune(db)
+    token = refresh_tokens.issue(db, user_id)
+    db.commit()
+    return token
+
+
+def _token_response(user: User, refresh_token: str) -> dict:
     access_token = security.create_access_token(
         subject=user.id,
         operator_id=user.operator_id,
         role=user.role,
         expires_minutes=settings.access_token_expire_minutes,
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": settings.access_token_expire_minutes * 60,
+    }
+
+
+@router.post("/login", response_model=Token)
+async def login(credentials: LoginRequest, request: Request, db: Session = Depends(get_db)):
+    """
+    Authenticate a user and issue a JWT access token.
+
+    The password check runs on the dedicated bcrypt threads (see
+    app.core.password_hashing), so a burst of logins cannot starve other endpoints.
+    """
+
+    _throttle_login(request, credentials.username)
+
+    user = await run_in_threadpool(_get_user_by_username, db, credentials.username)
+    try:
+        valid = user is not None and await password_hashing.verify_password(
+            credentials.password, user.password_hash
+        )
+    except HTTPException:
+        metrics.LOGIN_ATTEMPTS.labels("busy").inc()
+        raise
+    if not valid:
+        metrics.LOGIN_ATTEMPTS.labels("failure").inc()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+        )
+
+    metrics.LOGIN_ATTEMPTS.labels("success").inc()
+    refresh_token = await run_in_threadpool(_issue_refresh_token, db, user.id)
+    return _token_response(user, refresh_token)
+
+
+@router.post("/refresh", response_model=Token)
+def refresh(payload: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token and refresh token.
+
+    The presented token is single-use. Reusing a rotated one revokes its session.
+    """
+
+    user, refresh_token = refresh_tokens.rotate(db, payload.refresh_token)
+    return _token_response(user, refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(payload: RefreshRequest, db: Session = Depends(get_db)):
+    """Revoke the session of a refresh token. The access token stays valid until it expires."""
+
+    refresh_tokens.revoke(db, payload.refresh_token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get("/me", response_model=MeResponse)
@@ -51,3 +122,7 @@ def read_me(current_user: User = Depends(get_current_user)):
 #      -d '{"username":"admin","password":"your-password"}'
 # curl "http://127.0.0.1:8000/api/v1/operator/auth/me" \
 #      -H "Authorization: Bearer <token-from-login>"
+# curl -X POST "http://127.0.0.1:8000/api/v1/operator/auth/refresh" \
+#      -H "Content-Type: application/json" \
+#      -d '{"refresh_token":"<refresh_token-from-login>"}'
+
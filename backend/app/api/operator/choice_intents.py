@@ -1,10 +1,13 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.deps import get_current_user
+from app.core.export import stream_export
 from app.models.user import User
 from app.models.choice_intent import ChoiceIntent
 from app.models.voyage import Voyage
@@ -35,6 +38,47 @@ def get_choice_intents_for_voyage(
     return intents
 
 
+@router.get("/export")
+def export_choice_intents(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+    voyage_id: Optional[List[int]] = Query(None, description="Only these voyages (repeatable); defaults to all"),
+    created_from: Optional[datetime] = Query(None, description="Only intents created at or after this datetime"),
+    created_to: Optional[datetime] = Query(None, description="Only intents created at or before this datetime"),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Stream choice intents for the current operator as NDJSON or CSV.
+
+    Rows are read with a server-side cursor and written as they arrive, so
+    whole-season exports do not load every intent into memory.
+    """
+    stmt = (
+        select(
+            ChoiceIntent.intent_id,
+            ChoiceIntent.voyage_id,
+            ChoiceIntent.slider_value,
+            ChoiceIntent.delta_pct_from_standard,
+            ChoiceIntent.selected_speed_kn,
+            ChoiceIntent.ip_hash,
+            ChoiceIntent.user_agent,
+            ChoiceIntent.created_at,
+            ChoiceIntent.expires_at,
+            ChoiceIntent.consumed_at,
+        )
+        .join(Voyage, Voyage.id == ChoiceIntent.voyage_id)
+        .where(Voyage.operator_id == current_user.operator_id)
+        .order_by(ChoiceIntent.created_at)
+    )
+    if voyage_id:
+        stmt = stmt.where(ChoiceIntent.voyage_id.in_(voyage_id))
+    if created_from:
+        stmt = stmt.where(ChoiceIntent.created_at >= created_from)
+    if created_to:
+        stmt = stmt.where(ChoiceIntent.created_at <= created_to)
+
+    return stream_export(stmt, format, "choice_intents")
+
+
 @router.get("/{intent_id}", response_model=ChoiceIntentSchema)
 def get_choice_intent(
     intent_id: str,
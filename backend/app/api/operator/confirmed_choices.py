@@ -1,17 +1,32 @@
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import func, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.co2_savings import projected_co2_saved_sql
+from app.core.database import SessionLocal, get_db
 from app.core.deps import get_current_user, get_operator_from_jwt_or_secret
+from app.core.export import stream_export
+from app.core.interpolation import interpolate_slider, load_anchor_table
+from app.core.responses import DuplexStreamingResponse
 from app.models.operator import Operator
 from app.models.user import User
 from app.models.confirmed_choice import ConfirmedChoice
 from app.models.choice_intent import ChoiceIntent
 from app.models.voyage import Voyage
-from app.schemas.confirmed_choice import ConfirmedChoiceCreate, ConfirmedChoice as ConfirmedChoiceSchema
+from app.schemas.confirmed_choice import (
+    BulkConfirmedChoiceResult,
+    BulkConfirmedChoicesCreate,
+    BulkConfirmedChoicesResponse,
+    ConfirmedChoiceCreate,
+    ConfirmedChoice as ConfirmedChoiceSchema,
+)
 
 router = APIRouter(prefix="/confirmed-choices", tags=["confirmed-choices"])
 
@@ -28,18 +43,84 @@ def create_confirmed_choice(
     Accepts either a JWT Bearer token or an X-Webhook-Secret header,
     so operators can call this directly from their booking backend
     without needing a user login.
+
+    Idempotent: repeating the call with the same booking_id returns the
+    existing confirmed choice.
     """
 
-    # Get the choice intent to derive the voyage
+    # Happy path in one round trip: claim the intent (only if unexpired and owned by the
+    # operator) and insert the confirmed choice from it. Duplicate webhooks hit the
+    # unique (voyage_id, booking_id) constraint and insert nothing.
+    claimed = (
+        update(ChoiceIntent)
+        .where(
+            ChoiceIntent.intent_id == payload.intent_id,
+            ChoiceIntent.voyage_id == Voyage.id,
+            Voyage.operator_id == operator.id,
+            ChoiceIntent.expires_at > func.now(),
+        )
+        # Keep the original timestamp when a retry claims an already-consumed intent
+        .values(consumed_at=func.coalesce(ChoiceIntent.consumed_at, func.now()))
+        .returning(
+            ChoiceIntent.voyage_id,
+            ChoiceIntent.intent_id,
+            ChoiceIntent.slider_value,
+            ChoiceIntent.delta_pct_from_standard,
+            ChoiceIntent.selected_speed_kn,
+            Voyage.route_id,
+            Voyage.ship_id,
+        )
+        .cte("claimed")
+    )
+    stmt = (
+        pg_insert(ConfirmedChoice)
+        .from_select(
+            [
+                "voyage_id",
+                "intent_id",
+                "booking_id",
+                "slider_value",
+                "delta_pct_from_standard",
+                "selected_speed_kn",
+                "projected_co2_saved_kg",
+            ],
+            select(
+                claimed.c.voyage_id,
+                claimed.c.intent_id,
+                literal(payload.booking_id),
+                claimed.c.slider_value,
+                claimed.c.delta_pct_from_standard,
+                claimed.c.selected_speed_kn,
+                projected_co2_saved_sql(claimed.c.slider_value, claimed.c.route_id, claimed.c.ship_id),
+            ),
+        )
+        .on_conflict_do_nothing(constraint="uq_confirmed_choices_voyage_booking")
+        .returning(*ConfirmedChoice.__table__.columns)
+        .add_cte(claimed)
+    )
+
+    created = db.execute(stmt).first()
+    db.commit()
+    if created:
+        return created
+
+    # Nothing inserted: either this booking was already confirmed (idempotent retry),
+    # or the intent is missing, expired or belongs to another operator.
     intent = db.query(ChoiceIntent).filter(ChoiceIntent.intent_id == payload.intent_id).first()
     if not intent:
         raise HTTPException(status_code=404, detail="Choice intent not found")
 
     # Idempotency check — return existing record if this booking was already confirmed
-    existing = db.query(ConfirmedChoice).filter(
-        ConfirmedChoice.voyage_id == intent.voyage_id,
-        ConfirmedChoice.booking_id == payload.booking_id
-    ).first()
+    existing = (
+        db.query(ConfirmedChoice)
+        .join(Voyage, Voyage.id == ConfirmedChoice.voyage_id)
+        .filter(
+            ConfirmedChoice.voyage_id == intent.voyage_id,
+            ConfirmedChoice.booking_id == payload.booking_id,
+            Voyage.operator_id == operator.id,
+        )
+        .first()
+    )
     if existing:
         return existing
 
@@ -47,33 +128,305 @@ def create_confirmed_choice(
     if datetime.now(timezone.utc) > intent.expires_at:
         raise HTTPException(status_code=400, detail="Choice intent has expired")
 
-    # Verify the voyage belongs to the authenticated operator
-    voyage = db.query(Voyage).filter(
-        Voyage.id == intent.voyage_id,
-        Voyage.operator_id == operator.id
-    ).first()
-    if not voyage:
-        raise HTTPException(status_code=404, detail="Voyage not found or access denied")
+    raise HTTPException(status_code=404, detail="Voyage not found or access denied")
+
 
-    # Create the confirmed choice
-    db_choice = ConfirmedChoice(
-        voyage_id=intent.voyage_id,
-        intent_id=payload.intent_id,
-        booking_id=payload.booking_id,
-        slider_value=intent.slider_value,
-        delta_pct_from_standard=intent.delta_pct_from_standard,
-        selected_speed_kn=intent.selected_speed_kn,
+BULK_CHUNK_SIZE = 1000  # Rows per set-wise query; keeps IN lists and NDJSON memory bounded
+MAX_NDJSON_LINE_BYTES = 16 * 1024  # Longer NDJSON lines are reported as invalid without being buffered
+
+
+def _projected_co2_saved_by_intent(db: Session, intent_rows: list) -> Dict[str, float]:
+    """
+    Projected kg CO2 saved for each (intent, route_id, ship_id) row, evaluated in one
+    vectorized pass over the anchors of all pairings involved (one extra query).
+    """
+    table = load_anchor_table(db, {(route_id, ship_id) for _, route_id, ship_id in intent_rows})
+    rows = table.rows_for(
+        [route_id for _, route_id, _ in intent_rows],
+        [ship_id for _, _, ship_id in intent_rows],
     )
+    has_anchors = rows >= 0
+    if not has_anchors.any():
+        return {}
 
-    db.add(db_choice)
+    sliders = np.array([float(intent.slider_value) for intent, _, _ in intent_rows])
+    saved = interpolate_slider(table.anchors, rows[has_anchors], sliders[has_anchors]).co2_saved_kg
+    intent_ids = [intent.intent_id for (intent, _, _), keep in zip(intent_rows, has_anchors) if keep]
+    return {intent_id: round(float(value), 2) for intent_id, value in zip(intent_ids, saved)}
 
-    # Mark the intent as consumed so it cannot be used again
-    intent.consumed_at = datetime.now(timezone.utc)
+
+def _confirm_batch(db: Session, operator_id: int, items: List[ConfirmedChoiceCreate]) -> List[BulkConfirmedChoiceResult]:
+    """
+    Confirm a chunk of (intent_id, booking_id) pairs with a fixed number of queries.
+
+    1. Load all referenced intents owned by the operator in one SELECT.
+    2. Bulk INSERT the unexpired ones with ON CONFLICT DO NOTHING.
+    3. Look up already-confirmed bookings for everything not inserted in one SELECT.
+    4. Bulk UPDATE consumed_at for the intents that produced a new row.
+
+    Results are returned in the same order as *items*.
+    """
+    now = datetime.now(timezone.utc)
+    intent_ids = {item.intent_id for item in items}
+
+    intent_rows = (
+        db.query(ChoiceIntent, Voyage.route_id, Voyage.ship_id)
+        .join(Voyage, Voyage.id == ChoiceIntent.voyage_id)
+        .filter(ChoiceIntent.intent_id.in_(intent_ids), Voyage.operator_id == operator_id)
+        .all()
+    )
+    intents: Dict[str, ChoiceIntent] = {intent.intent_id: intent for intent, _, _ in intent_rows}
+    co2_saved = _projected_co2_saved_by_intent(db, intent_rows)
+
+    # Unexpired, de-duplicated (voyage_id, booking_id) rows to insert; first occurrence wins
+    rows_to_insert: Dict[Tuple[int, str], dict] = {}
+    for item in items:
+        intent = intents.get(item.intent_id)
+        if intent is None or intent.expires_at <= now:
+            continue
+        rows_to_insert.setdefault(
+            (intent.voyage_id, item.booking_id),
+            {
+                "voyage_id": intent.voyage_id,
+                "intent_id": intent.intent_id,
+                "booking_id": item.booking_id,
+                "slider_value": intent.slider_value,
+                "delta_pct_from_standard": intent.delta_pct_from_standard,
+                "selected_speed_kn": intent.selected_speed_kn,
+                "projected_co2_saved_kg": co2_saved.get(intent.intent_id),
+            },
+        )
+
+    created: Dict[Tuple[int, str], Any] = {}
+    if rows_to_insert:
+        stmt = (
+            pg_insert(ConfirmedChoice)
+            .values(list(rows_to_insert.values()))
+            .on_conflict_do_nothing(constraint="uq_confirmed_choices_voyage_booking")
+            .returning(*ConfirmedChoice.__table__.columns)
+        )
+        created = {(row.voyage_id, row.booking_id): row for row in db.execute(stmt)}
+
+    # Everything with a known intent that was not just inserted may already be confirmed
+    lookup_keys = {
+        (intents[item.intent_id].voyage_id, item.booking_id)
+        for item in items
+        if item.intent_id in intents
+    } - created.keys()
+    existing: Dict[Tuple[int, str], ConfirmedChoice] = {}
+    if lookup_keys:
+        existing = {
+            (choice.voyage_id, choice.booking_id): choice
+            for choice in db.query(ConfirmedChoice).filter(
+                tuple_(ConfirmedChoice.voyage_id, ConfirmedChoice.booking_id).in_(lookup_keys)
+            )
+        }
+
+    consumed_intent_ids = {row.intent_id for row in created.values()}
+    if consumed_intent_ids:
+        db.execute(
+            update(ChoiceIntent)
+            .where(ChoiceIntent.intent_id.in_(consumed_intent_ids))
+            .values(consumed_at=func.coalesce(ChoiceIntent.consumed_at, func.now()))
+        )
 
     db.commit()
-    db.refresh(db_choice)
 
-    return db_choice
+    results: List[BulkConfirmedChoiceResult] = []
+    reported_created: set = set()
+    for item in items:
+        intent = intents.get(item.intent_id)
+        if intent is None:
+            results.append(BulkConfirmedChoiceResult(
+                intent_id=item.intent_id, booking_id=item.booking_id, status="not_found",
+                detail="Choice intent not found",
+            ))
+            continue
+
+        key = (intent.voyage_id, item.booking_id)
+        if key in created and key not in reported_created:
+            reported_created.add(key)
+            results.append(BulkConfirmedChoiceResult(
+                intent_id=item.intent_id, booking_id=item.booking_id, status="created",
+                confirmed_choice=ConfirmedChoiceSchema.model_validate(created[key]),
+            ))
+        elif key in created or key in existing:
+            # Duplicates within the batch report the row created by their first occurrence
+            results.append(BulkConfirmedChoiceResult(
+                intent_id=item.intent_id, booking_id=item.booking_id, status="existing",
+                confirmed_choice=ConfirmedChoiceSchema.model_validate(created.get(key) or existing[key]),
+            ))
+        else:
+            results.append(BulkConfirmedChoiceResult(
+                intent_id=item.intent_id, booking_id=item.booking_id, status="expired",
+                detail="Choice intent has expired",
+            ))
+
+    return results
+
+
+@router.post("/bulk", response_model=BulkConfirmedChoicesResponse)
+def bulk_create_confirmed_choices(
+    payload: BulkConfirmedChoicesCreate,
+    db: Session = Depends(get_db),
+    operator: Operator = Depends(get_operator_from_jwt_or_secret),
+):
+    """
+    Confirm up to MAX_BULK_CONFIRMED_CHOICES (intent_id, booking_id) pairs at once.
+
+    Intended for nightly reconciliation from operator booking systems. Same auth
+    and idempotency rules as POST /confirmed-choices/, but validation, inserts and
+    intent consumption are done set-wise per chunk instead of per booking.
+    Returns one result per item, in request order.
+    """
+    results: List[BulkConfirmedChoiceResult] = []
+    for start in range(0, len(payload.items), BULK_CHUNK_SIZE):
+        results.extend(_confirm_batch(db, operator.id, payload.items[start:start + BULK_CHUNK_SIZE]))
+
+    created = sum(1 for r in results if r.status == "created")
+    existing = sum(1 for r in results if r.status == "existing")
+    return BulkConfirmedChoicesResponse(
+        created=created,
+        existing=existing,
+        failed=len(results) - created - existing,
+        items=results,
+    )
+
+
+@router.post("/bulk/ndjson")
+async def bulk_create_confirmed_choices_ndjson(
+    request: Request,
+    operator: Operator = Depends(get_operator_from_jwt_or_secret),
+):
+    """
+    Streaming variant of /bulk for very large uploads.
+
+    The request body is NDJSON (one {"intent_id": ..., "booking_id": ...} object per
+    line). Lines are confirmed in chunks as they arrive and one NDJSON result per
+    non-blank input line is streamed back in input order, with its line number, so
+    neither side has to hold the whole batch. Lines longer than
+    MAX_NDJSON_LINE_BYTES are reported as invalid.
+    """
+    operator_id = operator.id
+
+    async def results_stream():
+        # Own session: the request-scoped one may be closed before streaming finishes
+        db = SessionLocal()
+        # Parsed items and parse errors of the current chunk, in input order
+        pending: List[Tuple[int, Union[ConfirmedChoiceCreate, BulkConfirmedChoiceResult]]] = []
+
+        async def flush():
+            items = [entry for _, entry in pending if isinstance(entry, ConfirmedChoiceCreate)]
+            confirmed = iter(await run_in_threadpool(_confirm_batch, db, operator_id, items) if items else [])
+            out = []
+            for line_no, entry in pending:
+                result = next(confirmed) if isinstance(entry, ConfirmedChoiceCreate) else entry
+                result.line = line_no
+                out.append(result.model_dump_json() + "\n")
+            pending.clear()
+            return "".join(out)
+
+        try:
+            buffer = b""
+            line_no = 0
+            # True while discarding the rest of an over-long line
+            skipping = False
+            async for data in request.stream():
+                *lines, rest = (buffer + data).split(b"\n")
+                for line in lines:
+                    line_no += 1
+                    if skipping:
+                        skipping = False
+                        continue
+                    entry = _parse_ndjson_item(line)
+                    if entry is not None:
+                        pending.append((line_no, entry))
+                    if len(pending) >= BULK_CHUNK_SIZE:
+                        yield await flush()
+                if len(rest) > MAX_NDJSON_LINE_BYTES:
+                    if not skipping:
+                        pending.append((line_no + 1, _too_long()))
+                        skipping = True
+                    rest = b""
+                buffer = rest
+
+            if not skipping:
+                entry = _parse_ndjson_item(buffer)
+                if entry is not None:
+                    pending.append((line_no + 1, entry))
+            if pending:
+                yield await flush()
+        finally:
+            db.close()
+
+    return DuplexStreamingResponse(results_stream(), media_type="application/x-ndjson")
+
+
+def _too_long() -> BulkConfirmedChoiceResult:
+    return BulkConfirmedChoiceResult(
+        intent_id="",
+        booking_id="",
+        status="invalid",
+        detail=f"Invalid line: longer than {MAX_NDJSON_LINE_BYTES} bytes",
+    )
+
+
+def _parse_ndjson_item(line: bytes) -> Union[ConfirmedChoiceCreate, BulkConfirmedChoiceResult, None]:
+    """Parse one NDJSON line; None for blank lines, an 'invalid' result for bad ones."""
+    line = line.strip()
+    if not line:
+        return None
+    if len(line) > MAX_NDJSON_LINE_BYTES:
+        return _too_long()
+    try:
+        return ConfirmedChoiceCreate.model_validate_json(line)
+    except ValidationError as e:
+        return BulkConfirmedChoiceResult(
+            intent_id="",
+            booking_id="",
+            status="invalid",
+            detail=f"Invalid line: {e.errors()[0]['msg']}",
+        )
+
+
+@router.get("/export")
+def export_confirmed_choices(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+    voyage_id: Optional[List[int]] = Query(None, description="Only these voyages (repeatable); defaults to all"),
+    confirmed_from: Optional[datetime] = Query(None, description="Only choices confirmed at or after this datetime"),
+    confirmed_to: Optional[datetime] = Query(None, description="Only choices confirmed at or before this datetime"),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Stream confirmed choices for the current operator as NDJSON or CSV.
+
+    Rows are read with a server-side cursor and written as they arrive, so
+    memory use stays constant regardless of the export size.
+    """
+    stmt = (
+        select(
+            ConfirmedChoice.id,
+            ConfirmedChoice.voyage_id,
+            ConfirmedChoice.intent_id,
+            ConfirmedChoice.booking_id,
+            ConfirmedChoice.slider_value,
+            ConfirmedChoice.delta_pct_from_standard,
+            ConfirmedChoice.selected_speed_kn,
+            ConfirmedChoice.projected_co2_saved_kg,
+            ConfirmedChoice.confirmed_at,
+        )
+        .join(Voyage, Voyage.id == ConfirmedChoice.voyage_id)
+        .where(Voyage.operator_id == current_user.operator_id)
+        .order_by(ConfirmedChoice.confirmed_at)
+    )
+    if voyage_id:
+        stmt = stmt.where(ConfirmedChoice.voyage_id.in_(voyage_id))
+    if confirmed_from:
+        stmt = stmt.where(ConfirmedChoice.confirmed_at >= confirmed_from)
+    if confirmed_to:
+        stmt = stmt.where(ConfirmedChoice.confirmed_at <= confirmed_to)
+
+    return stream_export(stmt, format, "confirmed_choices")
 
 
 @router.get("/{choice_id}", response_model=ConfirmedChoiceSchema)
@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import and_, case, cast, Date, func
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import cast, Date, func
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.deps import get_current_user
+from app.core import live_updates, refresh_tokens, security
+from app.core.database import SessionLocal, get_db
+from app.core.deps import get_current_user, oauth2_scheme
+from app.core.responses import ModelSerializer
+from app.core.voyage_metrics import build_voyage_metrics
 from app.models.choice_intent import ChoiceIntent
 from app.models.confirmed_choice import ConfirmedChoice
 from app.models.route import Route
@@ -17,13 +21,14 @@ from app.models.widget_config import WidgetConfig
 from app.schemas.dashboard import (
     ConfirmedChoicesPerDay,
     OperatorOverview,
-    VoyageMetrics,
     VoyagesDashboardResponse,
     VoyageStatusBreakdown,
 )
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
+_voyages_dashboard_serializer = ModelSerializer(VoyagesDashboardResponse)
+
 
 @router.get("/overview", response_model=OperatorOverview)
 def get_operator_overview(
@@ -42,6 +47,62 @@ def get_operator_overview(
     )
 
 
+def _session_active(user_id: int, operator_id: int) -> bool:
+    """Whether the user behind a stream still exists, in the same operator, and is logged in."""
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        return (
+            user is not None
+            and user.operator_id == operator_id
+            and refresh_tokens.has_active_session(db, user_id)
+        )
+    finally:
+        db.close()
+
+
+@router.get("/stream")
+def stream_dashboard_updates(token: str = Depends(oauth2_scheme)):
+    """
+    Server-sent events with live changes to the current operator's dashboard.
+
+    Events: intent_created and choice_confirmed ({"voyage_id"}), voyage (an
+    updated VoyageMetrics row, also sent when intents expire), resync (updates
+    were lost; reload GET /dashboard/voyages) and expired (the token expired or
+    the session ended; the stream closes, reconnect with a fresh token).
+    """
+    if not live_updates.is_available():
+        raise HTTPException(status_code=503, detail="Live updates are not available")
+
+    # Authenticate with a short-lived session rather than Depends(get_db): yield
+    # dependencies are only cleaned up after the response, which for a stream
+    # would hold a pooled connection (idle in transaction) for hours
+    expires_at = security.decode_access_token(token)["exp"]
+    db = SessionLocal()
+    try:
+        user = get_current_user(token, db)
+        user_id, operator_id = user.id, user.operator_id
+    finally:
+        db.close()
+    # A logged-out session's access token stays valid until it expires; don't
+    # let it reopen the stream it was just closed out of
+    if not _session_active(user_id, operator_id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session ended",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return StreamingResponse(
+        live_updates.broadcaster.stream(
+            operator_id, expires_at, lambda: _session_active(user_id, operator_id)
+        ),
+        media_type="text/event-stream",
+        # Stop proxies (nginx, Railway) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/voyages", response_model=VoyagesDashboardResponse)
 def get_voyages_dashboard(
     db: Session = Depends(get_db),
@@ -65,85 +126,8 @@ def get_voyages_dashboard(
     )
     voyage_ids = [v.id for v in voyages]
 
-    # Pre-load routes and ships into dicts so we can look them up per-voyage
-    # without hitting the database again inside the loop below.
-    route_map: Dict[int, Route] = {
-        r.id: r for r in db.query(Route).filter(Route.operator_id == operator_id).all()
-    }
-    ship_map: Dict[int, Ship] = {
-        s.id: s for s in db.query(Ship).filter(Ship.operator_id == operator_id).all()
-    }
-
-    # --- Intent aggregates (one row per voyage) ---
-    # We count intents grouped into three buckets using CASE expressions:
-    #   active   = not consumed AND not yet expired
-    #   consumed = has a consumed_at timestamp
-    #   expired  = not consumed AND expires_at is in the past
-    intent_agg_rows = []
-    if voyage_ids:
-        intent_agg_rows = (
-            db.query(
-                ChoiceIntent.voyage_id,
-                func.count().label("total_intents"),
-                func.sum(
-                    case(
-                        (
-                            and_(
-                                ChoiceIntent.consumed_at.is_(None),
-                                ChoiceIntent.expires_at > now,
-                            ),
-                            1,
-                        ),
-                        else_=0,
-                    )
-                ).label("active_intents"),
-                func.sum(
-                    case(
-                        (ChoiceIntent.consumed_at.isnot(None), 1),
-                        else_=0,
-                    )
-                ).label("consumed_intents"),
-                func.sum(
-                    case(
-                        (
-                            and_(
-                                ChoiceIntent.consumed_at.is_(None),
-                                ChoiceIntent.expires_at <= now,
-                            ),
-                            1,
-                        ),
-                        else_=0,
-                    )
-                ).label("expired_intents"),
-            )
-            .filter(ChoiceIntent.voyage_id.in_(voyage_ids))
-            .group_by(ChoiceIntent.voyage_id)
-            .all()
-        )
-
-    intent_by_voyage: Dict[int, object] = {row.voyage_id: row for row in intent_agg_rows}
-
-    # --- Confirmed-choice aggregates (one row per voyage) ---
-    cc_agg_rows = []
-    if voyage_ids:
-        cc_agg_rows = (
-            db.query(
-                ConfirmedChoice.voyage_id,
-                func.count().label("confirmed_choices_count"),
-                func.avg(ConfirmedChoice.delta_pct_from_standard).label("avg_delta_pct"),
-                func.percentile_cont(0.5)
-                .within_group(ConfirmedChoice.delta_pct_from_standard.asc())
-                .label("median_delta_pct"),
-                func.min(ConfirmedChoice.delta_pct_from_standard).label("min_delta_pct"),
-                func.max(ConfirmedChoice.delta_pct_from_standard).label("max_delta_pct"),
-                func.avg(ConfirmedChoice.slider_value).label("avg_slider_value"),
-            )
-            .filter(ConfirmedChoice.voyage_id.in_(voyage_ids))
-            .group_by(ConfirmedChoice.voyage_id)
-            .all()
-        )
-
-    cc_by_voyage: Dict[int, object] = {row.voyage_id: row for row in cc_agg_rows}
+    # Per-voyage intent/choice statistics (shared with the live updates stream)
+    voyage_metrics = build_voyage_metrics(db, operator_id, voyages, now)
 
     # --- Global confirmed-choice counts ---
     total_confirmed_choices: int = 0
@@ -226,67 +210,16 @@ def get_voyages_dashboard(
         if v.status in status_counts:
             status_counts[v.status] += 1
 
-    # --- Assemble per-voyage metrics ---
-    voyage_metrics: List[VoyageMetrics] = []
-    for v in voyages:
-        route = route_map.get(v.route_id)
-        ship = ship_map.get(v.ship_id)
-        intents = intent_by_voyage.get(v.id)
-        cc = cc_by_voyage.get(v.id)
-
-        # Combine voyage date with route time to get full datetimes
-        departure_datetime = (
-            datetime.combine(v.departure_date, route.departure_time)
-            if route else datetime(v.departure_date.year, v.departure_date.month, v.departure_date.day)
-        )
-        arrival_datetime = (
-            datetime.combine(v.arrival_date, route.arrival_time)
-            if route else datetime(v.arrival_date.year, v.arrival_date.month, v.arrival_date.day)
-        )
-
-        # Calculate the average voted arrival time.
-        # Passengers vote on a speed change % (delta_pct). Since distance is fixed,
-        # travel time is inversely proportional to speed:
-        #   new_duration = standard_duration / (1 + delta_pct / 100)
-        # A negative delta means slower speed → later arrival.
-        voted_arrival_datetime: Optional[datetime] = None
-        avg_delta_pct_for_voyage = float(cc.avg_delta_pct) if cc and cc.avg_delta_pct is not None else None
-        if avg_delta_pct_for_voyage is not None:
-            standard_duration = arrival_datetime - departure_datetime
-            speed_factor = 1 + avg_delta_pct_for_voyage / 100
-            if speed_factor > 0:
-                voted_duration = standard_duration / speed_factor
-                voted_arrival_datetime = departure_datetime + voted_duration
-
-        voyage_metrics.append(
-            VoyageMetrics(
-                voyage_id=v.id,
-                external_trip_id=v.external_trip_id,
-                status=v.status,
-                route_name=route.name if route else "",
-                departure_port=route.departure_port if route else "",
-                arrival_port=route.arrival_port if route else "",
-                ship_name=ship.name if ship else "",
-                departure_datetime=departure_datetime,
-                arrival_datetime=arrival_datetime,
-                voted_arrival_datetime=voted_arrival_datetime,
-                total_intents=int(intents.total_intents) if intents else 0,
-                active_intents=int(intents.active_intents) if intents else 0,
-                consumed_intents=int(intents.consumed_intents) if intents else 0,
-                expired_intents=int(intents.expired_intents) if intents else 0,
-                confirmed_choices_count=int(cc.confirmed_choices_count) if cc else 0,
-                avg_delta_pct=avg_delta_pct_for_voyage,
-                median_delta_pct=float(cc.median_delta_pct) if cc and cc.median_delta_pct is not None else None,
-                min_delta_pct=float(cc.min_delta_pct) if cc and cc.min_delta_pct is not None else None,
-                max_delta_pct=float(cc.max_delta_pct) if cc and cc.max_delta_pct is not None else None,
-                avg_slider_value=float(cc.avg_slider_value) if cc and cc.avg_slider_value is not None else None,
-            )
-        )
+    # Operator-wide projected savings: sum of the per-voyage sums already fetched above
+    projected_co2_saved_total = sum(
+        vm.projected_co2_saved_kg for vm in voyage_metrics if vm.projected_co2_saved_kg is not None
+    )
 
     # Most recent departures first
     voyage_metrics.sort(key=lambda vm: vm.departure_datetime, reverse=True)
 
-    return VoyagesDashboardResponse(
+    # Built from validated models; serialize without FastAPI re-validating the whole tree
+    dashboard = VoyagesDashboardResponse(
         total_voyages=len(voyages),
         total_confirmed_choices=total_confirmed_choices,
         confirmed_choices_last_30_days=confirmed_choices_last_30_days,
@@ -294,6 +227,8 @@ def get_voyages_dashboard(
         voyage_status_breakdown=VoyageStatusBreakdown(**status_counts),
         avg_delta_pct_all_confirmed=avg_delta_all,
         median_delta_pct_all_confirmed=median_delta_all,
+        projected_co2_saved_kg_total=projected_co2_saved_total,
         confirmed_choices_per_day=confirmed_choices_per_day,
         voyages=voyage_metrics,
-    )
\ No newline at end of file
+    )
+    return _voyages_dashboard_serializer.response(dashboard, trusted=True)
\ No newline at end of file
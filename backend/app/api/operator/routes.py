@@ -5,6 +5,8 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_admin
+from app.core.read_models import fetch_rows, select_for
+from app.core.responses import ModelSerializer
 from app.models.route import Route
 from app.models.user import User
 from app.schemas.route import RouteCreate, RouteUpdate, Route as RouteSchema
@@ -15,6 +17,8 @@ router = APIRouter(
     dependencies=[Depends(get_current_user)],
 )
 
+_route_list_serializer = ModelSerializer(List[RouteSchema])
+
 
 def _get_operator_scoped_route(
     db: Session,
@@ -82,12 +86,13 @@ def list_routes(
     if current_user.role not in {"admin", "captain"}:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
-    return (
-        db.query(Route)
-        .filter(Route.operator_id == current_user.operator_id)
-        .order_by(Route.name.asc())
-        .all()
+    routes = fetch_rows(
+        db,
+        select_for(Route, RouteSchema)
+        .where(Route.operator_id == current_user.operator_id)
+        .order_by(Route.name.asc()),
     )
+    return _route_list_serializer.response(routes)
 
 
 @router.get("/{route_id}", response_model=RouteSchema)
@@ -5,6 +5,8 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_admin
+from app.core.read_models import fetch_rows, select_for
+from app.core.responses import ModelSerializer
 from app.models.ship import Ship
 from app.models.user import User
 from app.schemas.ship import ShipCreate, ShipUpdate, Ship as ShipSchema
@@ -15,6 +17,8 @@ router = APIRouter(
     dependencies=[Depends(get_current_user)],
 )
 
+_ship_list_serializer = ModelSerializer(List[ShipSchema])
+
 
 @router.post(
     "/",
@@ -58,12 +62,13 @@ def list_ships(
 ):
     """List ships for the current operator."""
 
-    return (
-        db.query(Ship)
-        .filter(Ship.operator_id == current_user.operator_id)
-        .order_by(Ship.name.asc())
-        .all()
+    ships = fetch_rows(
+        db,
+        select_for(Ship, ShipSchema)
+        .where(Ship.operator_id == current_user.operator_id)
+        .order_by(Ship.name.asc()),
     )
+    return _ship_list_serializer.response(ships)
 
 
 @router.get("/{ship_id}", response_model=ShipSchema)
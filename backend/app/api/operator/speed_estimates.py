@@ -1,10 +1,14 @@
 from typing import Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_admin
+from app.core.co2_savings import recompute_projected_co2_saved
+from app.core.read_models import fetch_rows
+from app.core.responses import ModelSerializer
 from app.models.route import Route
 from app.models.ship import Ship
 from app.models.speed_to_emissions_estimate import SpeedToEmissionsEstimate
@@ -26,6 +30,8 @@ router = APIRouter(
     dependencies=[Depends(get_current_user)],
 )
 
+_all_speed_estimates_serializer = ModelSerializer(AllSpeedEstimatesResponse)
+
 
 def _get_operator_route_and_ship(
     db: Session,
@@ -58,38 +64,50 @@ def list_all_speed_estimates(
     """
     operator_id = current_user.operator_id
 
-    # Join through Route to filter by operator, also join Ship to get names
-    estimates = (
-        db.query(SpeedToEmissionsEstimate, Route, Ship)
+    # Join through Route to filter by operator, also join Ship to get names.
+    # Only the columns the response needs are selected, as plain rows.
+    rows = fetch_rows(
+        db,
+        select(
+            Route.id.label("route_id"),
+            Route.name.label("route_name"),
+            Ship.id.label("ship_id"),
+            Ship.name.label("ship_name"),
+            SpeedToEmissionsEstimate.id,
+            SpeedToEmissionsEstimate.profile,
+            SpeedToEmissionsEstimate.speed_knots,
+            SpeedToEmissionsEstimate.expected_emissions_kg_co2,
+            SpeedToEmissionsEstimate.expected_arrival_delta_minutes,
+            SpeedToEmissionsEstimate.created_at,
+        )
         .join(Route, SpeedToEmissionsEstimate.route_id == Route.id)
         .join(Ship, SpeedToEmissionsEstimate.ship_id == Ship.id)
-        .filter(Route.operator_id == operator_id)
-        .order_by(Route.name, Ship.name, SpeedToEmissionsEstimate.profile)
-        .all()
+        .where(Route.operator_id == operator_id)
+        .order_by(Route.name, Ship.name, SpeedToEmissionsEstimate.profile),
     )
 
     # Group by route+ship combination
     grouped: Dict[tuple, Dict] = {}
-    for estimate, route, ship in estimates:
-        key = (route.id, ship.id)
+    for row in rows:
+        key = (row.route_id, row.ship_id)
 
         if key not in grouped:
             grouped[key] = {
-                "route_id": route.id,
-                "route_name": route.name,
-                "ship_id": ship.id,
-                "ship_name": ship.name,
+                "route_id": row.route_id,
+                "route_name": row.route_name,
+                "ship_id": row.ship_id,
+                "ship_name": row.ship_name,
                 "anchors": {},
             }
 
         # Add this anchor to the group
-        grouped[key]["anchors"][estimate.profile] = SpeedEstimateAnchorOut(
-            id=estimate.id,
-            profile=estimate.profile,
-            speed_knots=float(estimate.speed_knots),
-            expected_emissions_kg_co2=float(estimate.expected_emissions_kg_co2),
-            expected_arrival_delta_minutes=estimate.expected_arrival_delta_minutes,
-            created_at=estimate.created_at,
+        grouped[key]["anchors"][row.profile] = SpeedEstimateAnchorOut(
+            id=row.id,
+            profile=row.profile,
+            speed_knots=float(row.speed_knots),
+            expected_emissions_kg_co2=float(row.expected_emissions_kg_co2),
+            expected_arrival_delta_minutes=row.expected_arrival_delta_minutes,
+            created_at=row.created_at,
         )
 
     # Convert to list of response objects
@@ -97,7 +115,7 @@ def list_all_speed_estimates(
         RouteShipAnchorsOut(**data) for data in grouped.values()
     ]
 
-    return AllSpeedEstimatesResponse(items=items)
+    return _all_speed_estimates_serializer.response(AllSpeedEstimatesResponse(items=items), trusted=True)
 
 
 @router.get(
@@ -157,7 +175,12 @@ def upsert_speed_anchors(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Create or update anchors for the operator's route+ship pairing."""
+    """
+    Create or update anchors for the operator's route+ship pairing.
+
+    Also recomputes the projected CO2 savings of confirmed choices on voyages
+    using this pairing.
+    """
 
     _get_operator_route_and_ship(db, current_user, route_id, ship_id)
 
@@ -195,6 +218,10 @@ def upsert_speed_anchors(
         if profile not in PROFILES:
             db.delete(anchor)
 
+    # Flush the new anchors so the bulk recompute of projected CO2 savings sees them
+    db.flush()
+    recompute_projected_co2_saved(db, route_id=route_id, ship_id=ship_id)
+
     db.commit()
 
     refreshed = (
@@ -2,9 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.core import security
+from app.core import password_hashing, refresh_tokens
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_admin
+from app.core.read_models import fetch_rows, select_for
+from app.core.responses import ModelSerializer
 from app.models.operator import Operator  # For FK validation
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, User as UserSchema
@@ -15,6 +17,8 @@ router = APIRouter(
     dependencies=[Depends(get_current_user)],
 )
 
+_user_list_serializer = ModelSerializer(List[UserSchema])
+
 @router.post(
     "/",
     response_model=UserSchema,
@@ -43,7 +47,7 @@ def create_user(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already exists")
     
     # Hash password and create user
-    hashed_password = security.hash_password(user.password)
+    hashed_password = password_hashing.hash_password_blocking(user.password)
     db_user = User(
         username=user.username,
         password_hash=hashed_password,
@@ -71,7 +75,8 @@ def list_users(
     if current_user.role != "admin" and target_operator_id != current_user.operator_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
-    return db.query(User).filter(User.operator_id == target_operator_id).all()
+    users = fetch_rows(db, select_for(User, UserSchema).where(User.operator_id == target_operator_id))
+    return _user_list_serializer.response(users)
 
 @router.get("/{user_id}", response_model=UserSchema)
 def get_user(
@@ -127,7 +132,9 @@ def update_user(
         db_user.role = user_update.role
 
     if user_update.password:
-        db_user.password_hash = security.hash_password(user_update.password)
+        db_user.password_hash = password_hashing.hash_password_blocking(user_update.password)
+        # Sign out existing sessions; their access tokens lapse on expiry
+        refresh_tokens.revoke_all_for_user(db, db_user.id)
     
     db.commit()
     db.refresh(db_user)
@@ -2,11 +2,14 @@ from datetime import timedelta, date
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func
+from sqlalchemy import Select, func, select
 from sqlalchemy.orm import Session
 
+from app.core.co2_savings import recompute_projected_co2_saved
 from app.core.database import get_db
 from app.core.deps import get_current_user, get_operator_from_jwt_or_secret, require_admin
+from app.core.read_models import fetch_rows, select_for
+from app.core.responses import ModelSerializer
 from app.core.pattern import extract_departure_date
 from app.models.confirmed_choice import ConfirmedChoice
 from app.models.operator import Operator
@@ -26,6 +29,8 @@ router = APIRouter(
     dependencies=[Depends(get_current_user)],
 )
 
+_voyage_list_serializer = ModelSerializer(List[VoyageSchema])
+
 
 @router.post("/", response_model=VoyageSchema, dependencies=[Depends(require_admin)])
 def create_voyage(
@@ -264,24 +269,15 @@ def preview_ensure_voyage(
     )
 
 
-def _attach_intent_counts(db: Session, voyages: list[Voyage]) -> list[dict]:
-    """Attach intent_count to each voyage."""
-    voyage_ids = [v.id for v in voyages]
-    if not voyage_ids:
-        return []
-    counts = (
-        db.query(ChoiceIntent.voyage_id, func.count(ChoiceIntent.intent_id))
-        .filter(ChoiceIntent.voyage_id.in_(voyage_ids))
-        .group_by(ChoiceIntent.voyage_id)
-        .all()
+def _voyage_rows(*criteria) -> Select:
+    """Voyage columns plus intent_count, counted per voyage in the same query."""
+    intent_count = (
+        select(func.count(ChoiceIntent.intent_id))
+        .where(ChoiceIntent.voyage_id == Voyage.id)
+        .scalar_subquery()
+        .label("intent_count")
     )
-    count_map = {vid: cnt for vid, cnt in counts}
-    results = []
-    for v in voyages:
-        d = {c.name: getattr(v, c.name) for c in v.__table__.columns}
-        d["intent_count"] = count_map.get(v.id, 0)
-        results.append(d)
-    return results
+    return select_for(Voyage, VoyageSchema, intent_count).where(*criteria)
 
 
 @router.get("/", response_model=List[VoyageSchema])
@@ -308,21 +304,21 @@ def list_voyages(
     ),
 ):
     """List voyages for the current operator, with optional filters."""
-    query = db.query(Voyage).filter(Voyage.operator_id == current_user.operator_id)
+    query = _voyage_rows(Voyage.operator_id == current_user.operator_id)
 
     if status_filter is not None:
-        query = query.filter(Voyage.status == status_filter)
+        query = query.where(Voyage.status == status_filter)
     if departure_date_from is not None:
-        query = query.filter(Voyage.departure_date >= departure_date_from)
+        query = query.where(Voyage.departure_date >= departure_date_from)
     if departure_date_to is not None:
-        query = query.filter(Voyage.departure_date <= departure_date_to)
+        query = query.where(Voyage.departure_date <= departure_date_to)
     if voyage_creation_rule_id is not None:
         # Filter to only voyages created by the specified rule.
         # If the rule ID doesn't belong to this operator, the result is simply empty.
-        query = query.filter(Voyage.voyage_creation_rule_id == voyage_creation_rule_id)
+        query = query.where(Voyage.voyage_creation_rule_id == voyage_creation_rule_id)
 
-    voyages = query.order_by(Voyage.departure_date.asc()).all()
-    return _attach_intent_counts(db, voyages)
+    voyages = fetch_rows(db, query.order_by(Voyage.departure_date.asc()))
+    return _voyage_list_serializer.response(voyages)
 
 
 @router.get("/{voyage_id}", response_model=VoyageSchema)
@@ -333,14 +329,14 @@ def get_voyage(
 ):
     """Get a voyage by ID."""
 
-    db_voyage = db.query(Voyage).filter(Voyage.id == voyage_id).first()
+    db_voyage = db.execute(_voyage_rows(Voyage.id == voyage_id)).first()
     if not db_voyage:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Voyage not found")
 
     if db_voyage.operator_id != current_user.operator_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
-    return _attach_intent_counts(db, [db_voyage])[0]
+    return db_voyage
 
 
 @router.patch("/{voyage_id}", response_model=VoyageSchema, dependencies=[Depends(require_admin)])
@@ -443,6 +439,11 @@ def update_voyage(
             detail="A voyage already exists for this route on the selected departure date",
         )
 
+    # A different route/ship means different anchors behind the confirmed choices' CO2 savings
+    if {"route_id", "ship_id"} & voyage_update.model_fields_set:
+        db.flush()
+        recompute_projected_co2_saved(db, voyage_id=db_voyage.id)
+
     db.commit()
     db.refresh(db_voyage)
     return db_voyage
@@ -4,6 +4,8 @@ from typing import List
 
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_admin
+from app.core.read_models import fetch_rows, select_for
+from app.core.responses import ModelSerializer
 from app.models.user import User
 from app.models.widget_config import WidgetConfig
 from app.schemas.widget_config import (
@@ -18,6 +20,8 @@ router = APIRouter(
     dependencies=[Depends(get_current_user)],
 )
 
+_widget_config_list_serializer = ModelSerializer(List[WidgetConfigSchema])
+
 
 @router.post(
     "/",
@@ -65,7 +69,11 @@ def list_widget_configs(
 ):
     """List widget configs for the current operator."""
     # Query configs scoped to the current user's operator
-    return db.query(WidgetConfig).filter(WidgetConfig.operator_id == current_user.operator_id).all()
+    configs = fetch_rows(
+        db,
+        select_for(WidgetConfig, WidgetConfigSchema).where(WidgetConfig.operator_id == current_user.operator_id),
+    )
+    return _widget_config_list_serializer.response(configs)
 
 
 @router.get("/{config_id}", response_model=WidgetConfigSchema)
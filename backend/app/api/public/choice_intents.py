@@ -1,12 +1,14 @@
-import hashlib
 import uuid
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.rate_limit import enforce_rate_limit, rate_limit_by_ip
+from app.core.security import client_ip, hash_ip
 from app.models.voyage import Voyage
 from app.models.choice_intent import ChoiceIntent
 from app.schemas.choice_intent import ChoiceIntentCreate, ChoiceIntentResponse, DEFAULT_INTENT_TTL_MINUTES
@@ -19,25 +21,40 @@ def generate_intent_id() -> str:
     return f"int_{uuid.uuid4().hex[:12]}"
 
 
-def hash_ip(ip: Optional[str]) -> Optional[str]:
-    """Hash the IP; return None if missing."""
-    if not ip:
-        return None
-    return hashlib.sha256(ip.encode("utf-8")).hexdigest()
-
-# May have to add some kind of cache or rate-limiting later to avoid abuse. Also some kind of memory for fast lookup of recent voyages.
-@router.post("/", response_model=ChoiceIntentResponse, status_code=201)
+# Rate limited per hashed client IP (dependency) and per voyage (below) to keep
+# scripted slider spam from turning into unbounded inserts.
+# May still want some kind of memory for fast lookup of recent voyages.
+@router.post(
+    "/",
+    response_model=ChoiceIntentResponse,
+    status_code=201,
+    dependencies=[Depends(rate_limit_by_ip("choice_intents"))],
+)
 def create_choice_intent(
     payload: ChoiceIntentCreate,
     request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
-    """Create a choice intent from the public widget slider."""
+    """
+    Create a choice intent from the public widget slider (201).
+
+    A widget session that already holds an intent sends its intent_id along.
+    If that intent is for the same voyage, unconsumed and was touched within
+    INTENT_COALESCE_WINDOW_SECONDS, it is updated and returned instead (200).
+    Any other intent_id is ignored and a new intent is created.
+    """
 
     voyage = db.query(Voyage).filter(Voyage.id == payload.voyage_id).first()
     if not voyage:
         raise HTTPException(status_code=404, detail="Voyage not found")
 
+    # Cap total intent volume per voyage; only for voyages that exist, so
+    # made-up ids don't each get a bucket
+    enforce_rate_limit("voyage_intents", str(voyage.id))
+    # Lets the logging middleware attribute the request to the voyage
+    request.state.voyage_id = voyage.id
+
     # Reject intent submissions for voyages that are no longer accepting passengers
     if voyage.status != "planned":
         raise HTTPException(
@@ -45,27 +62,76 @@ def create_choice_intent(
             detail=f"Voyage is '{voyage.status}' and no longer accepting speed preferences",
         )
 
-    expires_at = datetime.now(timezone.utc) + timedelta(minutes=DEFAULT_INTENT_TTL_MINUTES)
-    intent_id = generate_intent_id()
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(minutes=DEFAULT_INTENT_TTL_MINUTES)
 
-    client_ip = request.client.host if request.client else None
+    # Passengers dragging the slider produce several intents per session. Coalesce them
+    # on the intent_id the session holds: keying on IP + user agent would merge
+    # passengers sharing ship Wi-Fi or a carrier NAT
+    existing = _find_coalescable_intent(db, payload.intent_id, payload.voyage_id, now)
+    if existing:
+        existing.slider_value = payload.slider_value
+        existing.delta_pct_from_standard = payload.delta_pct_from_standard
+        existing.selected_speed_kn = payload.selected_speed_kn
+        existing.expires_at = expires_at
+        db.commit()
+        db.refresh(existing)
+        response.status_code = 200
+        return existing
+
+    ip_hash = hash_ip(client_ip(request))
     ua = request.headers.get("User-Agent")
 
     db_intent = ChoiceIntent(
-        intent_id=intent_id,
+        intent_id=generate_intent_id(),
         voyage_id=payload.voyage_id,
         slider_value=payload.slider_value,
         delta_pct_from_standard=payload.delta_pct_from_standard,
         selected_speed_kn=payload.selected_speed_kn,
         consumed_at=None,
-        ip_hash=hash_ip(client_ip),
+        ip_hash=ip_hash,
         user_agent=ua,
         expires_at=expires_at,
-        created_at=datetime.now(timezone.utc)
+        created_at=now
     )
 
     db.add(db_intent)
     db.commit()
     db.refresh(db_intent)
 
-    return db_intent
\ No newline at end of file
+    return db_intent
+
+
+def _find_coalescable_intent(
+    db: Session,
+    intent_id: Optional[str],
+    voyage_id: int,
+    now: datetime,
+) -> Optional[ChoiceIntent]:
+    """
+    Return the session's intent if it is for this voyage, unconsumed and was
+    touched within the coalescing window, otherwise None.
+
+    Every create/update sets expires_at = touched_at + TTL, so "touched within the
+    window" is the same as expires_at > now + TTL - window. That lets us use the
+    existing column instead of tracking a separate updated_at.
+    """
+    window = settings.intent_coalesce_window_seconds
+    if window <= 0 or not intent_id:
+        return None
+
+    touched_after = now + timedelta(minutes=DEFAULT_INTENT_TTL_MINUTES) - timedelta(seconds=window)
+
+    # Primary key lookup; the lock keeps a concurrent confirmation from
+    # consuming the intent while it is being overwritten
+    return (
+        db.query(ChoiceIntent)
+        .filter(
+            ChoiceIntent.intent_id == intent_id,
+            ChoiceIntent.voyage_id == voyage_id,
+            ChoiceIntent.consumed_at.is_(None),
+            ChoiceIntent.expires_at > touched_after,
+        )
+        .with_for_update()
+        .first()
+    )
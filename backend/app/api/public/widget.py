@@ -2,9 +2,12 @@ from datetime import datetime
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
+from app.core import widget_bundle
 from app.core.database import get_db
+from app.core.responses import FastJSONResponse
+from app.core.rate_limit import rate_limit_by_ip
 from app.models.operator import Operator
 from app.models.voyage import Voyage
 from app.models.widget_config import WidgetConfig
@@ -24,11 +27,15 @@ def _resolve_public_base_url(request: Request) -> str:
     return str(request.base_url).rstrip("/")
 
 
-@router.get("/config", response_model=PublicWidgetConfigOut)
+@router.get(
+    "/config",
+    response_model=PublicWidgetConfigOut,
+    dependencies=[Depends(rate_limit_by_ip("widget_config"))],
+)
 def get_config(
     request: Request,
     external_trip_id: Optional[str] = Query(None, description="External trip ID to fetch config for"),
-    voyage_id: Optional[int] = Query(None, description="Voyage ID to fetch config for"),
+    voyage_id: Optional[int] = Query(None, ge=1, le=2**31 - 1, description="Voyage ID to fetch config for"),
     public_key: Optional[str] = Query(None, description="Operator public key to to disambiguate external trip IDs across operators"),
     db: Session = Depends(get_db),
 ):
@@ -47,8 +54,9 @@ def get_config(
             detail="public_key is required when using external_trip_id",
         )
 
-    # Find the voyage
-    voyage_query = db.query(Voyage)
+    # Find the voyage together with its route and widget config in one joined
+    # query (estimates follow in a second one).
+    voyage_query = db.query(Voyage).options(joinedload(Voyage.route), joinedload(Voyage.widget_config))
     if external_trip_id:
         # Join with Operator to filter by public_key, ensuring the correct operator is matched
         voyage = (
@@ -65,11 +73,11 @@ def get_config(
 
     if not voyage:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Voyage not found")
+    # Lets the logging middleware attribute the request to the voyage
+    request.state.voyage_id = voyage.id
 
-    # Get widget config if linked
-    widget_config = None
-    if voyage.widget_config_id:
-        widget_config = db.query(WidgetConfig).filter(WidgetConfig.id == voyage.widget_config_id).first()
+    # Linked widget config (already loaded by the joined query above)
+    widget_config = voyage.widget_config
 
     if not widget_config:
         # Use default config if none linked, could also be a row in the DB that is easy to edit via admin. But for now, hardcoded.
@@ -145,14 +153,15 @@ def get_config(
         "id": voyage.id,
         "name": widget_config.name if widget_config else "Default",
         "description": widget_config.description if widget_config else None,
-        "default_speed_percentage": widget_config.config.get("default_speed_percentage", 50) if widget_config else 50,
+        "default_speed_percentage": float(widget_config.config.get("default_speed_percentage", 50)) if widget_config else 50.0,
         "default_departure_datetime": default_departure_datetime,
         "default_arrival_datetime": default_arrival_datetime,
         "status": voyage.status,
         "derived": derived,
         "theme": widget_config.config.get("theme", {}) if widget_config else {},
         "anchors": anchors,
-        "widget_script_url": f"{public_base}/widget.js" if public_base else None,
+        "widget_script_url": f"{public_base}{widget_bundle.fingerprinted_path()}" if public_base else None,
     }
 
-    return response
\ No newline at end of file
+    # Built field by field in PublicWidgetConfigOut's shape; serialize without re-validating
+    return FastJSONResponse(content=response)
\ No newline at end of file
@@ -1,26 +1,59 @@
-from pathlib import Path
-
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import RedirectResponse, Response
 
+from app.core import metrics, widget_bundle
 from app.core.config import settings
 
 router = APIRouter(tags=["widget-assets"])
 
-_PROJECT_ROOT = Path(__file__).resolve().parents[4]
-_WIDGET_BUNDLE = _PROJECT_ROOT / "widget" / "dist" / "widget.js"
+# Fingerprinted URLs never change content, so caches may keep them for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
 
-@router.get("/widget.js")
-def serve_widget_bundle():
-    """Serve the embeddable widget bundle with cache headers."""
-    if not _WIDGET_BUNDLE.exists():
+def _bundle_response(request: Request, cache_control: str) -> Response:
+    bundle = widget_bundle.get()
+    if bundle is None:
         raise HTTPException(status_code=404, detail="Widget bundle not found")
 
-    headers = {"Cache-Control": f"public, max-age={settings.widget_cache_seconds}"}
-    return FileResponse(
-        _WIDGET_BUNDLE,
-        media_type="application/javascript",
-        filename="widget.js",
-        headers=headers,
+    coding = bundle.negotiate(request.headers.get("accept-encoding"))
+    body, etag = bundle.variants[coding]
+    headers = {
+        "Cache-Control": cache_control,
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+    }
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+
+    # Any variant's ETag identifies the same bundle version
+    if_none_match = request.headers.get("if-none-match")
+    not_modified = if_none_match is not None and (
+        if_none_match.strip() == "*"
+        or any(tag.strip().removeprefix("W/") in bundle.etags for tag in if_none_match.split(","))
     )
+    metrics.record_cache("widget_bundle_etag", not_modified)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/javascript", headers=headers)
+
+
+@router.get("/widget.js")
+def serve_widget_bundle(request: Request):
+    """Serve the embeddable widget bundle with cache headers and ETag revalidation."""
+    return _bundle_response(request, f"public, max-age={settings.widget_cache_seconds}")
+
+
+@router.get("/widget.{fingerprint}.js")
+def serve_fingerprinted_widget_bundle(fingerprint: str, request: Request):
+    """
+    Serve the bundle under its content hash with immutable caching.
+
+    Requests for an outdated fingerprint are redirected to the current one.
+    """
+    bundle = widget_bundle.get()
+    if bundle is None:
+        raise HTTPException(status_code=404, detail="Widget bundle not found")
+    if fingerprint != bundle.fingerprint:
+        return RedirectResponse(widget_bundle.fingerprinted_path(), status_code=302)
+    return _bundle_response(request, IMMUTABLE_CACHE_CONTROL)
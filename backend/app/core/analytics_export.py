@@ -0,0 +1,270 @@
+"""
+Columnar (Parquet) export of an operator's analytics data.
+
+A job writes three files into a zip archive under ANALYTICS_EXPORT_DIR:
+  - choice_intents.parquet     (fact, filtered on created_at)
+  - confirmed_choices.parquet  (fact, filtered on confirmed_at)
+  - voyages.parquet            (dimension: voyage + route + ship attributes)
+
+Rows are read through a server-side cursor in batches and appended to the
+Parquet writer one record batch at a time, so a job's memory use depends
+on the batch size, not on the number of rows exported.
+
+Archives are deleted ANALYTICS_EXPORT_RETENTION_HOURS after the job
+finished (downloads then get 410). Jobs still pending or running after
+ANALYTICS_EXPORT_TIMEOUT_MINUTES were lost with the worker that ran them
+(restart, deploy) and are marked failed. Both happen in expire_jobs(),
+which the export endpoints call before creating or reporting a job.
+
+pyarrow is imported lazily so the rest of the API does not pay its import
+cost (or require it) until an export actually runs.
+"""
+
+import logging
+import os
+import shutil
+import zipfile
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict
+
+from sqlalchemy import Float, cast, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.analytics_export_job import AnalyticsExportJob
+from app.models.choice_intent import ChoiceIntent
+from app.models.confirmed_choice import ConfirmedChoice
+from app.models.route import Route
+from app.models.ship import Ship
+from app.models.voyage import Voyage
+
+logger = logging.getLogger("pacectrl.exports")
+
+# Rows per cursor fetch and per Parquet record batch
+PARQUET_BATCH_SIZE = 50_000
+
+# Shown to the operator for a failed job; the details go to the server log
+EXPORT_FAILED_MESSAGE = "Export failed. Please try again or contact support if it keeps failing."
+
+
+def pyarrow_available() -> bool:
+    """Return True if the optional pyarrow dependency can be imported."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _schemas():
+    """Arrow schemas for the exported tables (built lazily with pyarrow)."""
+    import pyarrow as pa
+
+    ts = pa.timestamp("us", tz="UTC")
+    return {
+        "choice_intents": pa.schema([
+            ("intent_id", pa.string()),
+            ("voyage_id", pa.int32()),
+            ("slider_value", pa.float64()),
+            ("delta_pct_from_standard", pa.float64()),
+            ("selected_speed_kn", pa.float64()),
+            ("created_at", ts),
+            ("expires_at", ts),
+            ("consumed_at", ts),
+        ]),
+        "confirmed_choices": pa.schema([
+            ("id", pa.int64()),
+            ("voyage_id", pa.int32()),
+            ("intent_id", pa.string()),
+            ("booking_id", pa.string()),
+            ("slider_value", pa.float64()),
+            ("delta_pct_from_standard", pa.float64()),
+            ("selected_speed_kn", pa.float64()),
+            ("projected_co2_saved_kg", pa.float64()),
+            ("confirmed_at", ts),
+        ]),
+        "voyages": pa.schema([
+            ("voyage_id", pa.int32()),
+            ("external_trip_id", pa.string()),
+            ("status", pa.dictionary(pa.int8(), pa.string())),
+            ("departure_date", pa.date32()),
+            ("arrival_date", pa.date32()),
+            ("route_id", pa.int32()),
+            ("route_name", pa.string()),
+            ("departure_port", pa.string()),
+            ("arrival_port", pa.string()),
+            ("ship_id", pa.int32()),
+            ("ship_name", pa.string()),
+        ]),
+    }
+
+
+def _statements(operator_id: int, start: datetime, end: datetime) -> Dict[str, Select]:
+    """
+    SELECTs for each exported table; column order matches _schemas().
+
+    NUMERIC columns are cast to float in SQL so batches arrive as plain floats
+    rather than Decimal objects that would need converting row by row. They
+    are written as float64, which holds every value of these NUMERIC(p <= 12)
+    columns to the stored precision.
+    """
+    return {
+        "choice_intents": (
+            select(
+                ChoiceIntent.intent_id,
+                ChoiceIntent.voyage_id,
+                cast(ChoiceIntent.slider_value, Float),
+                cast(ChoiceIntent.delta_pct_from_standard, Float),
+                cast(ChoiceIntent.selected_speed_kn, Float),
+                ChoiceIntent.created_at,
+                ChoiceIntent.expires_at,
+                ChoiceIntent.consumed_at,
+            )
+            .join(Voyage, Voyage.id == ChoiceIntent.voyage_id)
+            .where(
+                Voyage.operator_id == operator_id,
+                ChoiceIntent.created_at >= start,
+                ChoiceIntent.created_at < end,
+            )
+        ),
+        "confirmed_choices": (
+            select(
+                ConfirmedChoice.id,
+                ConfirmedChoice.voyage_id,
+                ConfirmedChoice.intent_id,
+                ConfirmedChoice.booking_id,
+                cast(ConfirmedChoice.slider_value, Float),
+                cast(ConfirmedChoice.delta_pct_from_standard, Float),
+                cast(ConfirmedChoice.selected_speed_kn, Float),
+                cast(ConfirmedChoice.projected_co2_saved_kg, Float),
+                ConfirmedChoice.confirmed_at,
+            )
+            .join(Voyage, Voyage.id == ConfirmedChoice.voyage_id)
+            .where(
+                Voyage.operator_id == operator_id,
+                ConfirmedChoice.confirmed_at >= start,
+                ConfirmedChoice.confirmed_at < end,
+            )
+        ),
+        "voyages": (
+            select(
+                Voyage.id,
+                Voyage.external_trip_id,
+                Voyage.status,
+                Voyage.departure_date,
+                Voyage.arrival_date,
+                Route.id,
+                Route.name,
+                Route.departure_port,
+                Route.arrival_port,
+                Ship.id,
+                Ship.name,
+            )
+            .join(Route, Route.id == Voyage.route_id)
+            .join(Ship, Ship.id == Voyage.ship_id)
+            .where(Voyage.operator_id == operator_id)
+        ),
+    }
+
+
+def _write_parquet(db: Session, stmt: Select, schema, path: str) -> int:
+    """Stream *stmt* into a Parquet file at *path*; return the number of rows written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows_written = 0
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=PARQUET_BATCH_SIZE))
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for partition in result.partitions():
+            # Transpose row tuples into columns
+            columns = list(zip(*partition))
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+            rows_written += batch.num_rows
+    return rows_written
+
+
+def expire_jobs(db: Session) -> None:
+    """Fail jobs that outlived their worker and delete archives past retention."""
+    now = datetime.now(timezone.utc)
+    db.execute(
+        update(AnalyticsExportJob)
+        .where(
+            AnalyticsExportJob.status.in_(("pending", "running")),
+            AnalyticsExportJob.created_at < now - timedelta(minutes=settings.analytics_export_timeout_minutes),
+        )
+        .values(status="failed", error="Export did not finish (worker stopped or timed out)", finished_at=now)
+    )
+
+    expired = (
+        db.query(AnalyticsExportJob)
+        .filter(
+            AnalyticsExportJob.file_path.isnot(None),
+            AnalyticsExportJob.finished_at < now - timedelta(hours=settings.analytics_export_retention_hours),
+        )
+        .all()
+    )
+    for job in expired:
+        shutil.rmtree(os.path.dirname(job.file_path), ignore_errors=True)
+        job.file_path = None
+    db.commit()
+
+
+def run_export_job(job_id: str) -> None:
+    """
+    Execute an export job in the background and record its outcome on the job row.
+
+    Runs in its own session because it outlives the request that created it.
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(AnalyticsExportJob).filter(AnalyticsExportJob.id == job_id).first()
+        if not job:
+            return
+        job.status = "running"
+        db.commit()
+
+        job_dir = os.path.join(settings.analytics_export_dir, job.id)
+        try:
+            os.makedirs(job_dir, exist_ok=True)
+
+            # Inclusive date range -> half-open UTC datetime range
+            start = datetime.combine(job.start_date, time.min, tzinfo=timezone.utc)
+            end = datetime.combine(job.end_date + timedelta(days=1), time.min, tzinfo=timezone.utc)
+
+            schemas = _schemas()
+            row_counts: Dict[str, int] = {}
+            parquet_paths = []
+            for table, stmt in _statements(job.operator_id, start, end).items():
+                path = os.path.join(job_dir, f"{table}.parquet")
+                row_counts[table] = _write_parquet(db, stmt, schemas[table], path)
+                parquet_paths.append(path)
+
+            # Parquet is already compressed; store the files as-is in the archive
+            archive_path = os.path.join(job_dir, f"pacectrl_export_{job.id}.zip")
+            with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_STORED) as archive:
+                for path in parquet_paths:
+                    archive.write(path, arcname=os.path.basename(path))
+                    os.remove(path)
+
+            job.status = "succeeded"
+            job.file_path = archive_path
+            job.row_counts = row_counts
+        except Exception:
+            db.rollback()
+            # Exception text can contain SQL and server paths: log it, don't show it
+            logger.exception("Analytics export job %s failed", job.id)
+            # Partial Parquet files and archive
+            shutil.rmtree(job_dir, ignore_errors=True)
+            job.status = "failed"
+            job.error = EXPORT_FAILED_MESSAGE
+
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+    finally:
+        db.close()
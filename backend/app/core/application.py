@@ -0,0 +1,84 @@
+"""
+Setup shared by the ASGI entry points: app.main (everything) and
+app.public_main (passenger-facing routes only).
+"""
+
+import secrets
+
+from fastapi import FastAPI, HTTPException, status
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from starlette.requests import Request
+
+from app.core import log_policy, metrics, widget_bundle
+from app.core.config import settings
+
+
+def add_cors(app: FastAPI) -> None:
+    """Configure CORS (allow public widget interactions)."""
+    cors_origins = settings.get_cors_origins()
+    allow_credentials = False if cors_origins == ["*"] else True
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=cors_origins,
+        allow_credentials=allow_credentials,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+
+def add_common_handlers(app: FastAPI) -> None:
+    """Error handler, lifecycle hooks, /health and /metrics."""
+
+    @app.exception_handler(Exception)
+    async def global_exception_handler(request: Request, exc: Exception):
+        """
+        Catch-all handler: converts unhandled exceptions into a proper JSON
+        response so the CORSMiddleware can still append its headers.
+        """
+        return JSONResponse(
+            status_code=500,
+            content={"detail": "Internal server error"},
+        )
+
+    @app.on_event("startup")
+    def load_widget_bundle():
+        """Read and precompress the widget bundle once instead of per request."""
+        widget_bundle.load()
+
+    @app.on_event("shutdown")
+    def flush_api_traffic():
+        """Write buffered public traffic counters before the worker exits."""
+        log_policy.write_traffic(log_policy.traffic.drain())
+
+    @app.on_event("shutdown")
+    def retire_metrics():
+        """Stop counting this worker's live gauges in multiprocess mode."""
+        metrics.mark_process_dead()
+
+    @app.get("/health")
+    def read_health():
+        """
+        Health check endpoint.
+        Returns status to verify API is running.
+        """
+        return {"status": "ok"}
+
+    @app.get("/metrics", include_in_schema=False)
+    def read_metrics(request: Request):
+        """
+        Prometheus scrape endpoint, for scrapers sending METRICS_TOKEN as a
+        bearer token (route names and traffic volumes are not public).
+        Aggregates all workers when PROMETHEUS_MULTIPROC_DIR is set.
+        """
+        if not settings.metrics_token:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+        expected = f"Bearer {settings.metrics_token}"
+        if not secrets.compare_digest(request.headers.get("authorization", "").encode(), expected.encode()):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid metrics token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        body, content_type = metrics.render_latest()
+        return Response(content=body, media_type=content_type)
@@ -0,0 +1,81 @@
+"""
+Projected CO2 savings of confirmed choices.
+
+Each ConfirmedChoice stores projected_co2_saved_kg: the standard-profile
+emissions minus the emissions at the passenger's slider position, using the
+same slider-linear interpolation as the widget (and
+app.core.interpolation.interpolate_slider). Positive means the passenger
+asked for a slower, lower-emission crossing.
+
+The value is written when the choice is confirmed and recomputed in bulk
+whenever the anchors behind it change (speed anchors upserted, or a voyage
+moved to another route/ship), so dashboards only ever SUM a stored column.
+"""
+
+from typing import Optional
+
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.confirmed_choice import ConfirmedChoice
+from app.models.speed_to_emissions_estimate import SpeedToEmissionsEstimate
+from app.models.voyage import Voyage
+
+
+def _anchor_emissions(profile: str, route_id, ship_id):
+    return (
+        select(SpeedToEmissionsEstimate.expected_emissions_kg_co2)
+        .where(
+            SpeedToEmissionsEstimate.route_id == route_id,
+            SpeedToEmissionsEstimate.ship_id == ship_id,
+            SpeedToEmissionsEstimate.profile == profile,
+        )
+        .scalar_subquery()
+    )
+
+
+def projected_co2_saved_sql(slider_value, route_id, ship_id) -> ColumnElement:
+    """
+    SQL expression for the kg CO2 saved at *slider_value* for a route/ship pairing.
+
+    Evaluates to NULL when the pairing has no anchors.
+    """
+    slow = _anchor_emissions("slow", route_id, ship_id)
+    standard = _anchor_emissions("standard", route_id, ship_id)
+    fast = _anchor_emissions("fast", route_id, ship_id)
+    emissions = case(
+        (slider_value <= 0.5, slow + (standard - slow) * (slider_value / 0.5)),
+        else_=standard + (fast - standard) * ((slider_value - 0.5) / 0.5),
+    )
+    return standard - emissions
+
+
+def recompute_projected_co2_saved(
+    db: Session,
+    *,
+    route_id: Optional[int] = None,
+    ship_id: Optional[int] = None,
+    voyage_id: Optional[int] = None,
+) -> None:
+    """
+    Recompute projected_co2_saved_kg in one UPDATE for confirmed choices on the
+    matching voyages (by route/ship pairing and/or a single voyage). Caller commits.
+    """
+    stmt = (
+        update(ConfirmedChoice)
+        .where(ConfirmedChoice.voyage_id == Voyage.id)
+        .values(
+            projected_co2_saved_kg=projected_co2_saved_sql(
+                ConfirmedChoice.slider_value, Voyage.route_id, Voyage.ship_id
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if route_id is not None:
+        stmt = stmt.where(Voyage.route_id == route_id)
+    if ship_id is not None:
+        stmt = stmt.where(Voyage.ship_id == ship_id)
+    if voyage_id is not None:
+        stmt = stmt.where(Voyage.id == voyage_id)
+    db.execute(stmt)
@@ -1,5 +1,6 @@
 import os
-from typing import List, Optional
+import tempfile
+from typing import Dict, List, Optional, Tuple
 
 from pydantic_settings import BaseSettings
 
@@ -17,6 +18,19 @@ class Settings(BaseSettings):
     # Token expiration time in minutes (override with ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
 
+    # Refresh token lifetime in days; each refresh rotates the token (override with REFRESH_TOKEN_EXPIRE_DAYS)
+    refresh_token_expire_days: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 14))
+
+    # Verified access tokens kept per worker so repeat requests skip signature checks; 0 disables (override with JWT_CACHE_SIZE)
+    jwt_cache_size: int = int(os.getenv("JWT_CACHE_SIZE", 4096))
+
+    # Push dashboard updates to the portal over SSE (needs PostgreSQL LISTEN/NOTIFY)
+    live_updates_enabled: bool = os.getenv("LIVE_UPDATES_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Minimum interval between per-voyage metric recomputations for an operator
+    live_updates_debounce_ms: int = int(os.getenv("LIVE_UPDATES_DEBOUNCE_MS", 1000))
+    # Events buffered per stream; a client that falls further behind is told to reload
+    live_updates_max_queued: int = int(os.getenv("LIVE_UPDATES_MAX_QUEUED", 256))
+
     # Public base URL used when producing absolute links (e.g., widget script src)
     public_base_url: Optional[str] = os.getenv("PUBLIC_BASE_URL")
 
@@ -26,6 +40,81 @@ class Settings(BaseSettings):
     # Comma-separated list of origins allowed for CORS ("*" for allow-all)
     cors_allow_origins: str = os.getenv("CORS_ALLOW_ORIGINS", "*")
 
+    # Reverse proxies in front of the API that append to X-Forwarded-For (1 on Railway).
+    # 0 uses the connecting address, which behind a proxy is the proxy's own.
+    trusted_proxy_hops: int = int(os.getenv("TRUSTED_PROXY_HOPS", 0))
+
+    # Rate limiting for public endpoints (token bucket per hashed client IP / voyage)
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # Optional Redis URL for sharing rate limit buckets across workers; in-memory when unset
+    rate_limit_redis_url: Optional[str] = os.getenv("RATE_LIMIT_REDIS_URL")
+
+    # Upper bound on in-memory buckets per worker (least recently used are evicted)
+    rate_limit_max_keys: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+
+    # Per-route limits: sustained requests per minute and burst size. A rate of 0 disables the limit.
+    rate_limit_choice_intents_per_minute: int = int(os.getenv("RATE_LIMIT_CHOICE_INTENTS_PER_MINUTE", 30))
+    rate_limit_choice_intents_burst: int = int(os.getenv("RATE_LIMIT_CHOICE_INTENTS_BURST", 10))
+    rate_limit_voyage_intents_per_minute: int = int(os.getenv("RATE_LIMIT_VOYAGE_INTENTS_PER_MINUTE", 600))
+    rate_limit_voyage_intents_burst: int = int(os.getenv("RATE_LIMIT_VOYAGE_INTENTS_BURST", 100))
+    rate_limit_widget_config_per_minute: int = int(os.getenv("RATE_LIMIT_WIDGET_CONFIG_PER_MINUTE", 120))
+    rate_limit_widget_config_burst: int = int(os.getenv("RATE_LIMIT_WIDGET_CONFIG_BURST", 30))
+    # Operator login attempts, per hashed client IP and per username (checked before bcrypt)
+    rate_limit_login_ip_per_minute: int = int(os.getenv("RATE_LIMIT_LOGIN_IP_PER_MINUTE", 20))
+    rate_limit_login_ip_burst: int = int(os.getenv("RATE_LIMIT_LOGIN_IP_BURST", 10))
+    rate_limit_login_username_per_minute: int = int(os.getenv("RATE_LIMIT_LOGIN_USERNAME_PER_MINUTE", 6))
+    rate_limit_login_username_burst: int = int(os.getenv("RATE_LIMIT_LOGIN_USERNAME_BURST", 5))
+
+    # Repeated intents for the same voyage from the same (ip_hash, user_agent) within this
+    # many seconds update the previous unconsumed intent instead of inserting a new row (0 disables)
+    intent_coalesce_window_seconds: int = int(os.getenv("INTENT_COALESCE_WINDOW_SECONDS", 600))
+
+    # Directory where analytics export jobs write their Parquet archives
+    analytics_export_dir: str = os.getenv("ANALYTICS_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "pacectrl-exports"))
+    # Hours an export archive stays downloadable after its job finished
+    analytics_export_retention_hours: int = int(os.getenv("ANALYTICS_EXPORT_RETENTION_HOURS", 24))
+    # Jobs still pending/running after this many minutes are marked failed (their worker is gone)
+    analytics_export_timeout_minutes: int = int(os.getenv("ANALYTICS_EXPORT_TIMEOUT_MINUTES", 60))
+
+    # Bearer token Prometheus must send to read /metrics; /metrics is off (404) without it
+    metrics_token: Optional[str] = os.getenv("METRICS_TOKEN")
+
+    # Statements slower than this many milliseconds are logged with normalized SQL
+    slow_query_threshold_ms: int = int(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+
+    # Send the Server-Timing DB header on every response, not only to signed-in operators (debugging)
+    server_timing_all_requests: bool = os.getenv("SERVER_TIMING_ALL_REQUESTS", "false").lower() in ("1", "true", "yes")
+
+    # Store per-request statement count, DB time and slowest statement on api_logs
+    api_log_db_metrics: bool = os.getenv("API_LOG_DB_METRICS", "true").lower() in ("1", "true", "yes")
+
+    # Percentage of GET requests on operator routes written to api_logs (writes are always logged)
+    api_log_operator_read_sample_pct: float = float(os.getenv("API_LOG_OPERATOR_READ_SAMPLE_PCT", 100))
+
+    # Percentage of public (widget) requests written to api_logs; all of them are
+    # counted per minute in api_traffic_minutes
+    api_log_public_sample_pct: float = float(os.getenv("API_LOG_PUBLIC_SAMPLE_PCT", 1))
+
+    # How often each worker flushes its per-minute public traffic counters (seconds)
+    api_log_aggregate_flush_seconds: int = int(os.getenv("API_LOG_AGGREGATE_FLUSH_SECONDS", 30))
+
+    # Threads dedicated to bcrypt; password hashing never uses more cores than this
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+
+    # Password hashing jobs allowed to wait for a bcrypt thread; further logins get 503
+    password_hash_max_queued: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUED", 16))
+
+    def get_rate_limit_rules(self) -> Dict[str, Tuple[int, int]]:
+        """Return (per_minute, burst) keyed by rate limit scope."""
+        return {
+            "choice_intents": (self.rate_limit_choice_intents_per_minute, self.rate_limit_choice_intents_burst),
+            "voyage_intents": (self.rate_limit_voyage_intents_per_minute, self.rate_limit_voyage_intents_burst),
+            "widget_config": (self.rate_limit_widget_config_per_minute, self.rate_limit_widget_config_burst),
+            "login_ip": (self.rate_limit_login_ip_per_minute, self.rate_limit_login_ip_burst),
+            "login_username": (self.rate_limit_login_username_per_minute, self.rate_limit_login_username_burst),
+        }
+
     def get_cors_origins(self) -> List[str]:
         """Return parsed list of allowed CORS origins."""
         raw = (self.cors_allow_origins or "").strip()
@@ -0,0 +1,123 @@
+"""
+Per-request SQL instrumentation.
+
+SQLAlchemy cursor events time every statement. While a request is being
+handled, ApiLoggingMiddleware activates a RequestDbStats object in a context
+variable; the listeners add to it, so the request ends up with:
+  - the number of statements executed,
+  - the total time spent in the database,
+  - the normalized SQL of its slowest statement.
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with normalized
+SQL (literals replaced by '?') regardless of whether a request is active.
+"""
+
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("pacectrl.sql")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+# ":name" bind parameters, but not the second colon of a Postgres "::type" cast
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|(?<!:):\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|(?<!:):\w+))+\s*\)")
+_NAMED_PLACEHOLDER = re.compile(r"%\(\w+\)s|(?<!:):\w+\b|%s")
+_WHITESPACE = re.compile(r"\s+")
+
+# Longest normalized SQL kept for the slowest-statement fingerprint
+MAX_FINGERPRINT_LENGTH = 500
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Reduce a SQL statement to a stable fingerprint: literals and bind
+    placeholders become '?', IN-lists collapse to (?...), whitespace is squashed.
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _NAMED_PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class RequestDbStats:
+    """Database usage accumulated while handling one request."""
+
+    query_count: int = 0
+    db_time_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    @property
+    def slowest_fingerprint(self) -> Optional[str]:
+        if self.slowest_statement is None:
+            return None
+        return normalize_sql(self.slowest_statement)[:MAX_FINGERPRINT_LENGTH]
+
+
+_current_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def start_request() -> RequestDbStats:
+    """Begin collecting stats for the current request context."""
+    stats = RequestDbStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def stop_request() -> None:
+    """Stop collecting (e.g. before the middleware writes its own ApiLog row)."""
+    _current_stats.set(None)
+
+
+def current_stats() -> Optional[RequestDbStats]:
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.query_count += 1
+        stats.db_time_ms += elapsed_ms
+        if elapsed_ms > stats.slowest_ms:
+            stats.slowest_ms = elapsed_ms
+            # Keep the raw statement; normalizing is deferred until someone reads it
+            stats.slowest_statement = statement
+
+    if elapsed_ms >= settings.slow_query_threshold_ms:
+        logger.warning("Slow query (%.1f ms): %s", elapsed_ms, normalize_sql(statement))
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute: drop its start
+    # time so the pooled connection's list doesn't grow and the next statement
+    # isn't timed from this one's start
+    conn = context.connection
+    if conn is not None and not conn.closed:
+        start_times = conn.info.get("query_start_time")
+        if start_times:
+            start_times.pop()
+
+
+def install(engine: Engine) -> None:
+    """Attach the timing listeners to *engine* (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
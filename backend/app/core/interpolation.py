@@ -0,0 +1,186 @@
+"""
+Vectorized emissions / arrival interpolation between speed estimate anchors.
+
+Each (route, ship) pairing has three SpeedToEmissionsEstimate anchors
+(slow, standard, fast). Positions in between are linear interpolations,
+using the same rules as the widget's interpolateMetrics():
+
+  - slider 0.0 -> slow, 0.5 -> standard, 1.0 -> fast, linear in between
+  - delta_pct_from_standard = (speed - standard_speed) / standard_speed * 100
+
+Everything here works on NumPy arrays, so thousands of slider values or
+delta_pcts spread across many route/ship pairings are evaluated in a few
+array operations instead of a Python loop per row.
+
+Typical use:
+
+    table = load_anchor_table(db, {(v.route_id, v.ship_id) for v in voyages})
+    rows = table.rows_for(route_ids, ship_ids)          # one anchor row per sample
+    result = interpolate_slider(table.anchors, rows[rows >= 0], slider_values[rows >= 0])
+    result.co2_saved_kg.sum()
+
+Single confirmations compute the same CO2 figure in SQL
+(app.core.co2_savings.projected_co2_saved_sql); tests/test_interpolation.py
+checks that the two agree.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, NamedTuple, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.models.speed_to_emissions_estimate import SpeedToEmissionsEstimate
+
+PROFILES = ("slow", "standard", "fast")
+
+# Slider positions of the slow / standard / fast anchors
+_SLIDER_ANCHORS = np.array([0.0, 0.5, 1.0])
+
+
+class AnchorArrays(NamedTuple):
+    """Anchor values with shape (n_pairings, 3); columns are slow, standard, fast."""
+
+    speed_knots: np.ndarray
+    emissions_kg_co2: np.ndarray
+    arrival_delta_minutes: np.ndarray
+
+
+class Interpolated(NamedTuple):
+    """Interpolated metrics, one element per evaluated sample."""
+
+    speed_knots: np.ndarray
+    emissions_kg_co2: np.ndarray
+    arrival_delta_minutes: np.ndarray
+    delta_pct_from_standard: np.ndarray
+    # Standard-profile emissions minus interpolated emissions (positive = saved)
+    co2_saved_kg: np.ndarray
+
+
+@dataclass
+class AnchorTable:
+    """Anchors for a set of route/ship pairings plus a lookup from pairing to row."""
+
+    anchors: AnchorArrays
+    index: Dict[Tuple[int, int], int]
+
+    def rows_for(self, route_ids: Sequence[int], ship_ids: Sequence[int]) -> np.ndarray:
+        """
+        Map each (route_id, ship_id) sample to its anchor row.
+
+        Pairings without a complete set of anchors map to -1; use
+        `rows >= 0` as a mask before interpolating.
+        """
+        return np.fromiter(
+            (self.index.get(key, -1) for key in zip(route_ids, ship_ids)),
+            dtype=np.intp,
+            count=len(route_ids),
+        )
+
+
+def anchor_arrays_from_rows(rows: Iterable[Sequence[float]]) -> AnchorArrays:
+    """
+    Build AnchorArrays from rows of 9 values:
+    (slow, standard, fast) speed, then emissions, then arrival delta minutes.
+    """
+    data = np.asarray(list(rows), dtype=np.float64).reshape(-1, 9)
+    return AnchorArrays(
+        speed_knots=data[:, 0:3],
+        emissions_kg_co2=data[:, 3:6],
+        arrival_delta_minutes=data[:, 6:9],
+    )
+
+
+def load_anchor_table(db: Session, pairings: Iterable[Tuple[int, int]]) -> AnchorTable:
+    """Load anchors for the given (route_id, ship_id) pairings in a single query."""
+    pairings = list(set(pairings))
+    if not pairings:
+        return AnchorTable(anchors=anchor_arrays_from_rows([]), index={})
+
+    estimates = (
+        db.query(
+            SpeedToEmissionsEstimate.route_id,
+            SpeedToEmissionsEstimate.ship_id,
+            SpeedToEmissionsEstimate.profile,
+            SpeedToEmissionsEstimate.speed_knots,
+            SpeedToEmissionsEstimate.expected_emissions_kg_co2,
+            SpeedToEmissionsEstimate.expected_arrival_delta_minutes,
+        )
+        .filter(tuple_(SpeedToEmissionsEstimate.route_id, SpeedToEmissionsEstimate.ship_id).in_(pairings))
+        .all()
+    )
+
+    by_pairing: Dict[Tuple[int, int], Dict[str, tuple]] = {}
+    for route_id, ship_id, profile, speed, emissions, delta in estimates:
+        by_pairing.setdefault((route_id, ship_id), {})[profile] = (speed, emissions, delta)
+
+    index: Dict[Tuple[int, int], int] = {}
+    rows = []
+    for key, profiles in by_pairing.items():
+        # Incomplete pairings cannot be interpolated; leave them out of the index
+        if any(p not in profiles for p in PROFILES):
+            continue
+        index[key] = len(rows)
+        rows.append([float(profiles[p][i]) for i in range(3) for p in PROFILES])
+
+    return AnchorTable(anchors=anchor_arrays_from_rows(rows), index=index)
+
+
+def _piecewise_linear(x: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """
+    Evaluate per-sample piecewise-linear functions through three knots.
+
+    x has shape (n,), xp and fp have shape (n, 3) with xp non-decreasing along
+    axis 1. Values outside [xp[:, 0], xp[:, 2]] are clamped to the end knots. On
+    a zero-width segment (two knots at the same x), x at that point resolves to
+    the middle knot, i.e. to standard when slow or fast coincides with it.
+    """
+    upper = x > xp[:, 1]
+    x0 = np.where(upper, xp[:, 1], xp[:, 0])
+    x1 = np.where(upper, xp[:, 2], xp[:, 1])
+    y0 = np.where(upper, fp[:, 1], fp[:, 0])
+    y1 = np.where(upper, fp[:, 2], fp[:, 1])
+
+    span = x1 - x0
+    # Zero-width segments: the right end (middle knot of the lower segment) from x1 on
+    ratio = np.divide(x - x0, span, out=(x >= x1).astype(np.float64), where=span != 0)
+    np.clip(ratio, 0.0, 1.0, out=ratio)
+    return y0 + (y1 - y0) * ratio
+
+
+def _take(anchors: AnchorArrays, rows: np.ndarray) -> AnchorArrays:
+    return AnchorArrays(*(a[rows] for a in anchors))
+
+
+def _delta_pct(speed: np.ndarray, standard_speed: np.ndarray) -> np.ndarray:
+    """(speed - standard) / standard * 100, and 0 where the standard speed is 0."""
+    return np.divide(
+        speed - standard_speed,
+        standard_speed,
+        out=np.zeros_like(speed, dtype=np.float64),
+        where=standard_speed != 0,
+    ) * 100.0
+
+
+def interpolate_slider(anchors: AnchorArrays, rows: np.ndarray, slider_values: np.ndarray) -> Interpolated:
+    """
+    Evaluate metrics for slider positions (0..1), one anchor row per sample.
+
+    Matches the widget: the slider is linear between the anchors, so speed,
+    emissions and arrival delta are each interpolated on the slider axis.
+    """
+    selected = _take(anchors, rows)
+    slider = np.clip(np.asarray(slider_values, dtype=np.float64), 0.0, 1.0)
+    xp = np.broadcast_to(_SLIDER_ANCHORS, selected.speed_knots.shape)
+
+    speed = _piecewise_linear(slider, xp, selected.speed_knots)
+    emissions = _piecewise_linear(slider, xp, selected.emissions_kg_co2)
+    arrival_delta = _piecewise_linear(slider, xp, selected.arrival_delta_minutes)
+    return Interpolated(
+        speed_knots=speed,
+        emissions_kg_co2=emissions,
+        arrival_delta_minutes=arrival_delta,
+        delta_pct_from_standard=_delta_pct(speed, selected.speed_knots[:, 1]),
+        co2_saved_kg=selected.emissions_kg_co2[:, 1] - emissions,
+    )
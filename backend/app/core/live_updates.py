@@ -0,0 +1,390 @@
+"""
+Dashboard live updates pushed to the portal over server-sent events.
+
+Inserts into confirmed_choices fire a Postgres trigger that NOTIFYs CHANNEL
+with {"operator_id", "voyage_id", "event"} (see migration b8e2f05d7c19).
+Identical notifications in one transaction arrive once, so a bulk
+confirmation produces one per voyage rather than one per row.
+
+choice_intents, the table the public widget writes to, has no trigger: its
+inserts cost nothing extra while nobody watches the dashboard. Instead, only
+while an operator has an open stream in this worker, the broadcaster looks
+for that operator's new intents every LIVE_UPDATES_DEBOUNCE_MS (an indexed
+range scan on created_at over the last INTENT_POLL_OVERLAP_SECONDS).
+
+Each worker keeps one LISTEN connection, opened when its first stream starts.
+Notifications for operators without an open stream in this worker are
+dropped. For the others the broadcaster:
+  1. forwards the event (choice_confirmed, or intent_created for a polled
+     intent) straight away, with its voyage_id;
+  2. at most every LIVE_UPDATES_DEBOUNCE_MS, recomputes VoyageMetrics for
+     the touched voyages (the dashboard's own code, limited to those voyages)
+     and sends each row that changed as a "voyage" event.
+
+Intents expire with time, not with a write. For every voyage the broadcaster
+tracks the earliest expiry among its open intents and recomputes the voyage
+once that time passes, so expirations also arrive as "voyage" events.
+
+A "resync" event tells the client that updates may have been lost: its
+buffer overflowed or the LISTEN connection was re-established. The client
+should then reload GET /dashboard/voyages.
+
+A stream is authenticated once, when it opens, so it ends itself with an
+"expired" event when the access token expires, or when a check every
+AUTH_RECHECK_SECONDS finds the session gone (logged out, password changed,
+user deleted). The client reconnects with a fresh token.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.voyage_metrics import build_voyage_metrics
+from app.models.choice_intent import ChoiceIntent
+from app.models.voyage import Voyage
+from app.schemas.dashboard import VoyageMetrics
+
+CHANNEL = "pacectrl_dashboard"
+
+# Events the trigger sends; anything else on the channel is ignored
+NOTIFY_EVENTS = {"choice_confirmed"}
+
+# Comment line sent on idle streams so proxies keep the connection open
+KEEPALIVE_SECONDS = 15
+# Wait before reconnecting a failed LISTEN connection
+RECONNECT_SECONDS = 5
+# Reconnect hint for EventSource-style clients (milliseconds)
+CLIENT_RETRY_MS = 5000
+# How often an open stream checks that its user's session still exists
+AUTH_RECHECK_SECONDS = 60
+# Intent polls look back this far past the previous poll, for inserts that
+# committed after it with an earlier created_at
+INTENT_POLL_OVERLAP_SECONDS = 10
+
+
+def is_available() -> bool:
+    """Live updates need PostgreSQL (LISTEN/NOTIFY) and can be switched off."""
+    return settings.live_updates_enabled and engine.dialect.name == "postgresql"
+
+
+class _Subscriber:
+    """One open stream: a bounded queue of (event, data) items, None to close."""
+
+    def __init__(self, max_queued: int):
+        self.queue: "asyncio.Queue[Optional[Tuple[str, str]]]" = asyncio.Queue(max(max_queued, 1))
+
+    def send(self, event: str, data: str) -> None:
+        try:
+            self.queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            # Too far behind to catch up event by event: replace the backlog
+            # with a single request to reload
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(("resync", "{}"))
+
+    def close(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class _OperatorState:
+    """Streams of one operator in this worker and the voyages waiting for a recompute."""
+
+    def __init__(self):
+        self.subscribers: Set[_Subscriber] = set()
+        # Voyages touched since the last recompute
+        self.dirty: Set[int] = set()
+        # Earliest expires_at among each voyage's open intents (None: not loaded yet)
+        self.next_expiry: Optional[Dict[int, datetime]] = None
+        # Last VoyageMetrics sent per voyage, to skip unchanged rows
+        self.last_sent: Dict[int, VoyageMetrics] = {}
+        self.last_flush = 0.0
+        # Time of the last intent poll, and the intents (id -> voyage_id) it found
+        self.last_poll: Optional[datetime] = None
+        self.polled_intents: Dict[str, int] = {}
+
+    def send(self, event: str, data: str) -> None:
+        for subscriber in self.subscribers:
+            subscriber.send(event, data)
+        metrics.LIVE_UPDATE_EVENTS.labels(event).inc(len(self.subscribers))
+
+    def reset(self) -> None:
+        self.dirty.clear()
+        self.next_expiry = None
+        self.last_sent.clear()
+        self.last_poll = None
+        self.polled_intents = {}
+
+
+class DashboardBroadcaster:
+    """Fans out dashboard changes from the LISTEN connection to open streams, per operator."""
+
+    def __init__(self, debounce_ms: int, max_queued: int):
+        self._debounce = max(debounce_ms, 0) / 1000
+        self._max_queued = max_queued
+        self._operators: Dict[int, _OperatorState] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    async def stream(
+        self,
+        operator_id: int,
+        expires_at: float,
+        is_authorized: Callable[[], bool],
+    ) -> AsyncIterator[str]:
+        """
+        SSE body for one client; runs until the client disconnects or the worker
+        stops, or until *expires_at* (Unix time, the token's exp) passes or the
+        blocking *is_authorized* check fails.
+        """
+        subscriber = self._subscribe(operator_id)
+        try:
+            yield f"retry: {CLIENT_RETRY_MS}\n\n"
+            next_check = time.monotonic() + AUTH_RECHECK_SECONDS
+            while True:
+                remaining = expires_at - time.time()
+                if remaining > 0 and time.monotonic() >= next_check:
+                    if not await run_in_threadpool(is_authorized):
+                        remaining = 0
+                    next_check = time.monotonic() + AUTH_RECHECK_SECONDS
+                if remaining <= 0:
+                    yield "event: expired\ndata: {}\n\n"
+                    return
+                wait = min(KEEPALIVE_SECONDS, remaining, max(next_check - time.monotonic(), 0))
+                try:
+                    item = await asyncio.wait_for(subscriber.queue.get(), wait)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:
+                    return
+                event, data = item
+                yield f"event: {event}\ndata: {data}\n\n"
+        finally:
+            self._unsubscribe(operator_id, subscriber)
+
+    async def stop(self) -> None:
+        """End all streams and close the LISTEN connection (worker shutdown)."""
+        for state in self._operators.values():
+            for subscriber in state.subscribers:
+                subscriber.close()
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def _subscribe(self, operator_id: int) -> _Subscriber:
+        subscriber = _Subscriber(self._max_queued)
+        self._operators.setdefault(operator_id, _OperatorState()).subscribers.add(subscriber)
+        metrics.LIVE_UPDATE_STREAMS.inc()
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return subscriber
+
+    def _unsubscribe(self, operator_id: int, subscriber: _Subscriber) -> None:
+        metrics.LIVE_UPDATE_STREAMS.dec()
+        state = self._operators.get(operator_id)
+        if state is None:
+            return
+        state.subscribers.discard(subscriber)
+        if not state.subscribers:
+            del self._operators[operator_id]
+
+    async def _listen(self) -> None:
+        """Receive notifications and recompute touched or expiring voyages until cancelled."""
+        loop = asyncio.get_running_loop()
+        connected_before = False
+        while True:
+            try:
+                connection = await run_in_threadpool(_listen_connection)
+            except Exception as e:
+                print(f"Live updates: LISTEN connection failed: {e}")
+                await asyncio.sleep(RECONNECT_SECONDS)
+                continue
+
+            if connected_before:
+                # Notifications sent while disconnected are gone
+                for state in self._operators.values():
+                    state.reset()
+                    state.send("resync", "{}")
+            connected_before = True
+
+            readable = asyncio.Event()
+            loop.add_reader(connection.fileno(), readable.set)
+            try:
+                while True:
+                    try:
+                        await asyncio.wait_for(readable.wait(), timeout=max(self._debounce, 0.05))
+                    except asyncio.TimeoutError:
+                        pass
+                    readable.clear()
+                    # Reads what has arrived without blocking; raises if the connection is gone
+                    connection.poll()
+                    while connection.notifies:
+                        self._on_notify(connection.notifies.pop(0).payload)
+                    await self._flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Live updates: LISTEN connection lost: {e}")
+                await asyncio.sleep(RECONNECT_SECONDS)
+            finally:
+                loop.remove_reader(connection.fileno())
+                connection.close()
+
+    def _on_notify(self, payload: str) -> None:
+        try:
+            change = json.loads(payload)
+            operator_id, voyage_id, event = change["operator_id"], int(change["voyage_id"]), change["event"]
+        except (ValueError, KeyError, TypeError):
+            return
+        state = self._operators.get(operator_id)
+        if state is None or event not in NOTIFY_EVENTS:
+            return
+        state.send(event, json.dumps({"voyage_id": voyage_id}))
+        state.dirty.add(voyage_id)
+
+    async def _flush(self) -> None:
+        """Poll new intents, then recompute and send voyages that were touched or have intents that just expired."""
+        now_monotonic = time.monotonic()
+        now = datetime.now(timezone.utc)
+        for operator_id, state in list(self._operators.items()):
+            if now_monotonic - state.last_flush < self._debounce:
+                continue
+            state.last_flush = now_monotonic
+
+            await self._poll_intents(operator_id, state, now)
+            if state is not self._operators.get(operator_id):
+                continue
+
+            if state.next_expiry is None:
+                state.next_expiry = await run_in_threadpool(_load_next_expiry, operator_id, now)
+            due = {voyage_id for voyage_id, expires_at in state.next_expiry.items() if expires_at <= now}
+            voyage_ids = state.dirty | due
+            if not voyage_ids:
+                continue
+            state.dirty = set()
+
+            rows, next_expiry = await run_in_threadpool(_load_voyages, operator_id, voyage_ids, now)
+            if state is not self._operators.get(operator_id):
+                # All of the operator's streams closed meanwhile
+                continue
+            for voyage_id in voyage_ids:
+                state.next_expiry.pop(voyage_id, None)
+            state.next_expiry.update(next_expiry)
+            for row in rows:
+                if state.last_sent.get(row.voyage_id) != row:
+                    state.last_sent[row.voyage_id] = row
+                    state.send("voyage", row.model_dump_json())
+
+    async def _poll_intents(self, operator_id: int, state: _OperatorState, now: datetime) -> None:
+        """Send intent_created for intents of *operator_id* not seen by the previous poll."""
+        since = (state.last_poll or now) - timedelta(seconds=INTENT_POLL_OVERLAP_SECONDS)
+        intents = await run_in_threadpool(_load_recent_intents, operator_id, since)
+        first_poll = state.last_poll is None
+        state.last_poll = now
+        new_voyages = {
+            voyage_id for intent_id, voyage_id in intents.items() if intent_id not in state.polled_intents
+        }
+        # Each window covers everything of the previous one that can still matter
+        state.polled_intents = intents
+        if first_poll:
+            # Already part of what the client loaded when it opened the stream
+            return
+        for voyage_id in sorted(new_voyages):
+            state.send("intent_created", json.dumps({"voyage_id": voyage_id}))
+        state.dirty |= new_voyages
+
+
+def _listen_connection():
+    """A psycopg2 connection outside the pool, in autocommit mode, listening on CHANNEL."""
+    connection = engine.raw_connection()
+    connection.detach()
+    dbapi_connection = connection.dbapi_connection
+    dbapi_connection.autocommit = True
+    with dbapi_connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {CHANNEL}")
+    return dbapi_connection
+
+
+def _load_recent_intents(operator_id: int, since: datetime) -> Dict[str, int]:
+    """intent_id -> voyage_id of the operator's intents created after *since*."""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(ChoiceIntent.intent_id, ChoiceIntent.voyage_id)
+            .join(Voyage, Voyage.id == ChoiceIntent.voyage_id)
+            .where(Voyage.operator_id == operator_id, ChoiceIntent.created_at > since)
+        )
+        return {intent_id: voyage_id for intent_id, voyage_id in rows}
+    finally:
+        db.close()
+
+
+def _next_expiry(
+    db: Session,
+    operator_id: int,
+    voyage_ids: Optional[Iterable[int]],
+    now: datetime,
+) -> Dict[int, datetime]:
+    """Earliest future expires_at of unconsumed intents per voyage (all of the operator's if *voyage_ids* is None)."""
+    stmt = (
+        select(ChoiceIntent.voyage_id, func.min(ChoiceIntent.expires_at))
+        .join(Voyage, Voyage.id == ChoiceIntent.voyage_id)
+        .where(
+            Voyage.operator_id == operator_id,
+            ChoiceIntent.consumed_at.is_(None),
+            ChoiceIntent.expires_at > now,
+        )
+        .group_by(ChoiceIntent.voyage_id)
+    )
+    if voyage_ids is not None:
+        stmt = stmt.where(ChoiceIntent.voyage_id.in_(voyage_ids))
+    return {voyage_id: expires_at for voyage_id, expires_at in db.execute(stmt)}
+
+
+def _load_next_expiry(operator_id: int, now: datetime) -> Dict[int, datetime]:
+    db = SessionLocal()
+    try:
+        return _next_expiry(db, operator_id, None, now)
+    finally:
+        db.close()
+
+
+def _load_voyages(
+    operator_id: int,
+    voyage_ids: Set[int],
+    now: datetime,
+) -> Tuple[List[VoyageMetrics], Dict[int, datetime]]:
+    """VoyageMetrics and next intent expiry for some of an operator's voyages."""
+    db = SessionLocal()
+    try:
+        voyages = (
+            db.query(Voyage)
+            .filter(Voyage.operator_id == operator_id, Voyage.id.in_(voyage_ids))
+            .all()
+        )
+        if not voyages:
+            return [], {}
+        return (
+            build_voyage_metrics(db, operator_id, voyages, now),
+            _next_expiry(db, operator_id, [v.id for v in voyages], now),
+        )
+    finally:
+        db.close()
+
+
+broadcaster = DashboardBroadcaster(settings.live_updates_debounce_ms, settings.live_updates_max_queued)
@@ -0,0 +1,144 @@
+"""
+Which requests get an api_logs row, and per-minute counters for the rest.
+
+Requests are classified by route template and method:
+
+  operator_write  non-GET under /api/v1/operator   always logged
+  operator_read   GET under /api/v1/operator       API_LOG_OPERATOR_READ_SAMPLE_PCT
+  public_write    anything else that writes        API_LOG_PUBLIC_SAMPLE_PCT, aggregated
+  public_read     anything else (widget, health)   API_LOG_PUBLIC_SAMPLE_PCT, aggregated
+
+Server errors (5xx) are always logged. Public traffic is additionally
+counted per minute, route, method, voyage and status in an in-process
+buffer that is upserted into api_traffic_minutes every
+API_LOG_AGGREGATE_FLUSH_SECONDS, so public volume stays visible without a
+row per request.
+"""
+
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import UNMATCHED_ROUTE
+from app.models.api_traffic_minute import ApiTrafficMinute
+
+OPERATOR_PREFIX = "/api/v1/operator"
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+OPERATOR_WRITE = "operator_write"
+OPERATOR_READ = "operator_read"
+PUBLIC_WRITE = "public_write"
+PUBLIC_READ = "public_read"
+
+# (minute, method, route, voyage_id, status_code) -> [request_count, total_response_ms]
+TrafficKey = Tuple[datetime, str, str, int, int]
+
+# Distinct counters buffered per flush; past this, new keys are counted under
+# voyage_id 0 so the buffer (and the upsert) stays bounded
+MAX_TRAFFIC_KEYS = 10000
+# Rows per upsert statement (7 bind parameters each, Postgres allows 65535)
+WRITE_CHUNK_ROWS = 1000
+
+
+def classify(method: str, route: Optional[str]) -> str:
+    """Route class of a request from its method and matched route template."""
+    read = method in READ_METHODS
+    if route is not None and route.startswith(OPERATOR_PREFIX):
+        return OPERATOR_READ if read else OPERATOR_WRITE
+    return PUBLIC_READ if read else PUBLIC_WRITE
+
+
+def is_aggregated(route_class: str) -> bool:
+    return route_class in (PUBLIC_READ, PUBLIC_WRITE)
+
+
+def should_log(route_class: str, status_code: int) -> bool:
+    """Decide whether this request gets its own api_logs row."""
+    if route_class == OPERATOR_WRITE or status_code >= 500:
+        return True
+    if route_class == OPERATOR_READ:
+        pct = settings.api_log_operator_read_sample_pct
+    else:
+        pct = settings.api_log_public_sample_pct
+    return pct >= 100 or (pct > 0 and random.random() * 100 < pct)
+
+
+class TrafficAggregator:
+    """
+    Per-process buffer of per-minute request counters.
+
+    Only touched from the event loop, so no locking; drain() hands the
+    buffered counts off and starts a new buffer.
+    """
+
+    def __init__(self) -> None:
+        self._counts: Dict[TrafficKey, List[int]] = {}
+        self._last_flush = time.monotonic()
+
+    def record(self, method: str, route: Optional[str], voyage_id: Optional[int], status_code: int, response_ms: int) -> None:
+        minute = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        key = (minute, method, route or UNMATCHED_ROUTE, voyage_id or 0, status_code)
+        bucket = self._counts.get(key)
+        if bucket is None and len(self._counts) >= MAX_TRAFFIC_KEYS:
+            key = (minute, method, route or UNMATCHED_ROUTE, 0, status_code)
+            bucket = self._counts.get(key)
+        if bucket is None:
+            self._counts[key] = [1, response_ms]
+        else:
+            bucket[0] += 1
+            bucket[1] += response_ms
+
+    def due(self) -> bool:
+        return bool(self._counts) and time.monotonic() - self._last_flush >= settings.api_log_aggregate_flush_seconds
+
+    def drain(self) -> Dict[TrafficKey, List[int]]:
+        counts, self._counts = self._counts, {}
+        self._last_flush = time.monotonic()
+        return counts
+
+
+def write_traffic(counts: Dict[TrafficKey, List[int]]) -> None:
+    """Add buffered counters to api_traffic_minutes in chunked upserts (blocking; run in a thread)."""
+    if not counts:
+        return
+    rows = [
+        {
+            "minute": minute,
+            "method": method,
+            "route": route,
+            "voyage_id": voyage_id,
+            "status_code": status_code,
+            "request_count": request_count,
+            "total_response_ms": total_ms,
+        }
+        for (minute, method, route, voyage_id, status_code), (request_count, total_ms) in counts.items()
+    ]
+
+    db = SessionLocal()
+    try:
+        for start in range(0, len(rows), WRITE_CHUNK_ROWS):
+            stmt = pg_insert(ApiTrafficMinute).values(rows[start:start + WRITE_CHUNK_ROWS])
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_api_traffic_minutes_bucket",
+                set_={
+                    "request_count": ApiTrafficMinute.request_count + stmt.excluded.request_count,
+                    "total_response_ms": ApiTrafficMinute.total_response_ms + stmt.excluded.total_response_ms,
+                },
+            )
+            db.execute(stmt)
+        db.commit()
+    except Exception as e:
+        # Counters are best effort; don't fail the request that triggered the flush
+        print(f"Failed to write API traffic counters: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+# Process-wide buffer used by ApiLoggingMiddleware
+traffic = TrafficAggregator()
@@ -0,0 +1,232 @@
+"""
+Prometheus metrics for the API process, exposed at GET /metrics.
+
+Covers:
+  - request latency histograms and status counters per route template
+    (e.g. /api/v1/operator/voyages/{voyage_id}, never the raw path),
+  - in-flight requests,
+  - DB connection pool usage (via pool checkout/checkin events),
+  - cache lookups by result (hit ratio = hits / all lookups),
+  - api_logs inserts in progress,
+  - password hashing (bcrypt) jobs: pending, queue wait, duration, rejections,
+    and login attempts by outcome.
+
+Multiple uvicorn/gunicorn workers: set PROMETHEUS_MULTIPROC_DIR to an empty
+directory shared by the workers before they start. prometheus_client then
+keeps values in memory-mapped files and /metrics aggregates all workers
+(gauges are summed over live processes). Each worker marks itself dead on
+shutdown so its live gauges drop out of the sum. Without it, each worker
+reports only its own numbers.
+
+The endpoint is served only to scrapers that send METRICS_TOKEN as a bearer
+token; without METRICS_TOKEN it is off.
+
+The request path costs a perf_counter() pair, one dict lookup for the cached
+label children and a histogram observe, i.e. a few microseconds.
+"""
+
+import os
+import time
+from typing import Dict, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.routing import matched_route
+
+# Route label for requests that did not match any route (404s, scanners);
+# keeps arbitrary paths out of the label set
+UNMATCHED_ROUTE = "unmatched"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "pacectrl_http_request_duration_seconds",
+    "Request latency by route template.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "pacectrl_http_requests_total",
+    "Requests by route template and status class.",
+    ["method", "route", "status"],
+)
+IN_FLIGHT = Gauge(
+    "pacectrl_http_requests_in_flight",
+    "Requests currently being handled.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_SIZE = Gauge(
+    "pacectrl_db_pool_size",
+    "Configured DB connection pool size.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "pacectrl_db_pool_checked_out",
+    "DB connections currently checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+CACHE_LOOKUPS = Counter(
+    "pacectrl_cache_lookups_total",
+    "Cache lookups by cache and result (hit/miss).",
+    ["cache", "result"],
+)
+API_LOG_WRITES_IN_PROGRESS = Gauge(
+    "pacectrl_api_log_writes_in_progress",
+    "api_logs inserts currently running (one per logged request, not queued).",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_BUCKETS = (0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5, 5.0, 10.0)
+PASSWORD_HASH_PENDING = Gauge(
+    "pacectrl_password_hash_pending",
+    "Password hashing jobs running or waiting for a bcrypt thread.",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_WAIT = Histogram(
+    "pacectrl_password_hash_wait_seconds",
+    "Time password hashing jobs waited for a bcrypt thread.",
+    ["operation"],
+    buckets=PASSWORD_HASH_BUCKETS,
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "pacectrl_password_hash_duration_seconds",
+    "Time spent in bcrypt per job.",
+    ["operation"],
+    buckets=PASSWORD_HASH_BUCKETS,
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "pacectrl_password_hash_rejected_total",
+    "Password hashing jobs rejected because the queue was full.",
+)
+LOGIN_ATTEMPTS = Counter(
+    "pacectrl_login_attempts_total",
+    "Login attempts by result (success, failure, throttled, busy).",
+    ["result"],
+)
+LIVE_UPDATE_STREAMS = Gauge(
+    "pacectrl_live_update_streams",
+    "Open dashboard live update streams.",
+    multiprocess_mode="livesum",
+)
+LIVE_UPDATE_EVENTS = Counter(
+    "pacectrl_live_update_events_total",
+    "Events sent to dashboard live update streams, by event type.",
+    ["event"],
+)
+
+# Label children resolved once per (method, route[, status]); .labels() is
+# comparatively slow because it validates and hashes its arguments
+_latency_children: Dict[Tuple[str, str], object] = {}
+_request_children: Dict[Tuple[str, str, str], object] = {}
+
+
+def _status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+def observe_request(method: str, route: str, status_code: int, seconds: float) -> None:
+    key = (method, route)
+    latency = _latency_children.get(key)
+    if latency is None:
+        latency = _latency_children[key] = REQUEST_LATENCY.labels(method, route)
+    latency.observe(seconds)
+
+    status = _status_class(status_code)
+    counter_key = (method, route, status)
+    counter = _request_children.get(counter_key)
+    if counter is None:
+        counter = _request_children[counter_key] = REQUESTS.labels(method, route, status)
+    counter.inc()
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a lookup in *cache*."""
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and in-flight requests.
+
+    Reads the route template from the scope after the router has matched it,
+    so it must wrap the application (add it last, as the outermost middleware).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            route = matched_route(scope) or UNMATCHED_ROUTE
+            observe_request(scope["method"], route, status_code, time.perf_counter() - start)
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKED_OUT.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def _on_detach(dbapi_connection, connection_record):
+    # A detached connection (e.g. the live updates LISTEN connection) leaves
+    # the pool for good and is never checked in
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def instrument_pool(engine: Engine) -> None:
+    """Track pool size and checked-out connections for *engine* (idempotent)."""
+    if event.contains(engine, "checkout", _on_checkout):
+        return
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        DB_POOL_SIZE.set(size())
+    event.listen(engine, "checkout", _on_checkout)
+    event.listen(engine, "checkin", _on_checkin)
+    event.listen(engine, "detach", _on_detach)
+
+
+def mark_process_dead() -> None:
+    """
+    In multiprocess mode, drop this worker's live gauge files on shutdown.
+    Otherwise in-flight requests and pool checkouts of exited workers keep
+    being summed into every scrape.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Return (body, content type) for a scrape, aggregating workers in multiprocess mode."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,24 +1,32 @@
-import hashlib
-import re
 import time
 import uuid
+from typing import Optional
+
 from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware
 from sqlalchemy.orm import Session
 
-from app.core import security
+from app.core import db_metrics, log_policy, metrics, routing, security
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.api_log import ApiLog
 
 
-# Regex pattern to extract voyage_id from URL paths like /voyages/{voyage_id}/...
-VOYAGE_ID_PATTERN = re.compile(r"/voyages/(\d+)")
+# Paths polled by infrastructure that are not worth an api_logs row
+UNLOGGED_PATHS = {"/metrics"}
+
+# Largest value the Integer voyage_id columns can hold
+MAX_VOYAGE_ID = 2**31 - 1
 
 
 class ApiLoggingMiddleware(BaseHTTPMiddleware):
     """Middleware to log all API requests to the api_logs table."""
 
     async def dispatch(self, request: Request, call_next):
+        if request.url.path in UNLOGGED_PATHS:
+            return await call_next(request)
+
         # Generate unique request ID (UUID stored in DB)
         request_id = uuid.uuid4()
 
@@ -46,29 +54,32 @@ class ApiLoggingMiddleware(BaseHTTPMiddleware):
                 # Ignore token errors for logging; do not block the request
                 pass
 
-        # Extract voyage_id from URL path or query parameters
-        voyage_id = None
-        path = request.url.path
-
-        # First, try to extract from URL path (e.g., /voyages/123)
-        voyage_match = VOYAGE_ID_PATTERN.search(path)
-        if voyage_match:
-            voyage_id = int(voyage_match.group(1))
+        # Collect SQL statement stats for this request; the handler runs in a copy
+        # of this context, so the listeners update the same stats object
+        db_stats = db_metrics.start_request()
+        request.state.db_stats = db_stats
 
-        # If not found in path, check query parameters (e.g., ?voyage_id=123)
-        if voyage_id is None:
-            query_voyage_id = request.query_params.get("voyage_id")
-            if query_voyage_id and query_voyage_id.isdigit():
-                voyage_id = int(query_voyage_id)
+        # Call the next middleware/route handler
+        try:
+            response: Response = await call_next(request)
+        finally:
+            # Don't count the log insert below against the request
+            db_metrics.stop_request()
+
+        # DB timings reveal how much work a request caused (e.g. whether a
+        # login username exists), so only signed-in operators see them
+        if operator_id is not None or settings.server_timing_all_requests:
+            response.headers["Server-Timing"] = (
+                f'db;dur={db_stats.db_time_ms:.1f};desc="{db_stats.query_count} queries"'
+            )
 
-        # Don't store a voyage_id FK on DELETE requests — the voyage may no longer
-        # exist by the time we try to insert the log row, causing a FK violation.
-        # The path column already records which voyage was targeted.
-        if request.method == "DELETE":
-            voyage_id = None
+        # The router has matched the request by now: record the route template
+        # and take voyage_id from the path params instead of parsing the path
+        path = request.url.path
+        route = routing.matched_route(request.scope)
+        path_params = routing.path_params(request.scope)
 
-        # Call the next middleware/route handler
-        response: Response = await call_next(request)
+        voyage_id = _voyage_id(request, path_params)
 
         # Calculate response time in milliseconds
         end_time = time.time()
@@ -77,32 +88,152 @@ class ApiLoggingMiddleware(BaseHTTPMiddleware):
         # Extract details
         method = request.method
         status_code = response.status_code
-        user_agent = request.headers.get("user-agent")
-        client_ip = request.client.host if request.client else None
-        ip_hash = hashlib.sha256(client_ip.encode()).hexdigest() if client_ip else None
+
+        # Public traffic is counted per minute; only some requests get their own row
+        route_class = log_policy.classify(method, route)
+        if log_policy.is_aggregated(route_class):
+            log_policy.traffic.record(method, route, voyage_id, status_code, response_ms)
+            if log_policy.traffic.due():
+                await run_in_threadpool(log_policy.write_traffic, log_policy.traffic.drain())
+        if not log_policy.should_log(route_class, status_code):
+            return response
 
         # Log to database
-        db: Session = SessionLocal()
-        try:
-            log_entry = ApiLog(
+        write_api_log(
+            ApiLog(
                 request_id=request_id,
                 method=method,
                 path=path,
+                route=route,
+                path_params=path_params or None,
                 status_code=status_code,
                 response_ms=response_ms,
                 operator_id=operator_id,
                 user_id=user_id,
                 voyage_id=voyage_id,
-                ip_hash=ip_hash,
-                user_agent=user_agent,
-            )
-            db.add(log_entry)
-            db.commit()
-        except Exception as e:
-            # Log error but don't fail the request
-            print(f"Failed to log API request: {e}")
-            db.rollback()
+                ip_hash=_ip_hash(request),
+                user_agent=request.headers.get("user-agent"),
+            ),
+            db_stats,
+        )
+
+        return response
+
+
+class PublicTrafficMiddleware:
+    """
+    Pure ASGI counterpart of ApiLoggingMiddleware for the public-only app
+    (app.public_main).
+
+    Public requests carry no JWT and need no Server-Timing header, so this skips
+    both. Every request is counted in the per-minute traffic aggregate. Only
+    the requests the logging policy keeps (a sample, plus all 5xx) get an
+    api_logs row, which is written off the event loop.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in UNLOGGED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        db_stats = db_metrics.start_request()
+        start_time = time.time()
+        try:
+            await self.app(scope, receive, send_wrapper)
         finally:
-            db.close()
+            db_metrics.stop_request()
+            response_ms = int((time.time() - start_time) * 1000)
+            await self._record(scope, status_code, response_ms, db_stats)
 
-        return response
\ No newline at end of file
+    async def _record(self, scope, status_code: int, response_ms: int, db_stats) -> None:
+        request = Request(scope)
+        method = request.method
+        route = routing.matched_route(scope)
+        path_params = routing.path_params(scope)
+        voyage_id = _voyage_id(request, path_params)
+
+        route_class = log_policy.classify(method, route)
+        if log_policy.is_aggregated(route_class):
+            log_policy.traffic.record(method, route, voyage_id, status_code, response_ms)
+            if log_policy.traffic.due():
+                await run_in_threadpool(log_policy.write_traffic, log_policy.traffic.drain())
+        if not log_policy.should_log(route_class, status_code):
+            return
+
+        await run_in_threadpool(
+            write_api_log,
+            ApiLog(
+                request_id=uuid.uuid4(),
+                method=method,
+                path=request.url.path,
+                route=route,
+                path_params=path_params or None,
+                status_code=status_code,
+                response_ms=response_ms,
+                voyage_id=voyage_id,
+                ip_hash=_ip_hash(request),
+                user_agent=request.headers.get("user-agent"),
+            ),
+            db_stats,
+        )
+
+
+def _voyage_id(request: Request, path_params: dict) -> Optional[int]:
+    """
+    voyage_id set on request.state by handlers that looked the voyage up
+    (widget config, choice intents), else from the path of operator routes
+    (e.g. /voyages/{voyage_id}).
+
+    The query string is not used: anyone can put any digits in ?voyage_id=,
+    and an id that doesn't fit the Integer column fails the whole traffic
+    batch it is flushed with.
+    """
+    raw_voyage_id = getattr(request.state, "voyage_id", None)
+    if raw_voyage_id is None:
+        raw_voyage_id = path_params.get("voyage_id")
+
+    # Don't store a voyage_id FK on DELETE requests — the voyage may no longer
+    # exist by the time we try to insert the log row, causing a FK violation.
+    # The path column already records which voyage was targeted.
+    if request.method == "DELETE":
+        return None
+    if raw_voyage_id is not None and str(raw_voyage_id).isdigit():
+        voyage_id = int(raw_voyage_id)
+        if voyage_id <= MAX_VOYAGE_ID:
+            return voyage_id
+    return None
+
+
+def _ip_hash(request: Request) -> Optional[str]:
+    return security.hash_ip(security.client_ip(request))
+
+
+def write_api_log(log_entry: ApiLog, db_stats: db_metrics.RequestDbStats) -> None:
+    """Insert one api_logs row, with the request's SQL stats if enabled; never raises."""
+    metrics.API_LOG_WRITES_IN_PROGRESS.inc()
+    db: Session = SessionLocal()
+    try:
+        if settings.api_log_db_metrics:
+            log_entry.db_query_count = db_stats.query_count
+            log_entry.db_time_ms = int(db_stats.db_time_ms)
+            log_entry.slowest_query = db_stats.slowest_fingerprint
+        db.add(log_entry)
+        db.commit()
+    except Exception as e:
+        # Log error but don't fail the request
+        print(f"Failed to log API request: {e}")
+        db.rollback()
+    finally:
+        db.close()
+        metrics.API_LOG_WRITES_IN_PROGRESS.dec()
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Bounded executor for bcrypt (password checks on login, hashing on user
+create/update).
+
+bcrypt is deliberately slow (~100-300 ms of CPU per call). Run in request
+threads, a burst of logins or a credential-stuffing run fills FastAPI's
+threadpool and starves every other endpoint. Here all bcrypt work runs on
+PASSWORD_HASH_WORKERS dedicated threads, so it can never use more than that
+many cores. At most PASSWORD_HASH_MAX_QUEUED further jobs may wait. Beyond
+that, callers get 503 with Retry-After at once instead of piling up.
+
+The login handler awaits the job without holding a threadpool thread;
+synchronous handlers use the blocking variants.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+
+from app.core import metrics, security
+from app.core.config import settings
+
+# Suggested wait for clients turned away by a full queue (seconds)
+BUSY_RETRY_AFTER_SECONDS = 2
+
+
+class PasswordHasher:
+    """Runs hashing jobs on a fixed number of threads with a bounded queue."""
+
+    def __init__(self, workers: int, max_queued: int):
+        self._executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + max(max_queued, 0))
+
+    def submit(self, operation: str, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue *fn*; raises HTTP 503 when all threads are busy and the queue is full."""
+        if not self._slots.acquire(blocking=False):
+            metrics.PASSWORD_HASH_REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry shortly",
+                headers={"Retry-After": str(BUSY_RETRY_AFTER_SECONDS)},
+            )
+        metrics.PASSWORD_HASH_PENDING.inc()
+        queued_at = time.perf_counter()
+
+        def job():
+            started_at = time.perf_counter()
+            metrics.PASSWORD_HASH_WAIT.labels(operation).observe(started_at - queued_at)
+            try:
+                return fn(*args)
+            finally:
+                metrics.PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - started_at)
+
+        def release(_):
+            metrics.PASSWORD_HASH_PENDING.dec()
+            self._slots.release()
+
+        future = self._executor.submit(job)
+        future.add_done_callback(release)
+        return future
+
+
+hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_queued)
+
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    """Check a password on the bcrypt threads without blocking the event loop or a threadpool thread."""
+    return await asyncio.wrap_future(hasher.submit("verify", security.verify_password, password, password_hash))
+
+
+def hash_password_blocking(password: str) -> str:
+    """Hash a password on the bcrypt threads, waiting for the result (for sync handlers)."""
+    return hasher.submit("hash", security.hash_password, password).result()
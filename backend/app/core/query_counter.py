@@ -0,0 +1,57 @@
+"""
+Count SQL statements executed against an engine.
+
+Useful for guarding endpoints against N+1 regressions, e.g. in a test or
+a local script:
+
+    with count_queries() as counter:
+        client.get("/api/v1/public/widget/config?voyage_id=1")
+    assert counter.count <= QUERY_BUDGETS["GET /api/v1/public/widget/config"], counter.statements
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.database import engine as default_engine
+
+# Maximum statements per request for hot endpoints (excluding the ApiLog insert
+# written by the logging middleware). Raise a budget only with a good reason.
+QUERY_BUDGETS = {
+    # voyage + route + widget config, then estimates
+    "GET /api/v1/public/widget/config": 2,
+    # voyage check, lookup of the session's intent, insert/update (+ refresh)
+    "POST /api/v1/public/choice-intents/": 4,
+    # webhook operator lookup, single CTE confirmation (JWT auth adds user + operator lookups)
+    "POST /api/v1/operator/confirmed-choices/": 2,
+    # user lookup + fixed number of aggregates, independent of voyage count
+    "GET /api/v1/operator/dashboard/voyages": 12,
+}
+
+
+class QueryCounter:
+    """Collects the SQL statements executed while it is attached to an engine."""
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine: Optional[Engine] = None) -> Iterator[QueryCounter]:
+    """Count statements executed on *engine* (the app engine by default) inside the block."""
+    target = engine or default_engine
+    counter = QueryCounter()
+    event.listen(target, "before_cursor_execute", counter._before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(target, "before_cursor_execute", counter._before_cursor_execute)
@@ -0,0 +1,193 @@
+"""
+Token-bucket rate limiting for the public (unauthenticated) endpoints and
+operator login.
+
+Each limited route has a named scope ("choice_intents", "widget_config", ...)
+whose rule (sustained requests per minute + burst size) is read from
+Settings.  Buckets are keyed by the hashed client IP (the same value stored
+on ChoiceIntent.ip_hash; see security.client_ip for proxies) and, where it
+makes sense, by voyage_id.
+
+Two storage backends are supported:
+  - InMemoryRateLimitBackend (default): a bounded dict per worker process.
+    Cheap (one dict lookup and a little float maths per request) but each
+    uvicorn worker keeps its own counters.
+  - RedisRateLimitBackend: shared across workers/instances.  Enabled by
+    setting RATE_LIMIT_REDIS_URL; requires the optional `redis` package.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.security import client_ip, hash_ip
+
+
+class RateLimitRule(NamedTuple):
+    """Sustained rate (tokens refilled per minute) and bucket capacity."""
+
+    per_minute: int
+    burst: int
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.per_minute / 60.0
+
+
+class InMemoryRateLimitBackend:
+    """
+    Per-process token buckets stored in an LRU-bounded dict.
+
+    The LRU bound keeps memory flat when many distinct IPs hit the API;
+    evicting an idle bucket is harmless because a fresh bucket starts full,
+    which is the same state an idle bucket would have refilled to anyway.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_keys = max_keys
+
+    def hit(self, key: str, rule: RateLimitRule) -> float:
+        """
+        Consume one token from the bucket for *key*.
+
+        Returns 0 when the request is allowed, otherwise the number of
+        seconds until a token becomes available.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (float(rule.burst), now))
+            tokens = min(float(rule.burst), tokens + (now - updated_at) * rule.refill_per_second)
+
+            if tokens >= 1.0:
+                retry_after = 0.0
+                tokens -= 1.0
+            else:
+                retry_after = (1.0 - tokens) / rule.refill_per_second
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+
+        return retry_after
+
+    def reset(self) -> None:
+        """Drop all buckets (useful for tests and local development)."""
+        with self._lock:
+            self._buckets.clear()
+
+
+# Atomic token bucket in Redis: KEYS[1] = bucket key,
+# ARGV = capacity, refill rate per second, current time (seconds).
+_REDIS_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimitBackend:
+    """Token buckets shared by all workers through a Redis server."""
+
+    def __init__(self, url: str):
+        try:
+            import redis  # Optional dependency, only needed for the shared backend
+        except ImportError as exc:
+            raise RuntimeError(
+                "RATE_LIMIT_REDIS_URL is set but the 'redis' package is not installed"
+            ) from exc
+
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET_SCRIPT)
+
+    def hit(self, key: str, rule: RateLimitRule) -> float:
+        result = self._script(
+            keys=[f"pacectrl:ratelimit:{key}"],
+            args=[rule.burst, rule.refill_per_second, time.time()],
+        )
+        return float(result)
+
+    def reset(self) -> None:
+        for key in self._client.scan_iter("pacectrl:ratelimit:*"):
+            self._client.delete(key)
+
+
+def _build_backend():
+    if settings.rate_limit_redis_url:
+        return RedisRateLimitBackend(settings.rate_limit_redis_url)
+    return InMemoryRateLimitBackend(max_keys=settings.rate_limit_max_keys)
+
+
+# Module-level backend shared by all limited routes in this process.
+backend = _build_backend()
+
+
+def get_rule(scope: str) -> Optional[RateLimitRule]:
+    """Return the configured rule for *scope*, or None if limiting is disabled for it."""
+    rules: Dict[str, Tuple[int, int]] = settings.get_rate_limit_rules()
+    configured = rules.get(scope)
+    if not settings.rate_limit_enabled or configured is None:
+        return None
+    per_minute, burst = configured
+    if per_minute <= 0:
+        return None
+    return RateLimitRule(per_minute=per_minute, burst=max(burst, 1))
+
+
+def enforce_rate_limit(scope: str, key: str) -> None:
+    """
+    Consume a token for (*scope*, *key*) and raise HTTP 429 when the bucket is empty.
+
+    The Retry-After header is rounded up to whole seconds as required by RFC 9110.
+    """
+    rule = get_rule(scope)
+    if rule is None:
+        return
+
+    try:
+        retry_after = backend.hit(f"{scope}:{key}", rule)
+    except Exception as e:
+        # A broken shared backend must never take the public API down with it.
+        print(f"Rate limit backend error: {e}")
+        return
+
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please slow down",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def rate_limit_by_ip(scope: str) -> Callable[[Request], None]:
+    """
+    Build a FastAPI dependency that limits requests per hashed client IP.
+
+    Usage:
+        @router.post("/", dependencies=[Depends(rate_limit_by_ip("choice_intents"))])
+    """
+
+    def dependency(request: Request) -> None:
+        enforce_rate_limit(scope, hash_ip(client_ip(request)) or "unknown")
+
+    return dependency
@@ -0,0 +1,34 @@
+"""
+Column-only read path for list endpoints.
+
+db.query(Model).all() builds a full ORM instance per row (identity map entry,
+instance state, instrumented attributes) only for it to be serialized and
+dropped at the end of the request. For listings we instead select just the
+columns the response schema exposes; SQLAlchemy returns them as Row objects
+(compact tuples with attribute access), which the schema validates from
+attributes like it would an ORM instance. Columns the schema does not expose
+(e.g. users.password_hash) are never fetched.
+"""
+
+from typing import Any, List, Type
+
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+
+def schema_columns(model: Any, schema: Type[BaseModel]) -> List[Any]:
+    """The model's table columns that the schema has fields for, in table order."""
+    fields = schema.model_fields
+    return [column for column in model.__table__.columns if column.name in fields]
+
+
+def select_for(model: Any, schema: Type[BaseModel], *extra: Any) -> Select:
+    """select() of the columns backing *schema*, plus extra labeled expressions."""
+    return select(*schema_columns(model, schema), *extra)
+
+
+def fetch_rows(db: Session, stmt: Select) -> List[Row]:
+    """Execute a Core select and return plain rows (no ORM instances)."""
+    return db.execute(stmt).all()
@@ -0,0 +1,170 @@
+"""
+Rotating refresh tokens for portal sessions.
+
+Login issues a refresh token next to the short-lived access token. When the
+access token expires, the portal calls /auth/refresh, which costs a SHA-256
+and four indexed statements, with no bcrypt:
+  1. Look up the SHA-256 of the presented token.
+  2. Claim it with a conditional UPDATE (only one concurrent refresh wins).
+  3. Load its user.
+  4. Insert the successor in the same family.
+
+A token that was already rotated and is presented again, after
+REUSE_GRACE_SECONDS, was most likely stolen. The whole family (that login
+session) is revoked, and both the thief and the user must log in again.
+Within the grace period a repeat is simply refused. That covers two tabs
+refreshing at the same moment.
+
+Rows are pruned at login (prune()): expired tokens, and every token of a
+session that has no usable token left (logged out or revoked). Rotated
+tokens of a live session are kept until they expire, for reuse detection.
+"""
+
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, exists, or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+# A rotated token presented again within this many seconds is refused without
+# revoking its family (concurrent refreshes from the same session)
+REUSE_GRACE_SECONDS = 30
+
+
+def _hash(token: str) -> str:
+    # High-entropy random token, so a fast hash is enough (as for webhook secrets)
+    return sha256(token.encode("utf-8")).hexdigest()
+
+
+def _invalid(detail: str = "Invalid refresh token") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def issue(db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+    """Add a new refresh token for *user_id* (a new family unless given); the caller commits."""
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        family_id=family_id or uuid.uuid4().hex,
+        token_hash=_hash(token),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days),
+    ))
+    return token
+
+
+def rotate(db: Session, token: str) -> Tuple[User, str]:
+    """
+    Exchange *token* for its successor; returns (user, new refresh token).
+
+    Raises 401 for unknown, expired or already used tokens.
+    """
+    now = datetime.now(timezone.utc)
+    row = db.execute(
+        select(
+            RefreshToken.id,
+            RefreshToken.user_id,
+            RefreshToken.family_id,
+            RefreshToken.revoked_at.is_not(None).label("revoked"),
+            (RefreshToken.revoked_at > now - timedelta(seconds=REUSE_GRACE_SECONDS)).label("recently_revoked"),
+        ).where(RefreshToken.token_hash == _hash(token))
+    ).first()
+    if row is None:
+        raise _invalid()
+
+    if row.revoked:
+        if not row.recently_revoked:
+            revoke_family(db, row.family_id)
+            db.commit()
+        raise _invalid()
+
+    # Claim the token; only one of several concurrent refreshes can win
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.id == row.id,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(revoked_at=now)
+    ).rowcount
+    user = db.get(User, row.user_id) if claimed else None
+    if user is None:
+        db.rollback()
+        raise _invalid("Refresh token expired or already used")
+
+    new_token = issue(db, user.id, row.family_id)
+    db.commit()
+    return user, new_token
+
+
+def revoke(db: Session, token: str) -> None:
+    """Revoke the session (family) *token* belongs to, e.g. on logout; unknown tokens are ignored."""
+    family_id = db.execute(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == _hash(token))
+    ).scalar()
+    if family_id is not None:
+        revoke_family(db, family_id)
+        db.commit()
+
+
+def revoke_family(db: Session, family_id: str) -> None:
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+
+def has_active_session(db: Session, user_id: int) -> bool:
+    """Return True if *user_id* still holds a usable refresh token (is logged in somewhere)."""
+    now = datetime.now(timezone.utc)
+    return db.execute(
+        select(
+            exists().where(
+                RefreshToken.user_id == user_id,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+        )
+    ).scalar()
+
+
+def revoke_all_for_user(db: Session, user_id: int) -> None:
+    """Revoke every session of a user (e.g. after a password change); the caller commits."""
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+
+def prune(db: Session) -> None:
+    """Delete expired tokens and those of sessions with no usable token left; the caller commits."""
+    now = datetime.now(timezone.utc)
+    live = aliased(RefreshToken)
+    db.execute(
+        delete(RefreshToken)
+        .where(
+            or_(
+                RefreshToken.expires_at <= now,
+                ~exists().where(
+                    live.family_id == RefreshToken.family_id,
+                    live.revoked_at.is_(None),
+                    live.expires_at > now,
+                ),
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
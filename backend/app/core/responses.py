@@ -0,0 +1,110 @@
+"""
+Fast JSON serialization for responses.
+
+FastAPI's default path validates a handler's return value against its
+response_model, converts it to JSON-compatible Python objects and then runs
+json.dumps over those. For large or hot payloads each step shows up in
+profiles. This module offers cheaper routes for handlers that opt in,
+while they keep their response_model for OpenAPI docs (all other handlers
+use FastAPI's default JSONResponse and stay validated):
+
+  - FastJSONResponse(content=...) returned directly: for plain dicts the
+    handler built itself in the schema's shape. Renders with orjson and
+    skips response_model validation entirely.
+  - ModelSerializer(T).response(data): validates ORM rows once (from
+    attributes) and dumps them to JSON bytes in pydantic-core, with no
+    intermediate dicts.
+  - ModelSerializer(T).response(obj, trusted=True): for schema instances the
+    handler already built; serialized without validating them again.
+
+DuplexStreamingResponse streams a response that is produced while the
+request body is still being read (NDJSON bulk uploads).
+"""
+
+from decimal import Decimal
+from functools import cached_property
+from typing import Any, Mapping, Optional
+
+import orjson
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import TypeAdapter
+from starlette.requests import ClientDisconnect
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    # numpy scalars; checked by module so numpy is not imported just for this
+    if type(obj).__module__ == "numpy":
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class ModelSerializer:
+    """
+    Serializer for a response type (a schema, List[schema], ...), declared once
+    per module so the pydantic-core validator/serializer is reused. The schema
+    is built on first use rather than at import, to keep startup fast.
+    """
+
+    def __init__(self, tp: Any) -> None:
+        self._type = tp
+
+    @cached_property
+    def _adapter(self) -> TypeAdapter:
+        return TypeAdapter(self._type)
+
+    def response(
+        self,
+        data: Any,
+        *,
+        trusted: bool = False,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Response:
+        """
+        JSON response for *data*.
+
+        Unless *trusted*, data (e.g. ORM rows) is validated into the schema first;
+        trusted data must already be instances of it.
+        """
+        value = data if trusted else self._adapter.validate_python(data, from_attributes=True)
+        return Response(
+            content=self._adapter.dump_json(value),
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json",
+        )
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for body iterators that read request.stream() themselves.
+
+    StreamingResponse watches for client disconnects by calling receive()
+    alongside the body iterator, which takes the request body messages away
+    from it. Here the iterator is the only reader; a disconnect surfaces as
+    ClientDisconnect from request.stream().
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,40 @@
+"""
+Route template of a handled request, read from the ASGI scope.
+
+After the router has matched a request, scope["route"] is the matched route
+and scope["path_params"] its parsed parameters, so middleware can label a
+request with e.g. /api/v1/operator/voyages/{voyage_id} instead of the raw
+path. There are only as many templates as routes, which makes the template
+a cheap, low-cardinality key for logs and metrics.
+"""
+
+import sys
+from typing import Any, Dict, Optional
+
+# Templates seen so far, so every request for a route shares one string object
+_interned: Dict[str, str] = {}
+
+
+def matched_route(scope) -> Optional[str]:
+    """Full route template matched for this request, or None if no route matched."""
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return None
+
+    # Depending on the FastAPI version, routes from include_router(prefix=...) may
+    # report their path without the prefix; restore it from the request path.
+    # Prefixes are static, so the leading extra segments are the prefix itself.
+    path = scope["path"]
+    extra = path.rstrip("/").count("/") - template.rstrip("/").count("/")
+    if extra > 0:
+        template = "/".join(path.split("/", extra + 1)[:extra + 1]) + template
+
+    interned = _interned.get(template)
+    if interned is None:
+        interned = _interned[template] = sys.intern(template)
+    return interned
+
+
+def path_params(scope) -> Dict[str, Any]:
+    """Path parameters parsed by the router (empty if no route matched)."""
+    return scope.get("path_params") or {}
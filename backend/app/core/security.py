@@ -1,13 +1,23 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from hashlib import sha256
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 import bcrypt
 import jwt
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
 
+from app.core import metrics
 from app.core.config import settings
 
+logger = logging.getLogger("pacectrl.security")
+
+# Set once the "X-Forwarded-For ignored" warning has been logged
+_warned_untrusted_forwarded_for = False
+
 
 def hash_password(password: str) -> str:
     """Hash a plain-text password using bcrypt."""
@@ -36,6 +46,48 @@ def verify_webhook_secret(plain: str, stored_hash: str) -> bool:
     return sha256(plain.encode("utf-8")).hexdigest() == stored_hash
 
 
+def client_ip(request: Request) -> Optional[str]:
+    """
+    Address of the client, taking TRUSTED_PROXY_HOPS proxies into account.
+
+    Each trusted proxy appends the address it received the request from to
+    X-Forwarded-For, so the client is the entry that many places from the
+    right. Entries further left are supplied by the client and not trusted.
+    """
+    hops = settings.trusted_proxy_hops
+    if hops > 0:
+        forwarded = [
+            entry.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for entry in header.split(",")
+            if entry.strip()
+        ]
+        if forwarded:
+            return forwarded[-min(hops, len(forwarded))]
+    elif "x-forwarded-for" in request.headers:
+        _warn_untrusted_forwarded_for()
+    return request.client.host if request.client else None
+
+
+def _warn_untrusted_forwarded_for() -> None:
+    # Behind a proxy with TRUSTED_PROXY_HOPS=0 every client shares the proxy's
+    # address, i.e. one rate limit bucket. Say so once per worker.
+    global _warned_untrusted_forwarded_for
+    if not _warned_untrusted_forwarded_for:
+        _warned_untrusted_forwarded_for = True
+        logger.warning(
+            "X-Forwarded-For received but TRUSTED_PROXY_HOPS is 0: rate limits and "
+            "ip_hash use the proxy's address for every client"
+        )
+
+
+def hash_ip(ip: Optional[str]) -> Optional[str]:
+    """Hash the client IP so it can be stored/keyed without keeping the raw address; None if missing."""
+    if not ip:
+        return None
+    return sha256(ip.encode("utf-8")).hexdigest()
+
+
 def create_access_token(
     *,
     subject: int,
@@ -58,9 +110,71 @@ def create_access_token(
     return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.algorithm)
 
 
+class VerifiedTokenCache:
+    """
+    LRU-bounded map of SHA-256(token) -> (claims, exp) for tokens whose
+    signature has already been verified.
+
+    The portal polls several endpoints per minute with the same bearer token,
+    and each request decodes it twice (ApiLoggingMiddleware and
+    get_current_user). Access tokens cannot be revoked before they expire, so
+    reusing the verified claims until `exp` changes nothing. Only valid tokens
+    are stored; invalid ones are re-checked (and rejected) every time.
+    """
+
+    def __init__(self, max_entries: int):
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Claims for *key*, or None if not cached or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            claims, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return claims
+
+    def put(self, key: bytes, claims: Dict[str, Any]) -> None:
+        expires_at = claims.get("exp")
+        if self._max_entries <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        with self._lock:
+            self._entries[key] = (claims, float(expires_at))
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries (useful for tests and local development)."""
+        with self._lock:
+            self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache(settings.jwt_cache_size)
+
+
 def decode_access_token(token: str) -> Dict[str, Any]:
-    """Decode and validate a JWT access token."""
+    """Decode and validate a JWT access token (cached per worker until it expires)."""
+
+    key = sha256(token.encode("utf-8")).digest()
+    claims = verified_tokens.get(key)
+    metrics.record_cache("jwt", claims is not None)
+    if claims is not None:
+        # Callers get their own copy; the cached claims stay untouched
+        return dict(claims)
+
+    claims = _verify_access_token(token)
+    verified_tokens.put(key, claims)
+    return dict(claims)
+
 
+def _verify_access_token(token: str) -> Dict[str, Any]:
     try:
         return jwt.decode(
             token,
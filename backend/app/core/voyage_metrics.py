@@ -0,0 +1,170 @@
+"""
+Per-voyage intent and confirmed-choice statistics (VoyageMetrics).
+
+Used by GET /dashboard/voyages for all of an operator's voyages, and by the
+live updates stream (app.core.live_updates) for just the voyages that changed.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from app.models.choice_intent import ChoiceIntent
+from app.models.confirmed_choice import ConfirmedChoice
+from app.models.route import Route
+from app.models.ship import Ship
+from app.models.voyage import Voyage
+from app.schemas.dashboard import VoyageMetrics
+
+
+def build_voyage_metrics(
+    db: Session,
+    operator_id: int,
+    voyages: List[Voyage],
+    now: datetime,
+) -> List[VoyageMetrics]:
+    """Intent counts and confirmed-choice statistics for *voyages*, in the same order."""
+    voyage_ids = [v.id for v in voyages]
+
+    # Pre-load routes and ships into dicts so we can look them up per-voyage
+    # without hitting the database again inside the loop below.
+    route_map: Dict[int, Route] = {
+        r.id: r for r in db.query(Route).filter(Route.operator_id == operator_id).all()
+    }
+    ship_map: Dict[int, Ship] = {
+        s.id: s for s in db.query(Ship).filter(Ship.operator_id == operator_id).all()
+    }
+
+    # --- Intent aggregates (one row per voyage) ---
+    # We count intents grouped into three buckets using CASE expressions:
+    #   active   = not consumed AND not yet expired
+    #   consumed = has a consumed_at timestamp
+    #   expired  = not consumed AND expires_at is in the past
+    intent_agg_rows = []
+    if voyage_ids:
+        intent_agg_rows = (
+            db.query(
+                ChoiceIntent.voyage_id,
+                func.count().label("total_intents"),
+                func.sum(
+                    case(
+                        (
+                            and_(
+                                ChoiceIntent.consumed_at.is_(None),
+                                ChoiceIntent.expires_at > now,
+                            ),
+                            1,
+                        ),
+                        else_=0,
+                    )
+                ).label("active_intents"),
+                func.sum(
+                    case(
+                        (ChoiceIntent.consumed_at.isnot(None), 1),
+                        else_=0,
+                    )
+                ).label("consumed_intents"),
+                func.sum(
+                    case(
+                        (
+                            and_(
+                                ChoiceIntent.consumed_at.is_(None),
+                                ChoiceIntent.expires_at <= now,
+                            ),
+                            1,
+                        ),
+                        else_=0,
+                    )
+                ).label("expired_intents"),
+            )
+            .filter(ChoiceIntent.voyage_id.in_(voyage_ids))
+            .group_by(ChoiceIntent.voyage_id)
+            .all()
+        )
+
+    intent_by_voyage: Dict[int, object] = {row.voyage_id: row for row in intent_agg_rows}
+
+    # --- Confirmed-choice aggregates (one row per voyage) ---
+    cc_agg_rows = []
+    if voyage_ids:
+        cc_agg_rows = (
+            db.query(
+                ConfirmedChoice.voyage_id,
+                func.count().label("confirmed_choices_count"),
+                func.avg(ConfirmedChoice.delta_pct_from_standard).label("avg_delta_pct"),
+                func.percentile_cont(0.5)
+                .within_group(ConfirmedChoice.delta_pct_from_standard.asc())
+                .label("median_delta_pct"),
+                func.min(ConfirmedChoice.delta_pct_from_standard).label("min_delta_pct"),
+                func.max(ConfirmedChoice.delta_pct_from_standard).label("max_delta_pct"),
+                func.avg(ConfirmedChoice.slider_value).label("avg_slider_value"),
+                func.sum(ConfirmedChoice.projected_co2_saved_kg).label("projected_co2_saved_kg"),
+            )
+            .filter(ConfirmedChoice.voyage_id.in_(voyage_ids))
+            .group_by(ConfirmedChoice.voyage_id)
+            .all()
+        )
+
+    cc_by_voyage: Dict[int, object] = {row.voyage_id: row for row in cc_agg_rows}
+
+    # --- Assemble per-voyage metrics ---
+    voyage_metrics: List[VoyageMetrics] = []
+    for v in voyages:
+        route = route_map.get(v.route_id)
+        ship = ship_map.get(v.ship_id)
+        intents = intent_by_voyage.get(v.id)
+        cc = cc_by_voyage.get(v.id)
+
+        # Combine voyage date with route time to get full datetimes
+        departure_datetime = (
+            datetime.combine(v.departure_date, route.departure_time)
+            if route else datetime(v.departure_date.year, v.departure_date.month, v.departure_date.day)
+        )
+        arrival_datetime = (
+            datetime.combine(v.arrival_date, route.arrival_time)
+            if route else datetime(v.arrival_date.year, v.arrival_date.month, v.arrival_date.day)
+        )
+
+        # Calculate the average voted arrival time.
+        # Passengers vote on a speed change % (delta_pct). Since distance is fixed,
+        # travel time is inversely proportional to speed:
+        #   new_duration = standard_duration / (1 + delta_pct / 100)
+        # A negative delta means slower speed → later arrival.
+        voted_arrival_datetime: Optional[datetime] = None
+        avg_delta_pct_for_voyage = float(cc.avg_delta_pct) if cc and cc.avg_delta_pct is not None else None
+        if avg_delta_pct_for_voyage is not None:
+            standard_duration = arrival_datetime - departure_datetime
+            speed_factor = 1 + avg_delta_pct_for_voyage / 100
+            if speed_factor > 0:
+                voted_duration = standard_duration / speed_factor
+                voted_arrival_datetime = departure_datetime + voted_duration
+
+        voyage_metrics.append(
+            VoyageMetrics(
+                voyage_id=v.id,
+                external_trip_id=v.external_trip_id,
+                status=v.status,
+                route_name=route.name if route else "",
+                departure_port=route.departure_port if route else "",
+                arrival_port=route.arrival_port if route else "",
+                ship_name=ship.name if ship else "",
+                departure_datetime=departure_datetime,
+                arrival_datetime=arrival_datetime,
+                voted_arrival_datetime=voted_arrival_datetime,
+                total_intents=int(intents.total_intents) if intents else 0,
+                active_intents=int(intents.active_intents) if intents else 0,
+                consumed_intents=int(intents.consumed_intents) if intents else 0,
+                expired_intents=int(intents.expired_intents) if intents else 0,
+                confirmed_choices_count=int(cc.confirmed_choices_count) if cc else 0,
+                avg_delta_pct=avg_delta_pct_for_voyage,
+                median_delta_pct=float(cc.median_delta_pct) if cc and cc.median_delta_pct is not None else None,
+                min_delta_pct=float(cc.min_delta_pct) if cc and cc.min_delta_pct is not None else None,
+                max_delta_pct=float(cc.max_delta_pct) if cc and cc.max_delta_pct is not None else None,
+                avg_slider_value=float(cc.avg_slider_value) if cc and cc.avg_slider_value is not None else None,
+                projected_co2_saved_kg=float(cc.projected_co2_saved_kg) if cc and cc.projected_co2_saved_kg is not None else None,
+            )
+        )
+
+    return voyage_metrics
@@ -0,0 +1,122 @@
+"""
+In-memory, precompressed copy of the embeddable widget bundle (widget/dist/widget.js).
+
+The bundle is read once (at startup, or on a later request if it was built
+after startup), and gzip and brotli variants are compressed up front, so
+serving it costs no disk I/O or compression per request. While the bundle is
+missing, the disk is checked at most every MISSING_BUNDLE_RECHECK_SECONDS.
+Each variant has a strong ETag derived from the content hash; the same hash
+fingerprints the immutable /widget.<hash>.js URL handed to embeds.
+
+Brotli comes from the `brotli` package (in requirements.txt); if it is not
+installed only gzip and identity are offered.
+"""
+
+import gzip
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[3]
+WIDGET_BUNDLE_PATH = _PROJECT_ROOT / "widget" / "dist" / "widget.js"
+
+# Characters of the SHA-256 hex digest used for the ETag and URL fingerprint
+FINGERPRINT_LENGTH = 16
+
+# How often requests look for a bundle that was missing on the last check
+MISSING_BUNDLE_RECHECK_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class WidgetBundle:
+    fingerprint: str
+    # content-coding ("identity", "gzip", "br") -> (body, etag)
+    variants: Dict[str, Tuple[bytes, str]]
+
+    @property
+    def etags(self) -> Tuple[str, ...]:
+        return tuple(etag for _, etag in self.variants.values())
+
+    def negotiate(self, accept_encoding: Optional[str]) -> str:
+        """Pick the smallest variant the client accepts: br, then gzip, then identity."""
+        accepted = _parse_accept_encoding(accept_encoding or "")
+        for coding in ("br", "gzip"):
+            if coding in self.variants and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+                return coding
+        return "identity"
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map content-codings to their q-values (default 1)."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def build_bundle(raw: bytes) -> WidgetBundle:
+    fingerprint = hashlib.sha256(raw).hexdigest()[:FINGERPRINT_LENGTH]
+    variants = {"identity": (raw, f'"{fingerprint}"')}
+
+    # mtime=0 keeps the gzip output identical across restarts and workers
+    gzipped = gzip.compress(raw, compresslevel=9, mtime=0)
+    if len(gzipped) < len(raw):
+        variants["gzip"] = (gzipped, f'"{fingerprint}-gzip"')
+    if brotli is not None:
+        compressed = brotli.compress(raw, mode=brotli.MODE_TEXT, quality=11)
+        if len(compressed) < len(raw):
+            variants["br"] = (compressed, f'"{fingerprint}-br"')
+
+    return WidgetBundle(fingerprint=fingerprint, variants=variants)
+
+
+_bundle: Optional[WidgetBundle] = None
+# time.monotonic() of the last load() that found no bundle
+_missing_since_check: Optional[float] = None
+_lock = threading.Lock()
+
+
+def load() -> Optional[WidgetBundle]:
+    """(Re)load the bundle from disk; returns None if it has not been built."""
+    global _bundle, _missing_since_check
+    with _lock:
+        if not WIDGET_BUNDLE_PATH.exists():
+            _missing_since_check = time.monotonic()
+            return None
+        _bundle = build_bundle(WIDGET_BUNDLE_PATH.read_bytes())
+        _missing_since_check = None
+        return _bundle
+
+
+def get() -> Optional[WidgetBundle]:
+    """The loaded bundle, loading it on first use (a miss is remembered for a while)."""
+    if _bundle is not None:
+        return _bundle
+    checked = _missing_since_check
+    if checked is not None and time.monotonic() - checked < MISSING_BUNDLE_RECHECK_SECONDS:
+        return None
+    return load()
+
+
+def fingerprinted_path() -> str:
+    """Path to embed: /widget.<hash>.js when the bundle is available, else /widget.js."""
+    bundle = get()
+    return f"/widget.{bundle.fingerprint}.js" if bundle else "/widget.js"
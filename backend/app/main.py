@@ -1,89 +1,89 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from starlette.requests import Request
+import gc
 
-from app.core.database import Base, engine
-from app.core.middleware import ApiLoggingMiddleware
-from app.core.config import settings
-from app.api.operator.auth import router as auth_router
-from app.api.operator.operators import router as operators_router
-from app.api.operator.users import router as users_router
-from app.api.operator.voyages import router as voyages_router
-from app.api.operator.speed_estimates import router as speed_estimates_router
-from app.api.operator.widget_configs import router as widget_configs_router
-from app.api.operator.choice_intents import router as choice_intents_router
-from app.api.operator.confirmed_choices import router as confirmed_choices_router
-from app.api.operator.ships import router as ships_router
-from app.api.operator.routes import router as routes_router
-from app.api.public.widget import router as public_widget_router
-from app.api.public.choice_intents import router as public_choice_intents_router
-from app.api.public.widget_assets import router as widget_assets_router
-from app.api.operator.dashboard import router as dashboard_router
-from app.api.operator.audit_logs import router as audit_logs_router
-from app.api.operator.voyage_creation_rules import router as voyage_creation_rules_router
+# Building the app allocates a few hundred thousand long-lived objects
+# (modules, routes, schemas). Pause the cyclic GC until it is done instead of
+# repeatedly scanning them. The finally block below turns it back on even if
+# building fails, so an importer that survives the error keeps a working GC.
+gc.disable()
+try:
+    from fastapi import FastAPI
 
+    from app.core import db_metrics, live_updates, metrics
+    from app.core.application import add_common_handlers, add_cors
+    from app.core.database import Base, engine
+    from app.core.middleware import ApiLoggingMiddleware
+    from app.api.operator.auth import router as auth_router
+    from app.api.operator.operators import router as operators_router
+    from app.api.operator.users import router as users_router
+    from app.api.operator.voyages import router as voyages_router
+    from app.api.operator.speed_estimates import router as speed_estimates_router
+    from app.api.operator.widget_configs import router as widget_configs_router
+    from app.api.operator.choice_intents import router as choice_intents_router
+    from app.api.operator.confirmed_choices import router as confirmed_choices_router
+    from app.api.operator.ships import router as ships_router
+    from app.api.operator.routes import router as routes_router
+    from app.api.public.widget import router as public_widget_router
+    from app.api.public.choice_intents import router as public_choice_intents_router
+    from app.api.public.widget_assets import router as widget_assets_router
+    from app.api.operator.dashboard import router as dashboard_router
+    from app.api.operator.audit_logs import router as audit_logs_router
+    from app.api.operator.voyage_creation_rules import router as voyage_creation_rules_router
+    from app.api.operator.analytics_exports import router as analytics_exports_router
 
+    # Initialize FastAPI application
+    app = FastAPI(title="PaceCtrl API")
 
-# Initialize FastAPI application.
-app = FastAPI(title="PaceCtrl API")
+    # Time SQL statements per request (read by the logging middleware)
+    db_metrics.install(engine)
 
-# Add API logging middleware
-app.add_middleware(ApiLoggingMiddleware)
+    # Add API logging middleware
+    app.add_middleware(ApiLoggingMiddleware)
 
-# Configure CORS (allow public widget interactions)
-cors_origins = settings.get_cors_origins()
-allow_credentials = False if cors_origins == ["*"] else True
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=cors_origins,
-    allow_credentials=allow_credentials,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    # Prometheus metrics
+    metrics.instrument_pool(engine)
 
-# Tables are created via Alembic migrations in production
-# Base.metadata.create_all(bind=engine)  # Commented out for production
+    # Configure CORS (allow public widget interactions)
+    add_cors(app)
 
-# Add the various routes available
-# Operator routes, behind authentication
-app.include_router(auth_router, prefix="/api/v1/operator")
-app.include_router(operators_router, prefix="/api/v1/operator")
-app.include_router(users_router, prefix="/api/v1/operator")
-app.include_router(voyages_router, prefix="/api/v1/operator")
-app.include_router(speed_estimates_router, prefix="/api/v1/operator")
-app.include_router(widget_configs_router, prefix="/api/v1/operator")
-app.include_router(choice_intents_router, prefix="/api/v1/operator")
-app.include_router(confirmed_choices_router, prefix="/api/v1/operator")
-app.include_router(ships_router, prefix="/api/v1/operator")
-app.include_router(routes_router, prefix="/api/v1/operator")
-app.include_router(dashboard_router, prefix="/api/v1/operator")
-app.include_router(audit_logs_router, prefix="/api/v1/operator")
-app.include_router(voyage_creation_rules_router, prefix="/api/v1/operator")
+    # Request metrics wrap everything else so latency includes all middleware
+    app.add_middleware(metrics.MetricsMiddleware)
 
-# Public routes, no authentication
-app.include_router(public_widget_router, prefix="/api/v1/public")
-app.include_router(public_choice_intents_router, prefix="/api/v1/public")
+    # Tables are created via Alembic migrations in production
+    # Base.metadata.create_all(bind=engine)  # Commented out for production
 
-# Widget assets route
-app.include_router(widget_assets_router)
+    # Add the various routes available
+    # Operator routes, behind authentication
+    app.include_router(auth_router, prefix="/api/v1/operator")
+    app.include_router(operators_router, prefix="/api/v1/operator")
+    app.include_router(users_router, prefix="/api/v1/operator")
+    app.include_router(voyages_router, prefix="/api/v1/operator")
+    app.include_router(speed_estimates_router, prefix="/api/v1/operator")
+    app.include_router(widget_configs_router, prefix="/api/v1/operator")
+    app.include_router(choice_intents_router, prefix="/api/v1/operator")
+    app.include_router(confirmed_choices_router, prefix="/api/v1/operator")
+    app.include_router(ships_router, prefix="/api/v1/operator")
+    app.include_router(routes_router, prefix="/api/v1/operator")
+    app.include_router(dashboard_router, prefix="/api/v1/operator")
+    app.include_router(audit_logs_router, prefix="/api/v1/operator")
+    app.include_router(voyage_creation_rules_router, prefix="/api/v1/operator")
+    app.include_router(analytics_exports_router, prefix="/api/v1/operator")
 
-@app.exception_handler(Exception)
-async def global_exception_handler(request: Request, exc: Exception):
-    """
-    Catch-all handler: converts unhandled exceptions into a proper JSON
-    response so the CORSMiddleware can still append its headers.
-    """
-    return JSONResponse(
-        status_code=500,
-        content={"detail": "Internal server error"},
-    )
+    # Public routes, no authentication
+    app.include_router(public_widget_router, prefix="/api/v1/public")
+    app.include_router(public_choice_intents_router, prefix="/api/v1/public")
 
+    # Widget assets route
+    app.include_router(widget_assets_router)
 
-@app.get("/health")
-def read_health():
-    """
-    Health check endpoint.
-    Returns status to verify API is running.
-    """
-    return {"status": "ok"}
+    # Error handler, widget bundle / traffic counter lifecycle, /health and /metrics
+    add_common_handlers(app)
+
+    @app.on_event("shutdown")
+    async def stop_live_updates():
+        """End dashboard live update streams so the worker can exit."""
+        await live_updates.broadcaster.stop()
+finally:
+    # Everything built above lives as long as the process: move it out of the
+    # GC's reach so later collections do not rescan it, then resume collection
+    gc.freeze()
+    gc.enable()
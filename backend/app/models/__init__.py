@@ -10,3 +10,6 @@ from app.models.ship import Ship  # noqa: F401
 from app.models.route import Route  # noqa: F401
 from app.models.speed_to_emissions_estimate import SpeedToEmissionsEstimate  # noqa: F401
 from app.models.voyage_creation_rule import VoyageCreationRule  # noqa: F401
+from app.models.analytics_export_job import AnalyticsExportJob  # noqa: F401
+from app.models.api_traffic_minute import ApiTrafficMinute  # noqa: F401
+from app.models.refresh_token import RefreshToken  # noqa: F401
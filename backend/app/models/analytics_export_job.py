@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, JSON, String, CheckConstraint, func
+
+from app.core.database import Base
+
+
+class AnalyticsExportJob(Base):
+    """
+    A background export of an operator's intents, confirmed choices and voyage
+    dimensions to Parquet files for loading into a data warehouse.
+    """
+
+    __tablename__ = "analytics_export_jobs"
+
+    id = Column(String(32), primary_key=True)  # random hex, used in the download URL
+    operator_id = Column(Integer, ForeignKey("operators.id", ondelete="CASCADE"), nullable=False, index=True)
+    requested_by_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    # Inclusive date range applied to choice_intents.created_at and confirmed_choices.confirmed_at
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+
+    status = Column(String, nullable=False, default="pending")  # pending | running | succeeded | failed
+    file_path = Column(String, nullable=True)  # Zip archive of the Parquet files once succeeded
+    row_counts = Column(JSON, nullable=True)  # {"choice_intents": n, "confirmed_choices": n, "voyages": n}
+    error = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        CheckConstraint("status IN ('pending','running','succeeded','failed')", name="ck_analytics_export_jobs_status"),
+        CheckConstraint("end_date >= start_date", name="ck_analytics_export_jobs_date_range"),
+    )
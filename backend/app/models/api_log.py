@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, JSON, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -10,12 +10,19 @@ class ApiLog(Base):
     """Logs all API requests for auditing and analytics."""
 
     __tablename__ = "api_logs"
+    __table_args__ = (
+        Index("ix_api_logs_operator_route_created_at", "operator_id", "route", "created_at"),
+    )
 
     api_log_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     request_id = Column(UUID(as_uuid=True), nullable=False, default=uuid.uuid4)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     method = Column(String, nullable=False)
     path = Column(String, nullable=False)
+    # Matched route template, e.g. /api/v1/operator/voyages/{voyage_id} (NULL if no route matched)
+    route = Column(String, nullable=True)
+    # none_as_null: routes without parameters store SQL NULL, not the JSON value null
+    path_params = Column(JSON(none_as_null=True), nullable=True)
     status_code = Column(Integer, nullable=False)
     response_ms = Column(Integer, nullable=False)
     operator_id = Column(Integer, ForeignKey("operators.id", ondelete="SET NULL"), nullable=True, index=True)
@@ -23,6 +30,10 @@ class ApiLog(Base):
     voyage_id = Column(Integer, ForeignKey("voyages.id", ondelete="SET NULL"), nullable=True, index=True)
     ip_hash = Column(String, nullable=True)
     user_agent = Column(String, nullable=True)
+    # Database usage while handling the request (see app.core.db_metrics)
+    db_query_count = Column(Integer, nullable=True)
+    db_time_ms = Column(Integer, nullable=True)
+    slowest_query = Column(String, nullable=True)
 
     # Relationships for easier querying
     operator = relationship("Operator")
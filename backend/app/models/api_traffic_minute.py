@@ -0,0 +1,34 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, UniqueConstraint
+
+from app.core.database import Base
+
+
+class ApiTrafficMinute(Base):
+    """
+    Per-minute request counters for traffic that is not logged row by row.
+
+    Public widget traffic is aggregated here by route template, voyage and
+    status instead of producing an ApiLog row per request (see
+    app.core.log_policy). Counters are additive, so every worker upserts its
+    own buffered counts into the same rows.
+    """
+
+    __tablename__ = "api_traffic_minutes"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    minute = Column(DateTime(timezone=True), nullable=False)
+    method = Column(String, nullable=False)
+    route = Column(String, nullable=False)
+    # Voyage the request targeted (looked up by the handler); 0 when it had none.
+    # Not a foreign key: counters outlive the voyages they describe.
+    voyage_id = Column(Integer, nullable=False, default=0)
+    status_code = Column(Integer, nullable=False)
+    request_count = Column(Integer, nullable=False)
+    total_response_ms = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "minute", "route", "method", "voyage_id", "status_code",
+            name="uq_api_traffic_minutes_bucket",
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric, String, TIMESTAMP, func, CheckConstraint
+from sqlalchemy import Column, Integer, ForeignKey, Index, Numeric, String, TIMESTAMP, func, CheckConstraint
 
 from app.core.database import Base
 
@@ -26,4 +26,6 @@ class ChoiceIntent(Base):
         CheckConstraint("delta_pct_from_standard >= -100 AND delta_pct_from_standard <= 100", name="ck_intent_delta_pct_range"),
         # Speed must be positive if set
         CheckConstraint("selected_speed_kn IS NULL OR selected_speed_kn > 0", name="ck_intent_speed_positive"),
+        # Dashboard streams poll recent intents (see app.core.live_updates)
+        Index("ix_choice_intents_created_at", "created_at"),
     )
@@ -15,6 +15,10 @@ class ConfirmedChoice(Base):
     delta_pct_from_standard = Column(Numeric(5, 2), nullable=False) # + faster, - slower
     selected_speed_kn = Column(Numeric(6, 2), nullable=True)
 
+    # kg CO2 saved vs the standard profile at this slider position, from the route/ship anchors.
+    # Maintained by app.core.co2_savings; NULL when the voyage's route/ship has no anchors.
+    projected_co2_saved_kg = Column(Numeric(12, 2), nullable=True)
+
     confirmed_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
 
     __table_args__ = (
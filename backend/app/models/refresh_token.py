@@ -0,0 +1,31 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func
+
+from app.core.database import Base
+
+
+class RefreshToken(Base):
+    """
+    Long-lived, single-use token that a portal session exchanges for a new
+    access token without sending the password again (see /auth/refresh).
+
+    Only the SHA-256 of the token is stored. Every refresh revokes the
+    presented token and issues a successor in the same family (one family
+    per login), so a token that is presented again after rotation reveals
+    a leak and revokes the whole family.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    family_id = Column(String, nullable=False)
+    token_hash = Column(String, nullable=False, unique=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    # Set when the token is rotated, logged out or revoked with its family
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_id", "user_id"),
+        Index("ix_refresh_tokens_family_id", "family_id"),
+    )
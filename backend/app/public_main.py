@@ -0,0 +1,58 @@
+import gc
+
+# See app.main: pause the cyclic GC while the app is built
+gc.disable()
+try:
+    from fastapi import FastAPI
+
+    from app.core import db_metrics, metrics
+    from app.core.application import add_common_handlers, add_cors
+    from app.core.database import engine
+    from app.core.middleware import PublicTrafficMiddleware
+    from app.api.public.widget import router as public_widget_router
+    from app.api.public.choice_intents import router as public_choice_intents_router
+    from app.api.public.widget_assets import router as widget_assets_router
+
+    # Passenger-facing API only: widget config, choice intents and the widget
+    # bundle. Serves the same paths as app.main against the same database, so it
+    # can run as its own, separately scaled pool of workers:
+    #
+    #   uvicorn app.public_main:app --workers 8
+    #
+    # No operator routers (or their imports), no API docs, and only pure ASGI
+    # middleware besides CORS.
+    app = FastAPI(
+        title="PaceCtrl Public API",
+        openapi_url=None,
+        docs_url=None,
+        redoc_url=None,
+    )
+
+    # Time SQL statements per request (stored on sampled api_logs rows)
+    db_metrics.install(engine)
+
+    # Per-minute traffic counters and sampled api_logs rows
+    app.add_middleware(PublicTrafficMiddleware)
+
+    # Prometheus metrics
+    metrics.instrument_pool(engine)
+
+    # Configure CORS (allow public widget interactions)
+    add_cors(app)
+
+    # Request metrics wrap everything else so latency includes all middleware
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    # Public routes, no authentication
+    app.include_router(public_widget_router, prefix="/api/v1/public")
+    app.include_router(public_choice_intents_router, prefix="/api/v1/public")
+
+    # Widget assets route
+    app.include_router(widget_assets_router)
+
+    # Error handler, widget bundle / traffic counter lifecycle, /health and /metrics
+    add_common_handlers(app)
+finally:
+    # See app.main
+    gc.freeze()
+    gc.enable()
@@ -0,0 +1,39 @@
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from pydantic import BaseModel, model_validator
+
+
+class AnalyticsExportCreate(BaseModel):
+    """Payload for starting an analytics export job."""
+
+    start_date: date
+    end_date: date
+
+    @model_validator(mode="after")
+    def validate_date_range(self) -> "AnalyticsExportCreate":
+        """end_date must not be before start_date."""
+        if self.end_date < self.start_date:
+            raise ValueError(
+                f"end_date ({self.end_date}) must be >= start_date ({self.start_date})"
+            )
+        return self
+
+
+class AnalyticsExportJob(BaseModel):
+    """Status of an analytics export job."""
+
+    id: str
+    operator_id: int
+    start_date: date
+    end_date: date
+    status: str
+    row_counts: Optional[Dict[str, int]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    # Relative URL of the zip archive, set once the job has succeeded
+    download_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -4,6 +4,14 @@ from pydantic import BaseModel, Field
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    # Single-use; exchange it at /auth/refresh for a new pair when the access token expires
+    refresh_token: str
+    # Access token lifetime in seconds
+    expires_in: int
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str = Field(..., min_length=1)
 
 
 class LoginRequest(BaseModel):
@@ -15,7 +15,9 @@ class ChoiceIntentBase(BaseModel):
 
 
 class ChoiceIntentCreate(ChoiceIntentBase):
-    pass
+    # The intent this widget session created before; updated in place instead
+    # of inserting a new row while it is open and recent (see the endpoint)
+    intent_id: Optional[str] = Field(None, max_length=20)
 
 
 class ChoiceIntentResponse(BaseModel):
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -23,7 +23,39 @@ class ConfirmedChoice(BaseModel):
     slider_value: float
     delta_pct_from_standard: float
     selected_speed_kn: Optional[float] = None
+    projected_co2_saved_kg: Optional[float] = None
     confirmed_at: datetime
 
     class Config:
         from_attributes = True
+
+
+MAX_BULK_CONFIRMED_CHOICES = 5000  # Per JSON request; use the NDJSON variant for larger uploads
+
+
+class BulkConfirmedChoicesCreate(BaseModel):
+    """Batch of (intent_id, booking_id) pairs for nightly reconciliation."""
+    items: List[ConfirmedChoiceCreate] = Field(..., min_length=1, max_length=MAX_BULK_CONFIRMED_CHOICES)
+
+
+class BulkConfirmedChoiceResult(BaseModel):
+    """Outcome for a single item in a bulk confirmation, in request order."""
+    intent_id: str
+    booking_id: str
+    # created   - a new confirmed choice was inserted
+    # existing  - this booking was already confirmed for the intent's voyage
+    # expired   - the intent expired before it was confirmed
+    # not_found - unknown intent, or it belongs to another operator
+    # invalid   - the NDJSON line could not be parsed or was too long
+    status: Literal["created", "existing", "expired", "not_found", "invalid"]
+    confirmed_choice: Optional[ConfirmedChoice] = None
+    detail: Optional[str] = None
+    # 1-based input line (NDJSON uploads only)
+    line: Optional[int] = None
+
+
+class BulkConfirmedChoicesResponse(BaseModel):
+    created: int
+    existing: int
+    failed: int
+    items: List[BulkConfirmedChoiceResult]
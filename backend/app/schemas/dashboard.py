@@ -36,6 +36,8 @@ class VoyageMetrics(BaseModel):
     min_delta_pct: Optional[float]
     max_delta_pct: Optional[float]
     avg_slider_value: Optional[float]
+    # Total kg CO2 saved vs standard speed by this voyage's confirmed choices (from the anchors)
+    projected_co2_saved_kg: Optional[float] = None
 
 
 class ConfirmedChoicesPerDay(BaseModel):
@@ -57,5 +59,6 @@ class VoyagesDashboardResponse(BaseModel):
     voyage_status_breakdown: VoyageStatusBreakdown
     avg_delta_pct_all_confirmed: Optional[float]
     median_delta_pct_all_confirmed: Optional[float]
+    projected_co2_saved_kg_total: float = 0.0
     confirmed_choices_per_day: List[ConfirmedChoicesPerDay]
     voyages: List[VoyageMetrics]
@@ -27,7 +27,7 @@ class PublicWidgetConfigOut(BaseModel):
     anchors: Dict[str, AnchorOut]  # key by profile: "slow", "standard", "fast"
     widget_script_url: Optional[str] = Field(
         default=None,
-        description="Absolute URL to the PaceCtrl widget bundle (widget.js).",
+        description="Absolute, content-fingerprinted URL to the PaceCtrl widget bundle (widget.<hash>.js; widget.js if the bundle is not built).",
     )
 
     class Config:
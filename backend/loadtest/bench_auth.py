@@ -0,0 +1,70 @@
+"""
+Benchmark per-request JWT handling under portal polling load.
+
+Every authenticated request decodes its bearer token twice: once in
+ApiLoggingMiddleware (to log user/operator) and once in get_current_user.
+This replays a polling pattern (each of --users tokens used for --polls
+requests, interleaved) and compares:
+  - uncached: full signature check and claim validation at both sites
+  - cached:   security.decode_access_token, which verifies a token once and
+              then serves its claims from the verified-token cache
+
+No database needed:
+
+    JWT_SECRET_KEY=$(openssl rand -hex 32) DATABASE_URL=sqlite:// python -m loadtest.bench_auth --users 200 --polls 50
+"""
+
+import argparse
+import statistics
+import time
+
+from app.core import security
+
+
+def _tokens(users: int) -> list:
+    return [
+        security.create_access_token(subject=i + 1, operator_id=i % 5 + 1, role="admin")
+        for i in range(users)
+    ]
+
+
+def _replay(decode, tokens: list, polls: int) -> float:
+    """Run the polling pattern; returns microseconds of auth work per request."""
+    start = time.perf_counter()
+    for _ in range(polls):
+        for token in tokens:
+            decode(token)  # ApiLoggingMiddleware
+            decode(token)  # get_current_user
+    return (time.perf_counter() - start) * 1e6 / (polls * len(tokens))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-request JWT decoding with and without the cache.")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--polls", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tokens = _tokens(args.users)
+    assert security.decode_access_token(tokens[0]) == security._verify_access_token(tokens[0])
+
+    variants = {
+        "uncached": security._verify_access_token,
+        "cached": security.decode_access_token,
+    }
+
+    print(f"{args.users} tokens x {args.polls} polls, 2 decodes per request, best/median of {args.repeat} runs")
+    baseline = None
+    for name, decode in variants.items():
+        timings = []
+        for _ in range(args.repeat):
+            # Each run starts cold, so the first poll of every token pays the full check
+            security.verified_tokens.clear()
+            timings.append(_replay(decode, tokens, args.polls))
+        best, median = min(timings), statistics.median(timings)
+        baseline = baseline or median
+        print(f"  {name:<9} best {best:7.1f} us/request  median {median:7.1f} us/request  x{baseline / median:4.1f}")
+
+
+if __name__ == "__main__":
+    main()
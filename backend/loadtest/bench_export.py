@@ -0,0 +1,105 @@
+"""
+Time an analytics export (Parquet archive) end to end on a seeded database.
+
+Creates an export job for one operator covering all of its intents, runs it
+in this process exactly as the background task would, and reports rows
+written, wall time, throughput, archive size and peak memory (process RSS
+and the Arrow memory pool).
+
+Run from the backend folder against a database seeded by loadtest.seed. For
+the 10M-row benchmark, seed one operator with 10M intents first:
+
+    python -m loadtest.seed --operators 1 --intents 10000000
+    python -m loadtest.bench_export
+
+The archive is deleted afterwards unless --keep is given.
+"""
+
+import argparse
+import os
+import resource
+import secrets
+import shutil
+import time
+
+from sqlalchemy import func, select
+
+from app.core.analytics_export import run_export_job
+from app.core.database import SessionLocal
+from app.models.analytics_export_job import AnalyticsExportJob
+from app.models.choice_intent import ChoiceIntent
+from app.models.voyage import Voyage
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time an analytics export on a seeded database.")
+    parser.add_argument("--operator-id", type=int, help="Defaults to the operator with the most intents")
+    parser.add_argument("--keep", action="store_true", help="Keep the archive and print its path")
+    args = parser.parse_args()
+
+    import pyarrow as pa
+
+    with SessionLocal() as db:
+        operator_id = args.operator_id
+        if operator_id is None:
+            operator_id = db.execute(
+                select(Voyage.operator_id)
+                .join(ChoiceIntent, ChoiceIntent.voyage_id == Voyage.id)
+                .group_by(Voyage.operator_id)
+                .order_by(func.count().desc())
+                .limit(1)
+            ).scalar()
+        if operator_id is None:
+            raise SystemExit("No intents found; seed the database with loadtest.seed first")
+
+        first, last = db.execute(
+            select(func.min(ChoiceIntent.created_at), func.max(ChoiceIntent.created_at))
+            .join(Voyage, Voyage.id == ChoiceIntent.voyage_id)
+            .where(Voyage.operator_id == operator_id)
+        ).one()
+        job = AnalyticsExportJob(
+            id=secrets.token_hex(16),
+            operator_id=operator_id,
+            start_date=first.date(),
+            end_date=last.date(),
+            status="pending",
+        )
+        db.add(job)
+        db.commit()
+        job_id = job.id
+
+    rss_before = _peak_rss_mib()
+    start = time.perf_counter()
+    run_export_job(job_id)
+    elapsed = time.perf_counter() - start
+
+    with SessionLocal() as db:
+        job = db.get(AnalyticsExportJob, job_id)
+        if job.status != "succeeded":
+            raise SystemExit(f"Export {job.status}: {job.error}")
+        rows = sum(job.row_counts.values())
+        size = os.path.getsize(job.file_path)
+
+        print(f"operator {operator_id}, {job.start_date} .. {job.end_date}")
+        for table, count in job.row_counts.items():
+            print(f"  {table:<20}{count:>14,} rows")
+        print(f"  {'total':<20}{rows:>14,} rows in {elapsed:.1f} s ({rows / elapsed:,.0f} rows/s)")
+        print(f"  archive             {size / 2**20:>14,.1f} MiB ({size / max(rows, 1):.1f} bytes/row)")
+        print(f"  peak RSS            {_peak_rss_mib():>14,.0f} MiB (before export: {rss_before:,.0f} MiB)")
+        print(f"  peak Arrow pool     {pa.default_memory_pool().max_memory() / 2**20:>14,.1f} MiB")
+
+        if args.keep:
+            print(f"  kept {job.file_path}")
+        else:
+            shutil.rmtree(os.path.dirname(job.file_path), ignore_errors=True)
+        db.delete(job)
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Compare ORM and column-only (Core select) reads for the operator list endpoints.
+
+For each listing, times fetching the operator's rows and serializing them to
+JSON, and records the peak Python memory allocated while doing so
+(tracemalloc), once through full ORM instances (the previous implementation)
+and once through app.core.read_models rows (the endpoints' current path).
+
+Run from the backend folder against a database seeded by loadtest.seed;
+defaults to the operator with the most voyages:
+
+    python -m loadtest.bench_list_reads --repeat 10
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from typing import Callable, List
+
+from sqlalchemy import func, select
+
+from app.api.operator.voyages import _voyage_rows
+from app.core.database import SessionLocal
+from app.core.read_models import fetch_rows, select_for
+from app.core.responses import ModelSerializer
+from app.models.choice_intent import ChoiceIntent
+from app.models.route import Route
+from app.models.ship import Ship
+from app.models.user import User
+from app.models.voyage import Voyage
+from app.models.widget_config import WidgetConfig
+from app.schemas.route import Route as RouteSchema
+from app.schemas.ship import Ship as ShipSchema
+from app.schemas.user import User as UserSchema
+from app.schemas.voyage import Voyage as VoyageSchema
+from app.schemas.widget_config import WidgetConfig as WidgetConfigSchema
+
+
+def _orm_voyages(db, operator_id: int) -> list:
+    """The previous list_voyages: ORM instances, then a dict per voyage with its intent count."""
+    voyages = (
+        db.query(Voyage)
+        .filter(Voyage.operator_id == operator_id)
+        .order_by(Voyage.departure_date.asc())
+        .all()
+    )
+    counts = dict(
+        db.query(ChoiceIntent.voyage_id, func.count(ChoiceIntent.intent_id))
+        .filter(ChoiceIntent.voyage_id.in_([v.id for v in voyages]))
+        .group_by(ChoiceIntent.voyage_id)
+        .all()
+    )
+    results = []
+    for v in voyages:
+        d = {c.name: getattr(v, c.name) for c in v.__table__.columns}
+        d["intent_count"] = counts.get(v.id, 0)
+        results.append(d)
+    return results
+
+
+def _listings(operator_id: int) -> List[tuple]:
+    """(name, serializer, ORM fetch, row fetch) per list endpoint."""
+    listings = []
+    for name, model, schema, order in (
+        ("routes", Route, RouteSchema, Route.name),
+        ("ships", Ship, ShipSchema, Ship.name),
+        ("widget_configs", WidgetConfig, WidgetConfigSchema, WidgetConfig.id),
+        ("users", User, UserSchema, User.id),
+    ):
+        listings.append((
+            name,
+            ModelSerializer(List[schema]),
+            lambda db, m=model, o=order: db.query(m).filter(m.operator_id == operator_id).order_by(o).all(),
+            lambda db, m=model, s=schema, o=order: fetch_rows(
+                db, select_for(m, s).where(m.operator_id == operator_id).order_by(o),
+            ),
+        ))
+    listings.append((
+        "voyages",
+        ModelSerializer(List[VoyageSchema]),
+        lambda db: _orm_voyages(db, operator_id),
+        lambda db: fetch_rows(
+            db,
+            _voyage_rows(Voyage.operator_id == operator_id).order_by(Voyage.departure_date.asc()),
+        ),
+    ))
+    return listings
+
+
+def _run(serializer: ModelSerializer, fetch: Callable) -> bytes:
+    db = SessionLocal()
+    try:
+        return serializer.response(fetch(db)).body
+    finally:
+        db.close()
+
+
+def _measure(serializer: ModelSerializer, fetch: Callable, repeat: int) -> tuple:
+    """
+    Median milliseconds for fetch + serialize (each run in a fresh session), then
+    the peak KiB allocated by one more run under tracemalloc, which would skew timings.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _run(serializer, fetch)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    body = _run(serializer, fetch)
+    peak = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return statistics.median(timings), peak, len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare ORM and Core-select list reads.")
+    parser.add_argument("--operator-id", type=int, help="Defaults to the operator with the most voyages")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    operator_id = args.operator_id
+    if operator_id is None:
+        with SessionLocal() as db:
+            operator_id = db.execute(
+                select(Voyage.operator_id).group_by(Voyage.operator_id).order_by(func.count().desc()).limit(1)
+            ).scalar()
+    if operator_id is None:
+        raise SystemExit("No voyages found; seed the database with loadtest.seed first")
+
+    print(f"operator {operator_id}, median of {args.repeat} runs")
+    header = f"{'listing':<16}{'path':<6}{'ms':>10}{'peak KiB':>12}{'body KiB':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, serializer, orm_fetch, row_fetch in _listings(operator_id):
+        results = {}
+        for path, fetch in (("orm", orm_fetch), ("core", row_fetch)):
+            # Warm up the connection pool and statement cache first
+            _run(serializer, fetch)
+            results[path] = _measure(serializer, fetch, args.repeat)
+            ms, peak, size = results[path]
+            print(f"{name:<16}{path:<6}{ms:>10.1f}{peak:>12,.0f}{size / 1024:>10,.0f}")
+        (orm_ms, orm_peak, _), (core_ms, core_peak, _) = results["orm"], results["core"]
+        print(f"{'':<16}{'':<6}{(core_ms - orm_ms) / orm_ms * 100:>+9.0f}%{(core_peak - orm_peak) / orm_peak * 100:>+11.0f}%")
+
+
+if __name__ == "__main__":
+    main()
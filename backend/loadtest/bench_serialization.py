@@ -0,0 +1,134 @@
+"""
+Benchmark response serialization for a large voyages dashboard payload.
+
+Compares, per payload, building and serializing VoyagesDashboardResponse with:
+  - default:  what FastAPI does with a returned model and response_model:
+              dump to dicts, re-validate against response_model, convert to
+              JSON-compatible objects, json.dumps
+  - orjson:   the same, rendered by FastJSONResponse (the app default)
+  - trusted:  ModelSerializer(..., trusted=True), the dashboard endpoint's
+              path: one pydantic-core dump_json of the built model
+
+No database needed:
+
+    python -m loadtest.bench_serialization --voyages 10000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from pydantic import TypeAdapter
+
+from app.core.responses import ModelSerializer, dumps
+from app.schemas.dashboard import (
+    ConfirmedChoicesPerDay,
+    VoyageMetrics,
+    VoyagesDashboardResponse,
+    VoyageStatusBreakdown,
+)
+
+
+def _voyage_fields(rng: random.Random, n: int) -> list:
+    start = datetime(2026, 1, 1, 8, 0)
+    rows = []
+    for i in range(n):
+        departure = start + timedelta(days=i // 20, hours=i % 20)
+        has_choices = rng.random() < 0.8
+        rows.append({
+            "voyage_id": i + 1,
+            "external_trip_id": f"HEL-TLL-{departure:%Y-%m-%d}-{i}",
+            "status": rng.choice(("planned", "completed", "cancelled")),
+            "route_name": f"Route {i % 40}",
+            "departure_port": "HEL",
+            "arrival_port": "TLL",
+            "ship_name": f"MS Ship {i % 12}",
+            "departure_datetime": departure,
+            "arrival_datetime": departure + timedelta(hours=2),
+            "voted_arrival_datetime": departure + timedelta(hours=2, minutes=rng.randint(0, 30)) if has_choices else None,
+            "total_intents": rng.randint(0, 500),
+            "active_intents": rng.randint(0, 50),
+            "consumed_intents": rng.randint(0, 200),
+            "expired_intents": rng.randint(0, 300),
+            "confirmed_choices_count": rng.randint(0, 200) if has_choices else 0,
+            "avg_delta_pct": rng.uniform(-15, 5) if has_choices else None,
+            "median_delta_pct": rng.uniform(-15, 5) if has_choices else None,
+            "min_delta_pct": rng.uniform(-20, -10) if has_choices else None,
+            "max_delta_pct": rng.uniform(0, 10) if has_choices else None,
+            "avg_slider_value": rng.random() if has_choices else None,
+            "projected_co2_saved_kg": rng.uniform(0, 5000) if has_choices else None,
+        })
+    return rows
+
+
+def _top_level(rng: random.Random) -> dict:
+    return {
+        "total_voyages": 0,
+        "total_confirmed_choices": 123_456,
+        "confirmed_choices_last_30_days": 12_345,
+        "total_active_intents": 2_345,
+        "avg_delta_pct_all_confirmed": -6.2,
+        "median_delta_pct_all_confirmed": -5.0,
+        "projected_co2_saved_kg_total": 1_234_567.8,
+        "confirmed_choices_per_day": [
+            ConfirmedChoicesPerDay(day=date(2026, 1, 1) + timedelta(days=d), count=rng.randint(0, 500))
+            for d in range(30)
+        ],
+    }
+
+
+def _validated(rows, top) -> VoyagesDashboardResponse:
+    return VoyagesDashboardResponse(
+        **{**top, "total_voyages": len(rows)},
+        voyage_status_breakdown=VoyageStatusBreakdown(planned=1, completed=1, cancelled=1),
+        voyages=[VoyageMetrics(**row) for row in rows],
+    )
+
+
+def _fastapi_content(adapter: TypeAdapter, model: VoyagesDashboardResponse):
+    """FastAPI's serialize_response: re-validate the dumped model, then make it JSON-compatible."""
+    return adapter.dump_python(adapter.validate_python(model.model_dump()), mode="json")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dashboard response serialization.")
+    parser.add_argument("--voyages", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    rows = _voyage_fields(rng, args.voyages)
+    top = _top_level(rng)
+    adapter = TypeAdapter(VoyagesDashboardResponse)
+    serializer = ModelSerializer(VoyagesDashboardResponse)
+
+    variants = {
+        "default": lambda: json.dumps(_fastapi_content(adapter, _validated(rows, top))).encode(),
+        "orjson": lambda: dumps(_fastapi_content(adapter, _validated(rows, top))),
+        "trusted": lambda: serializer.response(_validated(rows, top), trusted=True).body,
+    }
+
+    # All variants must produce the same document
+    reference = json.loads(variants["default"]())
+    for name, fn in variants.items():
+        assert json.loads(fn()) == reference, f"{name} output differs"
+
+    print(f"{args.voyages:,} voyages, best/median of {args.repeat} runs")
+    baseline = None
+    for name, fn in variants.items():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            body = fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        best, median = min(timings), statistics.median(timings)
+        baseline = baseline or median
+        print(f"  {name:<8} best {best:8.1f} ms  median {median:8.1f} ms  "
+              f"x{baseline / median:4.1f}  {len(body) / 1024:,.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
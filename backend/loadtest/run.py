@@ -0,0 +1,243 @@
+"""
+Replay a traffic mix against a running API and report latency percentiles.
+
+Start the API against a database seeded by loadtest.seed, with rate limiting
+off so the limiter does not shape the results:
+
+    RATE_LIMIT_ENABLED=false uvicorn app.main:app --workers 4
+    python -m loadtest.run --scenario mixed --duration 60 --concurrency 64 --out results/$(git rev-parse --short HEAD).json
+    python -m loadtest.run --scenario mixed --duration 60 --concurrency 64 --compare results/<baseline>.json
+
+Each operation's p50/p95/p99 latency, throughput and error count is printed
+and optionally written as JSON (tagged with the current git commit) so runs
+can be compared between commits with --compare.
+
+Confirmed choices get booking IDs prefixed with --run-id, so repeated runs
+against the same database don't collide on (voyage_id, booking_id). The
+voyages come from the manifest, dated around loadtest.seed --base-date, so a
+run never depends on the day it is started.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List
+
+import httpx
+
+# Operation weights per scenario
+SCENARIOS: Dict[str, Dict[str, int]] = {
+    # Passenger traffic on a booking page
+    "widget": {"widget_config": 1},
+    "booking": {"widget_config": 6, "intent": 3, "confirm": 1},
+    # Operator portal usage
+    "portal": {"dashboard": 3, "audit_logs": 1},
+    # Production-like mix
+    "mixed": {"widget_config": 60, "intent": 25, "confirm": 8, "dashboard": 5, "audit_logs": 2},
+}
+
+# Created intents waiting to be confirmed, per operator
+MAX_PENDING_INTENTS = 10_000
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class LoadRun:
+    """Shared state for one run: operators, pending intents and recorded samples."""
+
+    def __init__(self, client: httpx.AsyncClient, operators: List[dict], weights: Dict[str, int], seed: int, run_id: str):
+        self.client = client
+        self.operators = operators
+        self.ops = list(weights)
+        self.weights = [weights[op] for op in self.ops]
+        self.rng = random.Random(seed)
+        self.pending: Dict[int, Deque[str]] = defaultdict(lambda: deque(maxlen=MAX_PENDING_INTENTS))
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.booking_counter = 0
+        self.run_id = run_id
+
+    async def login(self) -> None:
+        for operator in self.operators:
+            response = await self.client.post(
+                "/api/v1/operator/auth/login",
+                json={"username": operator["username"], "password": operator["password"]},
+            )
+            response.raise_for_status()
+            operator["headers"] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def _timed(self, op: str, request) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            # Transport failures (timeouts, resets) count as errored requests
+            response = None
+        self.latencies[op].append((time.perf_counter() - start) * 1000)
+        if response is None or response.status_code >= 400:
+            self.errors[op] += 1
+        return response
+
+    async def widget_config(self, operator: dict) -> None:
+        # Same lookup the embedded widget does on a booking page
+        voyage = self.rng.choice(operator["planned_voyages"])
+        await self._timed("widget_config", self.client.get(
+            "/api/v1/public/widget/config",
+            params={"external_trip_id": voyage["external_trip_id"], "public_key": operator["public_key"]},
+        ))
+
+    async def intent(self, operator: dict) -> None:
+        slider = self.rng.random()
+        response = await self._timed("intent", self.client.post(
+            "/api/v1/public/choice-intents/",
+            json={
+                "voyage_id": self.rng.choice(operator["planned_voyages"])["id"],
+                "slider_value": round(slider, 3),
+                "delta_pct_from_standard": round((slider - 0.5) * 30, 2),
+            },
+            # Distinct clients, so intent coalescing does not collapse the load
+            headers={"User-Agent": f"loadtest/{self.rng.getrandbits(32):08x}"},
+        ))
+        if response is not None and response.status_code < 400:
+            self.pending[operator["operator_id"]].append(response.json()["intent_id"])
+
+    async def confirm(self, operator: dict) -> None:
+        pending = self.pending[operator["operator_id"]]
+        if not pending:
+            # Nothing to confirm yet; behave like a passenger and create one
+            await self.intent(operator)
+            return
+        self.booking_counter += 1
+        await self._timed("confirm", self.client.post(
+            "/api/v1/operator/confirmed-choices/",
+            json={"intent_id": pending.popleft(), "booking_id": f"LT-{self.run_id}-{self.booking_counter:08d}"},
+            headers={"X-Webhook-Secret": operator["webhook_secret"]},
+        ))
+
+    async def dashboard(self, operator: dict) -> None:
+        await self._timed("dashboard", self.client.get(
+            "/api/v1/operator/dashboard/voyages", headers=operator["headers"],
+        ))
+
+    async def audit_logs(self, operator: dict) -> None:
+        await self._timed("audit_logs", self.client.get(
+            "/api/v1/operator/audit-logs/", params={"limit": 50}, headers=operator["headers"],
+        ))
+
+    async def worker(self, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            op = self.rng.choices(self.ops, weights=self.weights)[0]
+            await getattr(self, op)(self.rng.choice(self.operators))
+
+    def report(self, elapsed: float) -> Dict[str, dict]:
+        results = {}
+        for op in sorted(set(self.latencies) | set(self.errors)):
+            samples = sorted(self.latencies[op])
+            results[op] = {
+                "requests": len(samples),
+                "errors": self.errors[op],
+                "rps": round(len(samples) / elapsed, 1),
+                "p50_ms": round(percentile(samples, 50), 2),
+                "p95_ms": round(percentile(samples, 95), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+            }
+        return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _print_results(results: Dict[str, dict], baseline: Dict[str, dict] = None) -> None:
+    header = f"{'operation':<15}{'requests':>10}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for op, r in results.items():
+        print(f"{op:<15}{r['requests']:>10}{r['errors']:>8}{r['rps']:>9}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}")
+        base = (baseline or {}).get(op)
+        if base:
+            deltas = []
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+                if base[key]:
+                    deltas.append(f"{key} {(r[key] - base[key]) / base[key] * 100:+.1f}%")
+            print(f"{'':<15}vs baseline: " + ", ".join(deltas))
+
+
+async def _run(args) -> dict:
+    with open(args.manifest) as f:
+        operators = [o for o in json.load(f)["operators"] if o["planned_voyages"]]
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30.0) as client:
+        run = LoadRun(client, operators, SCENARIOS[args.scenario], args.seed, args.run_id)
+        await run.login()
+
+        if args.warmup:
+            warmup_deadline = time.perf_counter() + args.warmup
+            await asyncio.gather(*(run.worker(warmup_deadline) for _ in range(args.concurrency)))
+            run.latencies.clear()
+            run.errors.clear()
+
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(run.worker(deadline) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "commit": _git_commit(),
+        "scenario": args.scenario,
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 1),
+        "results": run.report(elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a PaceCtrl traffic mix and report latency percentiles.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--manifest", default="loadtest_manifest.json")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--duration", type=float, default=60.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before the run")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent virtual users")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--run-id", default=f"{int(time.time()):x}",
+        help="Booking ID prefix for this run (default: hex Unix time), unique per run against one database",
+    )
+    parser.add_argument("--out", help="Write the report as JSON to this path")
+    parser.add_argument("--compare", help="Baseline report (JSON) to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(_run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    print(f"commit {report['commit']}  scenario {report['scenario']}  "
+          f"concurrency {report['concurrency']}  {report['duration_s']}s")
+    _print_results(report["results"], baseline)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
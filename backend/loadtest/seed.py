@@ -0,0 +1,301 @@
+"""
+Seed a synthetic fleet for load testing.
+
+Creates N operators, each with an admin user, a widget config, routes,
+ships, speed anchors, voyage creation rules and voyages, then bulk-inserts choice intents and confirmed choices spread
+over the --history-days days before --base-date. Everything is derived from
+--seed and --base-date, so two runs with the same arguments produce the same
+data set.
+
+Writes a manifest (public keys, webhook secrets, logins, planned voyages)
+that loadtest.run uses to build requests.
+
+Run from the backend folder against an empty, migrated database:
+
+    alembic upgrade head
+    python -m loadtest.seed --operators 5 --intents 2000000 --base-date 2026-01-15 --manifest loadtest_manifest.json
+"""
+
+import argparse
+import json
+import random
+import time as time_module
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import insert
+
+from app.core import security
+from app.core.co2_savings import recompute_projected_co2_saved
+from app.core.database import SessionLocal
+from app.models.choice_intent import ChoiceIntent
+from app.models.confirmed_choice import ConfirmedChoice
+from app.models.operator import Operator
+from app.models.route import Route
+from app.models.ship import Ship
+from app.models.speed_to_emissions_estimate import SpeedToEmissionsEstimate
+from app.models.user import User
+from app.models.voyage import Voyage
+from app.models.voyage_creation_rule import VoyageCreationRule
+from app.models.widget_config import WidgetConfig
+
+# Rows per executemany batch for intents / confirmed choices
+INSERT_BATCH_SIZE = 10_000
+
+# Fixed rather than today, so the same arguments seed the same rows on any day
+DEFAULT_BASE_DATE = date(2026, 1, 1)
+
+# Planned voyages per operator written to the manifest
+MANIFEST_VOYAGES_PER_OPERATOR = 500
+
+PORTS = ["HEL", "TLL", "STO", "TKU", "MHQ", "RIX", "GDN", "KEL", "ROS", "VBY", "OSL", "CPH"]
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/124.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_4) AppleWebKit/605.1.15 Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
+]
+
+
+def _anchors(rng: random.Random):
+    """Plausible slow/standard/fast anchors: (speed_knots, emissions_kg_co2, arrival_delta_minutes)."""
+    standard_speed = rng.uniform(14.0, 22.0)
+    standard_emissions = rng.uniform(8_000.0, 40_000.0)
+    slow_speed = standard_speed * rng.uniform(0.75, 0.9)
+    fast_speed = standard_speed * rng.uniform(1.05, 1.15)
+    # Fuel burn grows roughly with the cube of speed
+    return {
+        "slow": (round(slow_speed, 2), round(standard_emissions * (slow_speed / standard_speed) ** 3, 2), rng.randint(20, 90)),
+        "standard": (round(standard_speed, 2), round(standard_emissions, 2), 0),
+        "fast": (round(fast_speed, 2), round(standard_emissions * (fast_speed / standard_speed) ** 3, 2), -rng.randint(10, 45)),
+    }
+
+
+def _seed_operator(db, rng: random.Random, index: int, args) -> dict:
+    """Create one operator's fleet and return its manifest entry (without voyages)."""
+    public_key = f"pk_load_{index:04d}_{rng.getrandbits(32):08x}"
+    webhook_secret = f"whsec_load_{rng.getrandbits(64):016x}"
+    operator = Operator(
+        name=f"Load Test Line {index:04d}",
+        public_key=public_key,
+        webhook_secret=security.hash_webhook_secret(webhook_secret),
+    )
+    db.add(operator)
+    db.flush()
+
+    username = f"loadtest_admin_{index:04d}"
+    db.add(User(
+        operator_id=operator.id,
+        username=username,
+        password_hash=security.hash_password(args.password),
+        role="admin",
+    ))
+    widget_config = WidgetConfig(
+        operator_id=operator.id,
+        name="Default",
+        config={"default_speed_percentage": 50, "theme": {}},
+        is_active=True,
+    )
+    db.add(widget_config)
+
+    ships = [Ship(operator_id=operator.id, name=f"MS Load {index:04d}-{s}") for s in range(args.ships)]
+    routes = []
+    for r in range(args.routes):
+        departure, arrival = rng.sample(PORTS, 2)
+        routes.append(Route(
+            operator_id=operator.id,
+            name=f"{departure}-{arrival} {r}",
+            departure_port=departure,
+            arrival_port=arrival,
+            departure_time=time(rng.randint(6, 22), rng.choice((0, 30))),
+            arrival_time=time(rng.randint(0, 23), rng.choice((0, 30))),
+            is_active=True,
+        ))
+    db.add_all(ships + routes)
+    db.flush()
+
+    for route in routes:
+        for ship in ships:
+            anchors = _anchors(rng)
+            for profile, (speed, emissions, delta) in anchors.items():
+                db.add(SpeedToEmissionsEstimate(
+                    route_id=route.id,
+                    ship_id=ship.id,
+                    profile=profile,
+                    speed_knots=speed,
+                    expected_emissions_kg_co2=emissions,
+                    expected_arrival_delta_minutes=delta,
+                ))
+
+    rules = []
+    for route in routes:
+        rule = VoyageCreationRule(
+            operator_id=operator.id,
+            name=f"{route.name} daily",
+            pattern=f"L{index:04d}-R{route.id}-{{YYYY}}-{{MM}}-{{DD}}",
+            route_id=route.id,
+            ship_id=rng.choice(ships).id,
+            widget_config_id=widget_config.id,
+            is_active=True,
+        )
+        rules.append(rule)
+    db.add_all(rules)
+    db.flush()
+
+    # Daily departures per route, from --history-days before --base-date to --future-days after
+    for rule in rules:
+        for offset in range(-args.history_days, args.future_days):
+            day = args.base_date + timedelta(days=offset)
+            db.add(Voyage(
+                operator_id=operator.id,
+                external_trip_id=f"L{index:04d}-R{rule.route_id}-{day:%Y-%m-%d}",
+                widget_config_id=widget_config.id,
+                route_id=rule.route_id,
+                ship_id=rule.ship_id,
+                departure_date=day,
+                arrival_date=day,
+                status="planned" if offset >= 0 else "completed",
+                voyage_creation_rule_id=rule.id,
+            ))
+    db.commit()
+
+    return {
+        "operator_id": operator.id,
+        "public_key": public_key,
+        "webhook_secret": webhook_secret,
+        "username": username,
+        "password": args.password,
+    }
+
+
+def _seed_intents(db, rng: random.Random, voyages, args) -> None:
+    """Bulk-insert intents and confirmed choices in batches."""
+    # Intents fall in the --history-days before the start of --base-date
+    now = datetime.combine(args.base_date, time.min, tzinfo=timezone.utc)
+    history = timedelta(days=args.history_days)
+    intent_batch, choice_batch = [], []
+    inserted = 0
+    started = time_module.perf_counter()
+
+    def flush():
+        nonlocal inserted
+        if intent_batch:
+            db.execute(insert(ChoiceIntent), intent_batch)
+        if choice_batch:
+            db.execute(insert(ConfirmedChoice), choice_batch)
+        db.commit()
+        inserted += len(intent_batch)
+        intent_batch.clear()
+        choice_batch.clear()
+        rate = inserted / max(time_module.perf_counter() - started, 1e-9)
+        print(f"  {inserted:,}/{args.intents:,} intents ({rate:,.0f}/s)")
+
+    for n in range(args.intents):
+        voyage_id, slow, standard, fast = rng.choice(voyages)
+        # Most passengers leave the slider near the default, some drag it to the slow end
+        slider = min(max(rng.betavariate(2.0, 2.5), 0.0), 1.0)
+        speed = slow + (standard - slow) * slider / 0.5 if slider <= 0.5 else standard + (fast - standard) * (slider - 0.5) / 0.5
+        delta_pct = (speed - standard) / standard * 100
+        created_at = now - history * rng.random()
+        confirmed = rng.random() < args.confirm_rate
+        intent_id = f"int_lt{n:010x}"
+
+        intent_batch.append({
+            "intent_id": intent_id,
+            "voyage_id": voyage_id,
+            "slider_value": round(slider, 3),
+            "delta_pct_from_standard": round(delta_pct, 2),
+            "selected_speed_kn": round(speed, 2),
+            "ip_hash": f"{rng.getrandbits(256):064x}",
+            "user_agent": rng.choice(USER_AGENTS),
+            "created_at": created_at,
+            "expires_at": created_at + timedelta(minutes=60),
+            "consumed_at": created_at + timedelta(minutes=rng.randint(1, 30)) if confirmed else None,
+        })
+        if confirmed:
+            choice_batch.append({
+                "voyage_id": voyage_id,
+                "intent_id": intent_id,
+                "booking_id": f"LT-{n:010d}",
+                "slider_value": round(slider, 3),
+                "delta_pct_from_standard": round(delta_pct, 2),
+                "selected_speed_kn": round(speed, 2),
+                "confirmed_at": created_at + timedelta(minutes=rng.randint(1, 30)),
+            })
+        if len(intent_batch) >= INSERT_BATCH_SIZE:
+            flush()
+    if intent_batch:
+        flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed a synthetic PaceCtrl fleet for load testing.")
+    parser.add_argument("--operators", type=int, default=3)
+    parser.add_argument("--routes", type=int, default=4, help="Routes per operator")
+    parser.add_argument("--ships", type=int, default=3, help="Ships per operator")
+    parser.add_argument(
+        "--base-date", type=date.fromisoformat, default=DEFAULT_BASE_DATE,
+        help="Day the fleet is seeded around, YYYY-MM-DD; voyages before it are completed, from it on planned",
+    )
+    parser.add_argument("--history-days", type=int, default=90, help="Days of past voyages and intents")
+    parser.add_argument("--future-days", type=int, default=60, help="Days of planned voyages")
+    parser.add_argument("--intents", type=int, default=100_000, help="Total choice intents across all operators")
+    parser.add_argument("--confirm-rate", type=float, default=0.3, help="Share of intents that become confirmed choices")
+    parser.add_argument("--password", default="loadtest-password", help="Password for every seeded admin user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--manifest", default="loadtest_manifest.json")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    try:
+        operators = []
+        for index in range(args.operators):
+            operators.append(_seed_operator(db, rng, index, args))
+            print(f"Seeded operator {index + 1}/{args.operators}")
+
+        # (voyage_id, slow, standard, fast) speeds for every seeded voyage
+        speeds = {}
+        for route_id, ship_id, profile, speed in db.query(
+            SpeedToEmissionsEstimate.route_id,
+            SpeedToEmissionsEstimate.ship_id,
+            SpeedToEmissionsEstimate.profile,
+            SpeedToEmissionsEstimate.speed_knots,
+        ).join(Route, Route.id == SpeedToEmissionsEstimate.route_id).filter(
+            Route.operator_id.in_([o["operator_id"] for o in operators])
+        ):
+            speeds.setdefault((route_id, ship_id), {})[profile] = float(speed)
+
+        voyages = []
+        for operator in operators:
+            rows = (
+                db.query(Voyage.id, Voyage.external_trip_id, Voyage.route_id, Voyage.ship_id, Voyage.status)
+                .filter(Voyage.operator_id == operator["operator_id"])
+                .order_by(Voyage.id)
+                .all()
+            )
+            for voyage_id, _, route_id, ship_id, _ in rows:
+                s = speeds[(route_id, ship_id)]
+                voyages.append((voyage_id, s["slow"], s["standard"], s["fast"]))
+            # The widget looks voyages up by external_trip_id, intents by voyage ID
+            operator["planned_voyages"] = [
+                {"id": voyage_id, "external_trip_id": external_trip_id}
+                for voyage_id, external_trip_id, _, _, status in rows
+                if status == "planned"
+            ][:MANIFEST_VOYAGES_PER_OPERATOR]
+
+        print(f"Inserting {args.intents:,} intents over {len(voyages):,} voyages")
+        _seed_intents(db, rng, voyages, args)
+
+        print("Computing projected CO2 savings")
+        recompute_projected_co2_saved(db)
+        db.commit()
+    finally:
+        db.close()
+
+    with open(args.manifest, "w") as f:
+        json.dump({"seed": args.seed, "base_date": args.base_date.isoformat(), "operators": operators}, f, indent=2)
+    print(f"Wrote {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
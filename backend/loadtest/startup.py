@@ -0,0 +1,123 @@
+"""
+Cold-start profiling and budget check for the API process.
+
+Each measurement imports the ASGI app in a fresh interpreter, the way a new
+uvicorn worker does, so nothing is cached between runs.
+
+Import-time breakdown (Python's -X importtime, summarized per package and
+per module):
+
+    python -m loadtest.startup profile --top 25
+
+Cold-start benchmark, failing (exit code 1) when the median is over budget,
+for CI:
+
+    python -m loadtest.startup bench --runs 5 --budget-ms 1500
+
+Both accept --app to measure another entry point. No database connection is
+made, so any DATABASE_URL the app accepts will do (e.g. sqlite://).
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Imports module:attribute and prints how long that took, in ms
+_CHILD = """
+import importlib, sys, time
+start = time.perf_counter()
+module, _, attr = sys.argv[1].partition(":")
+getattr(importlib.import_module(module), attr or "app")
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def cold_start(target: str, profile_imports: bool = False) -> Tuple[float, str]:
+    """Import *target* in a new interpreter; returns (milliseconds, stderr)."""
+    env = dict(os.environ)
+    if profile_imports:
+        env["PYTHONPROFILEIMPORTTIME"] = "1"
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD, target],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {target} failed:\n{result.stderr}")
+    return float(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for each line of -X importtime output."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def _group(module: str) -> str:
+    """Top-level package, or app.<subpackage> for our own code."""
+    parts = module.split(".")
+    return ".".join(parts[:2]) if parts[0] == "app" else parts[0]
+
+
+def profile(args) -> None:
+    total_ms, stderr = cold_start(args.app, profile_imports=True)
+    modules = parse_importtime(stderr)
+
+    by_group: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        by_group[_group(name)] += self_us
+    imports_ms = sum(by_group.values()) / 1000
+
+    print(f"{args.app}: {total_ms:.0f} ms cold start, {imports_ms:.0f} ms in module bodies "
+          f"({len(modules)} modules)")
+    print(f"\n{'package':<40}{'self ms':>10}{'share':>8}")
+    for group, self_us in sorted(by_group.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{group:<40}{self_us / 1000:>10.1f}{self_us / 1000 / imports_ms:>8.0%}")
+
+    print(f"\n{'module':<60}{'self ms':>10}{'cumulative ms':>15}")
+    for name, self_us, cumulative_us in sorted(modules, key=lambda m: -m[1])[:args.top]:
+        print(f"{name:<60}{self_us / 1000:>10.1f}{cumulative_us / 1000:>15.1f}")
+
+
+def bench(args) -> None:
+    timings = sorted(cold_start(args.app)[0] for _ in range(args.runs))
+    median = statistics.median(timings)
+    print(f"{args.app}: cold start median {median:.0f} ms, min {timings[0]:.0f} ms, "
+          f"max {timings[-1]:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    if median > args.budget_ms:
+        raise SystemExit(f"Cold start over budget by {median - args.budget_ms:.0f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile and check API cold-start time.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    profile_parser = subparsers.add_parser("profile", help="Import-time breakdown")
+    profile_parser.add_argument("--top", type=int, default=20)
+    profile_parser.set_defaults(handler=profile)
+
+    bench_parser = subparsers.add_parser("bench", help="Cold-start benchmark with a budget")
+    bench_parser.add_argument("--runs", type=int, default=5)
+    bench_parser.add_argument("--budget-ms", type=float, default=1500.0)
+    bench_parser.set_defaults(handler=bench)
+
+    for subparser in (profile_parser, bench_parser):
+        subparser.add_argument("--app", default="app.main:app", help="module:attribute of the ASGI app")
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Shared fixtures for the backend tests.
+
+Tests run against a throwaway SQLite database by default. Endpoints that use
+PostgreSQL-only SQL (percentile_cont, INSERT ... ON CONFLICT in a CTE) are
+skipped there; point TEST_DATABASE_URL at an empty PostgreSQL database to run
+them as well. The schema is created from the models at the start of the
+session and dropped at the end, so never use a database that holds data.
+
+    cd backend && python -m pytest -q
+    TEST_DATABASE_URL=postgresql://localhost/pacectrl_test python -m pytest -q
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import date, time
+
+# Settings are read when app.core.config is first imported
+_db_dir = tempfile.mkdtemp(prefix="pacectrl-tests-")
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", f"sqlite:///{_db_dir}/test.db")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-for-the-backend-tests")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import security
+from app.core.database import Base, SessionLocal, engine
+from app.core.query_counter import QUERY_BUDGETS, count_queries
+from app.models import (
+    Operator,
+    Route,
+    Ship,
+    SpeedToEmissionsEstimate,
+    User,
+    Voyage,
+    WidgetConfig,
+)
+
+PUBLIC_KEY = "pk_test"
+WEBHOOK_SECRET = "whsec_test"
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "admin-password"
+
+# Written by the logging middleware after the response, not by the handler
+_BOOKKEEPING_TABLES = ("api_logs", "api_traffic_minutes")
+
+
+@pytest.fixture(scope="session")
+def seed():
+    """Create the schema and one operator with a fully configured voyage."""
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        operator = Operator(
+            name="Test Line",
+            public_key=PUBLIC_KEY,
+            webhook_secret=security.hash_webhook_secret(WEBHOOK_SECRET),
+        )
+        db.add(operator)
+        db.flush()
+
+        db.add(
+            User(
+                operator_id=operator.id,
+                username=ADMIN_USERNAME,
+                password_hash=security.hash_password(ADMIN_PASSWORD),
+                role="admin",
+            )
+        )
+        route = Route(
+            operator_id=operator.id,
+            name="Harbour A - Harbour B",
+            departure_port="Harbour A",
+            arrival_port="Harbour B",
+            departure_time=time(8, 0),
+            arrival_time=time(12, 0),
+            is_active=True,
+        )
+        ship = Ship(operator_id=operator.id, name="MS Test")
+        widget_config = WidgetConfig(
+            operator_id=operator.id,
+            name="Default",
+            config={"default_speed_percentage": 50, "theme": {}},
+            is_active=True,
+        )
+        db.add_all([route, ship, widget_config])
+        db.flush()
+
+        for profile, speed, emissions, delta in (
+            ("slow", 10, 800, 30),
+            ("standard", 14, 1000, 0),
+            ("fast", 16, 1300, -15),
+        ):
+            db.add(
+                SpeedToEmissionsEstimate(
+                    route_id=route.id,
+                    ship_id=ship.id,
+                    profile=profile,
+                    speed_knots=speed,
+                    expected_emissions_kg_co2=emissions,
+                    expected_arrival_delta_minutes=delta,
+                )
+            )
+        voyage = Voyage(
+            operator_id=operator.id,
+            external_trip_id="TRIP-1",
+            widget_config_id=widget_config.id,
+            route_id=route.id,
+            ship_id=ship.id,
+            departure_date=date(2030, 6, 1),
+            arrival_date=date(2030, 6, 1),
+            status="planned",
+        )
+        db.add(voyage)
+        db.commit()
+        ids = {
+            "operator_id": operator.id,
+            "voyage_id": voyage.id,
+            "public_key": PUBLIC_KEY,
+            "webhook_secret": WEBHOOK_SECRET,
+        }
+    finally:
+        db.close()
+
+    yield ids
+
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def client(seed):
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    response = client.post(
+        "/api/v1/operator/auth/login",
+        json={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD},
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def requires_postgres():
+    if engine.dialect.name != "postgresql":
+        pytest.skip("needs PostgreSQL (set TEST_DATABASE_URL)")
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Context manager asserting that the block stays within the QUERY_BUDGETS
+    entry for *endpoint*. Rows the logging middleware writes afterwards are
+    not counted.
+
+        with query_budget("GET /api/v1/public/widget/config"):
+            client.get(...)
+    """
+
+    @contextmanager
+    def check(endpoint: str):
+        budget = QUERY_BUDGETS[endpoint]
+        with count_queries() as counter:
+            yield counter
+        statements = [
+            statement
+            for statement in counter.statements
+            if not any(f"INSERT INTO {table}" in statement for table in _BOOKKEEPING_TABLES)
+        ]
+        assert len(statements) <= budget, (
+            f"{endpoint} ran {len(statements)} statements (budget {budget}):\n" + "\n\n".join(statements)
+        )
+
+    return check
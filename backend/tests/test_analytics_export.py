@@ -0,0 +1,88 @@
+import os
+import secrets
+from datetime import date, datetime, timedelta, timezone
+
+from app.core import analytics_export
+from app.core.analytics_export import expire_jobs, run_export_job
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.analytics_export_job import AnalyticsExportJob
+
+
+def _job(operator_id: int, **fields) -> AnalyticsExportJob:
+    return AnalyticsExportJob(
+        id=secrets.token_hex(16),
+        operator_id=operator_id,
+        start_date=date(2030, 1, 1),
+        end_date=date(2030, 1, 31),
+        **fields,
+    )
+
+
+def test_expire_jobs(seed, tmp_path):
+    now = datetime.now(timezone.utc)
+    old_dir = tmp_path / "old"
+    old_dir.mkdir()
+    (old_dir / "export.zip").write_bytes(b"zip")
+    new_dir = tmp_path / "new"
+    new_dir.mkdir()
+    (new_dir / "export.zip").write_bytes(b"zip")
+
+    db = SessionLocal()
+    jobs = []
+    try:
+        stale = _job(seed["operator_id"], status="running", created_at=now - timedelta(days=1))
+        active = _job(seed["operator_id"], status="running", created_at=now)
+        old = _job(
+            seed["operator_id"], status="succeeded", created_at=now - timedelta(days=3),
+            finished_at=now - timedelta(days=3), file_path=str(old_dir / "export.zip"),
+        )
+        new = _job(
+            seed["operator_id"], status="succeeded", created_at=now,
+            finished_at=now, file_path=str(new_dir / "export.zip"),
+        )
+        jobs = [stale, active, old, new]
+        db.add_all(jobs)
+        db.commit()
+
+        expire_jobs(db)
+        for job in (stale, active, old, new):
+            db.refresh(job)
+
+        assert stale.status == "failed" and stale.error
+        assert active.status == "running"
+        assert old.file_path is None and not os.path.exists(old_dir)
+        assert new.file_path is not None and os.path.exists(new_dir)
+    finally:
+        for job in jobs:
+            db.delete(job)
+        db.commit()
+        db.close()
+
+
+def test_failed_job_removes_partial_output(seed, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "analytics_export_dir", str(tmp_path))
+
+    def failing_write(db, stmt, schema, path):
+        with open(path, "wb") as f:
+            f.write(b"partial")
+        raise RuntimeError("SELECT secret FROM /srv/internal/path")
+
+    monkeypatch.setattr(analytics_export, "_write_parquet", failing_write)
+
+    db = SessionLocal()
+    job = _job(seed["operator_id"], status="pending")
+    db.add(job)
+    db.commit()
+    try:
+        run_export_job(job.id)
+        db.refresh(job)
+
+        assert job.status == "failed"
+        assert job.error == analytics_export.EXPORT_FAILED_MESSAGE
+        assert job.file_path is None
+        assert not os.path.exists(tmp_path / job.id)
+    finally:
+        db.delete(job)
+        db.commit()
+        db.close()
@@ -0,0 +1,183 @@
+"""
+Bulk confirmation through the real _confirm_batch (INSERT ... ON CONFLICT,
+so PostgreSQL only).
+"""
+
+import json
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+
+from app.api.operator import confirmed_choices
+from app.core.database import SessionLocal
+from app.models import ChoiceIntent, ConfirmedChoice, Operator, Route, Ship, Voyage, WidgetConfig
+
+BULK_URL = "/api/v1/operator/confirmed-choices/bulk"
+
+
+@pytest.fixture
+def webhook(seed):
+    return {"X-Webhook-Secret": seed["webhook_secret"]}
+
+
+@pytest.fixture(scope="module")
+def foreign_voyage_id(seed):
+    """A voyage of another operator, whose intents the test operator must not confirm."""
+    with SessionLocal() as db:
+        operator = Operator(name="Other Line", public_key=f"pk_{uuid.uuid4().hex[:8]}")
+        db.add(operator)
+        db.flush()
+        route = Route(
+            operator_id=operator.id,
+            name="X - Y",
+            departure_port="X",
+            arrival_port="Y",
+            departure_time=time(9, 0),
+            arrival_time=time(11, 0),
+            is_active=True,
+        )
+        ship = Ship(operator_id=operator.id, name="MS Other")
+        widget_config = WidgetConfig(operator_id=operator.id, name="Default", config={}, is_active=True)
+        db.add_all([route, ship, widget_config])
+        db.flush()
+        voyage = Voyage(
+            operator_id=operator.id,
+            external_trip_id="OTHER-1",
+            widget_config_id=widget_config.id,
+            route_id=route.id,
+            ship_id=ship.id,
+            departure_date=date(2030, 6, 1),
+            arrival_date=date(2030, 6, 1),
+            status="planned",
+        )
+        db.add(voyage)
+        db.commit()
+        return voyage.id
+
+
+def _intent(voyage_id, expires_in=timedelta(hours=1), slider=0.25):
+    intent_id = f"int_{uuid.uuid4().hex[:12]}"
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.add(ChoiceIntent(
+            intent_id=intent_id,
+            voyage_id=voyage_id,
+            slider_value=slider,
+            delta_pct_from_standard=-15,
+            selected_speed_kn=12,
+            created_at=now,
+            expires_at=now + expires_in,
+        ))
+        db.commit()
+    return intent_id
+
+
+def _booking():
+    return f"BK-{uuid.uuid4().hex[:10]}"
+
+
+def _bulk(client, headers, items):
+    response = client.post(BULK_URL, json={"items": items}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_creates_and_consumes(requires_postgres, client, seed, webhook):
+    items = [{"intent_id": _intent(seed["voyage_id"]), "booking_id": _booking()} for _ in range(3)]
+
+    body = _bulk(client, webhook, items)
+
+    assert (body["created"], body["existing"], body["failed"]) == (3, 0, 0)
+    assert [r["intent_id"] for r in body["items"]] == [item["intent_id"] for item in items]
+    with SessionLocal() as db:
+        for item in items:
+            assert db.get(ChoiceIntent, item["intent_id"]).consumed_at is not None
+            choice = db.query(ConfirmedChoice).filter_by(intent_id=item["intent_id"]).one()
+            assert choice.booking_id == item["booking_id"]
+            # Slider 0.25 is between slow and standard: some CO2 saved
+            assert choice.projected_co2_saved_kg > 0
+
+
+def test_resubmission_is_idempotent(requires_postgres, client, seed, webhook):
+    items = [{"intent_id": _intent(seed["voyage_id"]), "booking_id": _booking()} for _ in range(2)]
+    first = _bulk(client, webhook, items)
+
+    second = _bulk(client, webhook, items)
+
+    assert (second["created"], second["existing"], second["failed"]) == (0, 2, 0)
+    assert [r["confirmed_choice"]["id"] for r in second["items"]] == [
+        r["confirmed_choice"]["id"] for r in first["items"]
+    ]
+    with SessionLocal() as db:
+        ids = [item["intent_id"] for item in items]
+        assert db.query(ConfirmedChoice).filter(ConfirmedChoice.intent_id.in_(ids)).count() == 2
+
+
+def test_duplicates_within_a_batch(requires_postgres, client, seed, webhook):
+    item = {"intent_id": _intent(seed["voyage_id"]), "booking_id": _booking()}
+
+    body = _bulk(client, webhook, [item, item])
+
+    assert [r["status"] for r in body["items"]] == ["created", "existing"]
+    assert body["items"][0]["confirmed_choice"]["id"] == body["items"][1]["confirmed_choice"]["id"]
+
+
+def test_rejects_unknown_foreign_and_expired(requires_postgres, client, seed, webhook, foreign_voyage_id):
+    valid = {"intent_id": _intent(seed["voyage_id"]), "booking_id": _booking()}
+    items = [
+        {"intent_id": "int_doesnotexist", "booking_id": _booking()},
+        {"intent_id": _intent(foreign_voyage_id), "booking_id": _booking()},
+        {"intent_id": _intent(seed["voyage_id"], expires_in=timedelta(minutes=-1)), "booking_id": _booking()},
+        valid,
+    ]
+
+    body = _bulk(client, webhook, items)
+
+    assert [r["status"] for r in body["items"]] == ["not_found", "not_found", "expired", "created"]
+    assert (body["created"], body["existing"], body["failed"]) == (1, 0, 3)
+    with SessionLocal() as db:
+        rejected = [item["intent_id"] for item in items[:3]]
+        assert db.query(ConfirmedChoice).filter(ConfirmedChoice.intent_id.in_(rejected)).count() == 0
+        # Neither the other operator's intent nor the expired one was consumed
+        assert all(
+            intent.consumed_at is None
+            for intent in db.query(ChoiceIntent).filter(ChoiceIntent.intent_id.in_(rejected[1:]))
+        )
+
+
+def test_chunks_keep_request_order(requires_postgres, client, seed, webhook, monkeypatch):
+    monkeypatch.setattr(confirmed_choices, "BULK_CHUNK_SIZE", 2)
+    batches = []
+    real_confirm_batch = confirmed_choices._confirm_batch
+
+    def counting_confirm_batch(db, operator_id, items):
+        batches.append(len(items))
+        return real_confirm_batch(db, operator_id, items)
+
+    monkeypatch.setattr(confirmed_choices, "_confirm_batch", counting_confirm_batch)
+    items = [{"intent_id": _intent(seed["voyage_id"]), "booking_id": _booking()} for _ in range(4)]
+    items.insert(2, {"intent_id": "int_doesnotexist", "booking_id": _booking()})
+
+    body = _bulk(client, webhook, items)
+
+    assert batches == [2, 2, 1]
+    assert [r["intent_id"] for r in body["items"]] == [item["intent_id"] for item in items]
+    assert [r["status"] for r in body["items"]] == ["created", "created", "not_found", "created", "created"]
+
+
+def test_ndjson_confirms(requires_postgres, client, seed, webhook):
+    items = [{"intent_id": _intent(seed["voyage_id"]), "booking_id": _booking()} for _ in range(2)]
+    body = "\n".join(json.dumps(item) for item in items) + "\nnot json\n" + json.dumps(items[0]) + "\n"
+
+    response = client.post(
+        f"{BULK_URL}/ndjson",
+        content=body.encode(),
+        headers={**webhook, "Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200, response.text
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["line"], r["status"]) for r in results] == [
+        (1, "created"), (2, "created"), (3, "invalid"), (4, "existing"),
+    ]
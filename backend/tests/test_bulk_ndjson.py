@@ -0,0 +1,54 @@
+import json
+
+from app.api.operator import confirmed_choices
+from app.schemas.confirmed_choice import BulkConfirmedChoiceResult
+
+
+def _fake_confirm_batch(db, operator_id, items):
+    return [
+        BulkConfirmedChoiceResult(intent_id=item.intent_id, booking_id=item.booking_id, status="not_found")
+        for item in items
+    ]
+
+
+def _upload(client, seed, body: bytes):
+    response = client.post(
+        "/api/v1/operator/confirmed-choices/bulk/ndjson",
+        content=body,
+        headers={"X-Webhook-Secret": seed["webhook_secret"], "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_results_keep_input_order(client, seed, monkeypatch):
+    monkeypatch.setattr(confirmed_choices, "_confirm_batch", _fake_confirm_batch)
+    body = b"\n".join([
+        b'{"intent_id": "int_a", "booking_id": "B1"}',
+        b"not json",
+        b"",
+        b'{"intent_id": "int_b", "booking_id": "B2"}',
+        b'{"intent_id": "int_c"}',
+        b'{"intent_id": "int_d", "booking_id": "B4"}',
+    ])
+
+    results = _upload(client, seed, body)
+
+    assert [(r["line"], r["status"], r["intent_id"]) for r in results] == [
+        (1, "not_found", "int_a"),
+        (2, "invalid", ""),
+        (4, "not_found", "int_b"),
+        (5, "invalid", ""),
+        (6, "not_found", "int_d"),
+    ]
+
+
+def test_overlong_line_is_reported_and_skipped(client, seed, monkeypatch):
+    monkeypatch.setattr(confirmed_choices, "_confirm_batch", _fake_confirm_batch)
+    long_line = b'{"intent_id": "' + b"x" * (confirmed_choices.MAX_NDJSON_LINE_BYTES * 2) + b'", "booking_id": "B"}'
+    body = long_line + b'\n{"intent_id": "int_e", "booking_id": "B5"}\n'
+
+    results = _upload(client, seed, body)
+
+    assert [(r["line"], r["status"]) for r in results] == [(1, "invalid"), (2, "not_found")]
+    assert "longer than" in results[0]["detail"]
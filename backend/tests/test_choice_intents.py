@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.choice_intent import ChoiceIntent
+
+URL = "/api/v1/public/choice-intents/"
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limits(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+
+
+def _post(client, voyage_id, slider=0.5, intent_id=None, user_agent="Mozilla/5.0 test"):
+    payload = {
+        "voyage_id": voyage_id,
+        "slider_value": slider,
+        "delta_pct_from_standard": round((slider - 0.5) * 30, 2),
+    }
+    if intent_id is not None:
+        payload["intent_id"] = intent_id
+    return client.post(URL, json=payload, headers={"User-Agent": user_agent})
+
+
+def _stored(intent_id):
+    with SessionLocal() as db:
+        return db.get(ChoiceIntent, intent_id)
+
+
+def test_same_session_updates_its_intent(client, seed):
+    first = _post(client, seed["voyage_id"], slider=0.2)
+    assert first.status_code == 201
+    intent_id = first.json()["intent_id"]
+
+    second = _post(client, seed["voyage_id"], slider=0.8, intent_id=intent_id)
+    assert second.status_code == 200
+    assert second.json()["intent_id"] == intent_id
+    assert float(_stored(intent_id).slider_value) == 0.8
+
+
+def test_sessions_behind_one_address_stay_apart(client, seed):
+    # Same IP and user agent, e.g. two passengers on the ship's Wi-Fi
+    first = _post(client, seed["voyage_id"], slider=0.2)
+    second = _post(client, seed["voyage_id"], slider=0.9)
+    assert first.status_code == second.status_code == 201
+    assert first.json()["intent_id"] != second.json()["intent_id"]
+    assert float(_stored(first.json()["intent_id"]).slider_value) == 0.2
+
+
+def test_unknown_intent_id_creates_new(client, seed):
+    response = _post(client, seed["voyage_id"], intent_id="int_doesnotexist")
+    assert response.status_code == 201
+    assert response.json()["intent_id"] != "int_doesnotexist"
+
+
+def test_consumed_intent_is_not_reused(client, seed):
+    intent_id = _post(client, seed["voyage_id"]).json()["intent_id"]
+    with SessionLocal() as db:
+        db.get(ChoiceIntent, intent_id).consumed_at = datetime.now(timezone.utc)
+        db.commit()
+
+    response = _post(client, seed["voyage_id"], slider=0.7, intent_id=intent_id)
+    assert response.status_code == 201
+    assert response.json()["intent_id"] != intent_id
+    assert float(_stored(intent_id).slider_value) == 0.5
+
+
+def test_coalescing_disabled(client, seed, monkeypatch):
+    monkeypatch.setattr(settings, "intent_coalesce_window_seconds", 0)
+    intent_id = _post(client, seed["voyage_id"]).json()["intent_id"]
+    response = _post(client, seed["voyage_id"], intent_id=intent_id)
+    assert response.status_code == 201
+    assert response.json()["intent_id"] != intent_id
@@ -0,0 +1,40 @@
+from starlette.requests import Request
+
+from app.core import security
+from app.core.config import settings
+
+
+def _request(forwarded_for=None, peer="10.0.0.2"):
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 4321)})
+
+
+def test_connecting_address_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxy_hops", 0)
+    assert security.client_ip(_request("203.0.113.7")) == "10.0.0.2"
+
+
+def test_rightmost_entry_added_by_the_proxy(monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxy_hops", 1)
+    # The client sent its own (spoofed) X-Forwarded-For; the proxy appended the real address
+    assert security.client_ip(_request("1.2.3.4, 203.0.113.7")) == "203.0.113.7"
+
+
+def test_two_proxies(monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxy_hops", 2)
+    assert security.client_ip(_request("1.2.3.4, 203.0.113.7, 10.1.1.1")) == "203.0.113.7"
+
+
+def test_missing_header_falls_back_to_peer(monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxy_hops", 1)
+    assert security.client_ip(_request()) == "10.0.0.2"
+
+
+def test_warns_when_forwarded_for_is_ignored(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "trusted_proxy_hops", 0)
+    monkeypatch.setattr(security, "_warned_untrusted_forwarded_for", False)
+    with caplog.at_level("WARNING", logger="pacectrl.security"):
+        security.client_ip(_request("203.0.113.7"))
+        security.client_ip(_request("203.0.113.8"))
+    assert len(caplog.records) == 1
+    assert "TRUSTED_PROXY_HOPS" in caplog.records[0].getMessage()
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.database import engine
+from app.core.db_metrics import normalize_sql
+
+
+def test_server_timing_only_for_operators(client, seed, auth_headers):
+    public = client.get(
+        "/api/v1/public/widget/config",
+        params={"external_trip_id": "TRIP-1", "public_key": seed["public_key"]},
+    )
+    assert public.status_code == 200
+    assert "server-timing" not in public.headers
+
+    operator = client.get("/api/v1/operator/ships/", headers=auth_headers)
+    assert operator.status_code == 200
+    assert operator.headers["server-timing"].startswith("db;dur=")
+
+
+def test_failed_statement_clears_start_time(seed):
+    with engine.connect() as conn:
+        with pytest.raises(DBAPIError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        assert conn.info.get("query_start_time") == []
+
+
+def test_normalize_sql_keeps_casts():
+    assert normalize_sql("SELECT x::text FROM t WHERE id = :id_1 AND y = :y::jsonb") == (
+        "SELECT x::text FROM t WHERE id = ? AND y = ?::jsonb"
+    )
+    assert normalize_sql("SELECT a::int FROM t WHERE id IN (:p1, :p2, %(p3)s)") == (
+        "SELECT a::int FROM t WHERE id IN (?...)"
+    )
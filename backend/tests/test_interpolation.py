@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from sqlalchemy import Numeric, literal, select
+
+from app.core.co2_savings import projected_co2_saved_sql
+from app.core.database import SessionLocal
+from app.core.interpolation import (
+    _piecewise_linear,
+    anchor_arrays_from_rows,
+    interpolate_slider,
+    load_anchor_table,
+)
+from app.models import Voyage
+
+# slow / standard / fast speed, emissions, arrival delta minutes
+ANCHORS = anchor_arrays_from_rows([
+    [10, 14, 16, 800, 1000, 1300, 30, 0, -15],
+    # Slow and standard at the same speed
+    [14, 14, 16, 900, 1000, 1300, 0, 0, -15],
+])
+
+
+def _slider(values, row=0):
+    values = np.asarray(values, dtype=np.float64)
+    return interpolate_slider(ANCHORS, np.full(len(values), row), values)
+
+
+def test_anchors_are_exact():
+    result = _slider([0.0, 0.5, 1.0])
+    np.testing.assert_allclose(result.speed_knots, [10, 14, 16])
+    np.testing.assert_allclose(result.emissions_kg_co2, [800, 1000, 1300])
+    np.testing.assert_allclose(result.arrival_delta_minutes, [30, 0, -15])
+    np.testing.assert_allclose(result.co2_saved_kg, [200, 0, -300])
+
+
+def test_linear_between_anchors():
+    result = _slider([0.25, 0.75])
+    np.testing.assert_allclose(result.speed_knots, [12, 15])
+    np.testing.assert_allclose(result.emissions_kg_co2, [900, 1150])
+    np.testing.assert_allclose(result.delta_pct_from_standard, [(12 - 14) / 14 * 100, (15 - 14) / 14 * 100])
+
+
+def test_slider_outside_range_is_clamped():
+    result = _slider([-0.5, 1.7])
+    np.testing.assert_allclose(result.emissions_kg_co2, [800, 1300])
+    np.testing.assert_allclose(result.speed_knots, [10, 16])
+
+
+def test_slow_equal_to_standard_speed():
+    result = _slider([0.5], row=1)
+    assert result.delta_pct_from_standard[0] == 0
+    assert result.co2_saved_kg[0] == 0
+
+
+def test_zero_width_segment_resolves_to_middle_knot():
+    xp = np.array([[14.0, 14.0, 16.0]] * 3)
+    fp = np.array([[900.0, 1000.0, 1300.0]] * 3)
+    np.testing.assert_allclose(_piecewise_linear(np.array([13.0, 14.0, 15.0]), xp, fp), [900, 1000, 1150])
+
+    xp = np.array([[10.0, 14.0, 14.0]] * 2)
+    np.testing.assert_allclose(_piecewise_linear(np.array([14.0, 15.0]), xp, fp[:2]), [1000, 1300])
+
+
+def test_zero_standard_speed_gives_zero_delta_pct():
+    anchors = anchor_arrays_from_rows([[0, 0, 0, 1, 1, 1, 0, 0, 0]])
+    result = interpolate_slider(anchors, np.array([0]), np.array([0.3]))
+    assert result.delta_pct_from_standard[0] == 0
+
+
+def test_pairings_without_anchors_map_to_minus_one(seed):
+    with SessionLocal() as db:
+        voyage = db.get(Voyage, seed["voyage_id"])
+        table = load_anchor_table(db, [(voyage.route_id, voyage.ship_id)])
+        rows = table.rows_for([voyage.route_id, -1], [voyage.ship_id, -1])
+    assert rows.tolist() == [0, -1]
+
+
+@pytest.mark.parametrize("slider", ["0", "0.125", "0.333", "0.5", "0.501", "0.8", "1"])
+def test_numpy_and_sql_agree(seed, slider):
+    """Bulk confirm (NumPy) and single confirm (SQL) must store the same CO2 figure."""
+    with SessionLocal() as db:
+        voyage = db.get(Voyage, seed["voyage_id"])
+        table = load_anchor_table(db, [(voyage.route_id, voyage.ship_id)])
+        rows = table.rows_for([voyage.route_id], [voyage.ship_id])
+        numpy_saved = interpolate_slider(table.anchors, rows, np.array([float(slider)])).co2_saved_kg[0]
+
+        slider_value = literal(Decimal(slider), Numeric(4, 3))
+        sql_saved = db.execute(
+            select(projected_co2_saved_sql(slider_value, voyage.route_id, voyage.ship_id))
+        ).scalar_one()
+
+    assert float(sql_saved) == pytest.approx(numpy_saved, abs=0.005)
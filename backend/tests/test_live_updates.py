@@ -0,0 +1,149 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.core import live_updates, security
+from app.core.database import SessionLocal
+from app.core.live_updates import DashboardBroadcaster
+from app.models.choice_intent import ChoiceIntent
+from app.models.user import User
+
+
+@pytest.fixture
+def broadcaster(monkeypatch):
+    """A broadcaster whose LISTEN task does nothing (no database needed)."""
+    broadcaster = DashboardBroadcaster(debounce_ms=0, max_queued=16)
+
+    async def idle():
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(broadcaster, "_listen", idle)
+    return broadcaster
+
+
+async def _read(stream, timeout: float = 5):
+    """All chunks of *stream* until it ends on its own."""
+    chunks = []
+
+    async def consume():
+        async for chunk in stream:
+            chunks.append(chunk)
+
+    await asyncio.wait_for(consume(), timeout)
+    return chunks
+
+
+def _drain(subscriber):
+    items = []
+    while not subscriber.queue.empty():
+        items.append(subscriber.queue.get_nowait())
+    return items
+
+
+def test_stream_ends_when_the_token_expires(broadcaster):
+    async def run():
+        stream = broadcaster.stream(1, time.time() + 0.2, lambda: True)
+        started = time.monotonic()
+        chunks = await _read(stream)
+        return chunks, time.monotonic() - started
+
+    chunks, elapsed = asyncio.run(run())
+
+    assert chunks[-1] == "event: expired\ndata: {}\n\n"
+    assert 0.1 < elapsed < live_updates.KEEPALIVE_SECONDS
+    assert not broadcaster._operators
+
+
+def test_stream_delivers_events_until_expiry(broadcaster):
+    async def run():
+        stream = broadcaster.stream(1, time.time() + 0.3, lambda: True)
+        reader = asyncio.ensure_future(_read(stream))
+        await asyncio.sleep(0.05)
+        broadcaster._operators[1].send("choice_confirmed", '{"voyage_id": 7}')
+        return await reader
+
+    chunks = asyncio.run(run())
+
+    assert 'event: choice_confirmed\ndata: {"voyage_id": 7}\n\n' in chunks
+    assert chunks[-1].startswith("event: expired")
+
+
+def test_stream_ends_when_the_session_is_gone(broadcaster, monkeypatch):
+    monkeypatch.setattr(live_updates, "AUTH_RECHECK_SECONDS", 0)
+    checks = []
+
+    def is_authorized():
+        checks.append(1)
+        return len(checks) < 2
+
+    chunks = asyncio.run(_read(broadcaster.stream(1, time.time() + 3600, is_authorized)))
+
+    assert chunks[-1].startswith("event: expired")
+    assert len(checks) == 2
+
+
+def test_stream_refuses_a_logged_out_session(client, seed, requires_postgres):
+    db = SessionLocal()
+    user = User(operator_id=seed["operator_id"], username="stream-test", password_hash="unused", role="captain")
+    db.add(user)
+    db.commit()
+    try:
+        # Valid access token, but no refresh token left (never logged in / logged out)
+        token = security.create_access_token(
+            subject=user.id, operator_id=user.operator_id, role=user.role, expires_minutes=5
+        )
+        response = client.get("/api/v1/operator/dashboard/stream", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+    finally:
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+def test_new_intents_are_polled_while_a_stream_is_open(seed, requires_postgres):
+    broadcaster = DashboardBroadcaster(debounce_ms=0, max_queued=64)
+    operator_id, voyage_id = seed["operator_id"], seed["voyage_id"]
+    now = datetime.now(timezone.utc)
+
+    db = SessionLocal()
+    intent = ChoiceIntent(
+        intent_id="int_polltest",
+        voyage_id=voyage_id,
+        slider_value=Decimal("0.5"),
+        delta_pct_from_standard=Decimal("0"),
+        created_at=now,
+        expires_at=now + timedelta(minutes=30),
+    )
+
+    async def run():
+        subscriber = broadcaster._subscribe(operator_id)
+        broadcaster._listener.cancel()
+        # The first poll only records what the client already loaded
+        await broadcaster._flush()
+        assert subscriber.queue.empty()
+
+        db.add(intent)
+        db.commit()
+        await broadcaster._flush()
+        events = _drain(subscriber)
+
+        # Seen already: a later poll (same overlap window) does not repeat it
+        await broadcaster._flush()
+        assert all(event != "intent_created" for event, _ in _drain(subscriber))
+        broadcaster._unsubscribe(operator_id, subscriber)
+        return events
+
+    try:
+        events = asyncio.run(run())
+    finally:
+        db.delete(intent)
+        db.commit()
+        db.close()
+
+    assert events[0] == ("intent_created", json.dumps({"voyage_id": voyage_id}))
+    voyage_events = [json.loads(data) for event, data in events if event == "voyage"]
+    assert [row["voyage_id"] for row in voyage_events] == [voyage_id]
@@ -0,0 +1,16 @@
+from app.core.config import settings
+
+
+def test_metrics_off_without_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", None)
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_requires_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert "# HELP" in response.text
@@ -0,0 +1,26 @@
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+
+from app.core import metrics
+
+
+def _checked_out() -> float:
+    return REGISTRY.get_sample_value("pacectrl_db_pool_checked_out")
+
+
+def test_detached_connection_leaves_checked_out_count(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/pool.db")
+    metrics.instrument_pool(engine)
+    before = _checked_out()
+
+    with engine.connect():
+        assert _checked_out() == before + 1
+    assert _checked_out() == before
+
+    # Like the live updates LISTEN connection
+    connection = engine.raw_connection()
+    connection.detach()
+    assert _checked_out() == before
+    connection.close()
+    assert _checked_out() == before
+    engine.dispose()
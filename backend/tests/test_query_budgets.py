@@ -0,0 +1,55 @@
+"""One request per QUERY_BUDGETS entry, checked against its statement budget."""
+
+from app.core.query_counter import QUERY_BUDGETS
+
+
+def _create_intent(client, voyage_id: int) -> str:
+    response = client.post(
+        "/api/v1/public/choice-intents/",
+        json={"voyage_id": voyage_id, "slider_value": 0.25, "delta_pct_from_standard": -10},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["intent_id"]
+
+
+def test_every_budget_is_tested():
+    tested = {
+        "GET /api/v1/public/widget/config",
+        "POST /api/v1/public/choice-intents/",
+        "POST /api/v1/operator/confirmed-choices/",
+        "GET /api/v1/operator/dashboard/voyages",
+    }
+    assert set(QUERY_BUDGETS) == tested
+
+
+def test_widget_config(client, seed, query_budget):
+    with query_budget("GET /api/v1/public/widget/config"):
+        response = client.get(
+            "/api/v1/public/widget/config",
+            params={"external_trip_id": "TRIP-1", "public_key": seed["public_key"]},
+        )
+    assert response.status_code == 200, response.text
+    assert response.json()["id"] == seed["voyage_id"]
+
+
+def test_choice_intent(client, seed, query_budget):
+    with query_budget("POST /api/v1/public/choice-intents/"):
+        intent_id = _create_intent(client, seed["voyage_id"])
+    assert intent_id
+
+
+def test_confirmed_choice(requires_postgres, client, seed, query_budget):
+    intent_id = _create_intent(client, seed["voyage_id"])
+    with query_budget("POST /api/v1/operator/confirmed-choices/"):
+        response = client.post(
+            "/api/v1/operator/confirmed-choices/",
+            json={"intent_id": intent_id, "booking_id": "BK-1"},
+            headers={"X-Webhook-Secret": seed["webhook_secret"]},
+        )
+    assert response.status_code == 201, response.text
+
+
+def test_dashboard_voyages(requires_postgres, client, auth_headers, query_budget):
+    with query_budget("GET /api/v1/operator/dashboard/voyages"):
+        response = client.get("/api/v1/operator/dashboard/voyages", headers=auth_headers)
+    assert response.status_code == 200, response.text
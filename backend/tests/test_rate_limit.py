@@ -0,0 +1,90 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import InMemoryRateLimitBackend, RateLimitRule
+
+# 60/min refills one token per second
+RULE = RateLimitRule(per_minute=60, burst=3)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def test_burst_then_refused(clock):
+    backend = InMemoryRateLimitBackend()
+    assert [backend.hit("k", RULE) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert backend.hit("k", RULE) == pytest.approx(1.0)
+
+
+def test_refill(clock):
+    backend = InMemoryRateLimitBackend()
+    for _ in range(3):
+        backend.hit("k", RULE)
+    clock.now += 0.5
+    # Half a token back: half a second until the next one
+    assert backend.hit("k", RULE) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert backend.hit("k", RULE) == 0.0
+
+
+def test_refill_capped_at_burst(clock):
+    backend = InMemoryRateLimitBackend()
+    backend.hit("k", RULE)
+    clock.now += 3600
+    assert [backend.hit("k", RULE) for _ in range(4)][-1] > 0
+
+
+def test_keys_are_independent(clock):
+    backend = InMemoryRateLimitBackend()
+    for _ in range(3):
+        backend.hit("a", RULE)
+    assert backend.hit("a", RULE) > 0
+    assert backend.hit("b", RULE) == 0.0
+
+
+def test_lru_bound(clock):
+    backend = InMemoryRateLimitBackend(max_keys=2)
+    for _ in range(3):
+        backend.hit("a", RULE)
+    backend.hit("b", RULE)
+    backend.hit("c", RULE)
+    # "a" was evicted and starts with a full bucket again
+    assert backend.hit("a", RULE) == 0.0
+
+
+def test_retry_after_header(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit, "backend", InMemoryRateLimitBackend())
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_widget_config_per_minute", 20)
+    monkeypatch.setattr(settings, "rate_limit_widget_config_burst", 1)
+
+    rate_limit.enforce_rate_limit("widget_config", "k")
+    with pytest.raises(HTTPException) as exc_info:
+        rate_limit.enforce_rate_limit("widget_config", "k")
+    assert exc_info.value.status_code == 429
+    # 20/min = one token per 3 s; rounded up to whole seconds
+    assert exc_info.value.headers["Retry-After"] == "3"
+
+    clock.now += 2.5
+    with pytest.raises(HTTPException) as exc_info:
+        rate_limit.enforce_rate_limit("widget_config", "k")
+    assert exc_info.value.headers["Retry-After"] == "1"
+
+
+def test_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    assert rate_limit.get_rule("choice_intents") is None
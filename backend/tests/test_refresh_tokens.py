@@ -0,0 +1,203 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, update
+
+from app.core import refresh_tokens
+from app.core.database import SessionLocal
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user_id(seed, db):
+    """A throwaway captain, deleted with its refresh tokens afterwards."""
+    user = User(operator_id=seed["operator_id"], username="refresh-test", password_hash="unused", role="captain")
+    db.add(user)
+    db.commit()
+    yield user.id
+    db.rollback()
+    db.execute(RefreshToken.__table__.delete().where(RefreshToken.user_id == user.id))
+    db.delete(db.get(User, user.id))
+    db.commit()
+
+
+def _login(db, user_id: int) -> str:
+    token = refresh_tokens.issue(db, user_id)
+    db.commit()
+    return token
+
+
+def _row(db, token: str) -> RefreshToken:
+    db.expire_all()
+    return db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == refresh_tokens._hash(token))
+    ).scalar_one_or_none()
+
+
+def _age_revocation(db, token: str, seconds: int) -> None:
+    """Pretend *token* was revoked *seconds* ago."""
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == refresh_tokens._hash(token))
+        .values(revoked_at=datetime.now(timezone.utc) - timedelta(seconds=seconds))
+    )
+    db.commit()
+
+
+def _family_revoked(db, token: str) -> bool:
+    family_id = _row(db, token).family_id
+    return all(
+        row.revoked_at is not None
+        for row in db.execute(select(RefreshToken).where(RefreshToken.family_id == family_id)).scalars()
+    )
+
+
+def _rejected(db, token: str) -> HTTPException:
+    with pytest.raises(HTTPException) as excinfo:
+        refresh_tokens.rotate(db, token)
+    assert excinfo.value.status_code == 401
+    return excinfo.value
+
+
+def test_rotation_is_single_use(db, user_id):
+    first = _login(db, user_id)
+
+    user, second = refresh_tokens.rotate(db, first)
+
+    assert user.id == user_id and second != first
+    assert _row(db, first).revoked_at is not None
+    assert _row(db, second).revoked_at is None
+    assert _row(db, second).family_id == _row(db, first).family_id
+    # The successor works in turn
+    assert refresh_tokens.rotate(db, second)[0].id == user_id
+
+
+def test_unknown_token_is_rejected(db, user_id):
+    _rejected(db, "not-a-token")
+
+
+def test_repeat_within_grace_is_refused_without_revoking_the_session(db, user_id):
+    first = _login(db, user_id)
+    _, second = refresh_tokens.rotate(db, first)
+
+    _rejected(db, first)
+
+    assert _row(db, second).revoked_at is None
+    assert refresh_tokens.rotate(db, second)[0].id == user_id
+
+
+def test_reuse_after_grace_revokes_the_whole_session(db, user_id):
+    first = _login(db, user_id)
+    _, second = refresh_tokens.rotate(db, first)
+    _age_revocation(db, first, refresh_tokens.REUSE_GRACE_SECONDS + 1)
+    other_session = _login(db, user_id)
+
+    _rejected(db, first)
+
+    assert _family_revoked(db, second)
+    _rejected(db, second)
+    # Other logins of the same user are unaffected
+    assert refresh_tokens.rotate(db, other_session)[0].id == user_id
+
+
+def test_losing_the_claim_race_is_rejected(db, user_id, monkeypatch):
+    token = _login(db, user_id)
+    execute = db.execute
+    calls = []
+
+    def execute_after_concurrent_refresh(statement, *args, **kwargs):
+        # Another worker claims the token between our lookup and our UPDATE
+        if len(calls) == 1:
+            other = SessionLocal()
+            try:
+                refresh_tokens.rotate(other, token)
+            finally:
+                other.close()
+        calls.append(statement)
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db, "execute", execute_after_concurrent_refresh)
+    error = _rejected(db, token)
+    monkeypatch.undo()
+
+    assert error.detail == "Refresh token expired or already used"
+    # The winner's successor is the session's only usable token, and it was not revoked
+    family = db.execute(
+        select(RefreshToken).where(RefreshToken.family_id == _row(db, token).family_id)
+    ).scalars().all()
+    assert len(family) == 2
+    assert [row.revoked_at is None for row in family].count(True) == 1
+
+
+def test_expired_token_is_rejected(db, user_id):
+    token = _login(db, user_id)
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == refresh_tokens._hash(token))
+        .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    )
+    db.commit()
+
+    error = _rejected(db, token)
+
+    assert error.detail == "Refresh token expired or already used"
+    assert _row(db, token).revoked_at is None
+
+
+def test_logout_revokes_the_session(db, user_id):
+    first = _login(db, user_id)
+    _, second = refresh_tokens.rotate(db, first)
+
+    refresh_tokens.revoke(db, first)
+
+    assert _family_revoked(db, second)
+    _rejected(db, second)
+    # Unknown tokens are ignored
+    refresh_tokens.revoke(db, "not-a-token")
+
+
+def test_password_change_revokes_all_sessions(client, auth_headers, db, user_id):
+    sessions = [_login(db, user_id), _login(db, user_id)]
+
+    response = client.patch(
+        f"/api/v1/operator/users/{user_id}", json={"password": "a-new-password"}, headers=auth_headers
+    )
+
+    assert response.status_code == 200, response.text
+    for token in sessions:
+        assert _row(db, token).revoked_at is not None
+        _rejected(db, token)
+
+
+def test_prune_keeps_rotated_tokens_of_live_sessions(db, user_id):
+    rotated = _login(db, user_id)
+    _, live = refresh_tokens.rotate(db, rotated)
+    logged_out = _login(db, user_id)
+    refresh_tokens.revoke(db, logged_out)
+    expired = _login(db, user_id)
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == refresh_tokens._hash(expired))
+        .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    )
+    db.commit()
+
+    refresh_tokens.prune(db)
+    db.commit()
+
+    assert _row(db, live) is not None
+    # Still there, so presenting it again is detected as reuse
+    assert _row(db, rotated) is not None
+    assert _row(db, logged_out) is None
+    assert _row(db, expired) is None
@@ -0,0 +1,63 @@
+import pytest
+
+from app.core import widget_bundle
+
+
+@pytest.fixture
+def bundle_path(tmp_path, monkeypatch):
+    """Point the module at a temporary bundle path with nothing loaded yet."""
+    path = tmp_path / "widget.js"
+    monkeypatch.setattr(widget_bundle, "WIDGET_BUNDLE_PATH", path)
+    monkeypatch.setattr(widget_bundle, "_bundle", None)
+    monkeypatch.setattr(widget_bundle, "_missing_since_check", None)
+    return path
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(widget_bundle.time, "monotonic", clock)
+    return clock
+
+
+def test_missing_bundle_is_not_rechecked_on_every_request(bundle_path, clock, monkeypatch):
+    checks = []
+    real_load = widget_bundle.load
+    monkeypatch.setattr(widget_bundle, "load", lambda: checks.append(clock.now) or real_load())
+
+    assert widget_bundle.get() is None
+    bundle_path.write_text("console.log('widget');" * 50)
+    clock.now += widget_bundle.MISSING_BUNDLE_RECHECK_SECONDS - 1
+    assert widget_bundle.get() is None
+    assert len(checks) == 1
+
+    clock.now += 1
+    bundle = widget_bundle.get()
+    assert bundle is not None and len(checks) == 2
+    assert widget_bundle.get() is bundle and len(checks) == 2
+
+
+def test_startup_load_refreshes_a_cached_miss(bundle_path, clock):
+    assert widget_bundle.get() is None
+    bundle_path.write_text("console.log('widget');" * 50)
+
+    assert widget_bundle.load() is not None
+    assert widget_bundle.get() is not None
+
+
+def test_bundle_has_gzip_and_brotli_variants():
+    raw = b"console.log('widget');" * 50
+    bundle = widget_bundle.build_bundle(raw)
+
+    assert set(bundle.variants) == {"identity", "gzip", "br"}
+    assert bundle.negotiate("gzip, deflate, br") == "br"
+    assert bundle.negotiate("gzip") == "gzip"
+    assert bundle.negotiate("br;q=0, gzip;q=0") == "identity"
@@ -0,0 +1,107 @@
+"""
+Local stand-in for the PaceCtrl confirmed-choices API
+------------------------------------------------------
+Lets the NordLine backend be run and tested without a PaceCtrl account or
+network access, including PaceCtrl outages.
+
+    uvicorn fake_pacectrl:app --port 8001
+    PACECTRL_API_URL=http://localhost:8001 PACECTRL_WEBHOOK_SECRET=test-secret \
+        uvicorn main:app --port 8000
+
+Behaves like POST /api/v1/operator/confirmed-choices/ for webhook callers:
+  - 401 unless X-Webhook-Secret matches FAKE_PACECTRL_WEBHOOK_SECRET
+    (default test-secret)
+  - 404 for intent IDs that do not start with "int_", 400 for ones that
+    start with "int_expired"
+  - 201 for a new booking_id, 200 with the same record when it is repeated
+
+Faults can be injected at startup (FAKE_PACECTRL_FAIL_RATE, fraction of
+requests answered with 503; FAKE_PACECTRL_DELAY_MS, added latency) or while
+running:
+
+    curl -X POST localhost:8001/_faults -H 'Content-Type: application/json' \
+         -d '{"fail_rate": 1.0, "delay_ms": 0}'      # outage
+    curl localhost:8001/_confirmations                # what was recorded
+"""
+
+import asyncio
+import os
+import random
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+WEBHOOK_SECRET = os.getenv("FAKE_PACECTRL_WEBHOOK_SECRET", "test-secret")
+
+app = FastAPI(title="Fake PaceCtrl")
+
+
+class Faults(BaseModel):
+    fail_rate: float = float(os.getenv("FAKE_PACECTRL_FAIL_RATE", "0"))
+    delay_ms: int = int(os.getenv("FAKE_PACECTRL_DELAY_MS", "0"))
+
+
+class ConfirmedChoiceCreate(BaseModel):
+    intent_id: str
+    booking_id: str
+
+
+faults = Faults()
+# booking_id -> confirmed choice record
+confirmations: Dict[str, dict] = {}
+stats = {"requests": 0, "failed": 0}
+
+
+@app.post("/api/v1/operator/confirmed-choices/")
+async def create_confirmed_choice(
+    payload: ConfirmedChoiceCreate,
+    x_webhook_secret: Optional[str] = Header(None),
+):
+    stats["requests"] += 1
+    if faults.delay_ms:
+        await asyncio.sleep(faults.delay_ms / 1000)
+    if random.random() < faults.fail_rate:
+        stats["failed"] += 1
+        raise HTTPException(status_code=503, detail="Service unavailable (injected)")
+
+    if x_webhook_secret != WEBHOOK_SECRET:
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+    if not payload.intent_id.startswith("int_"):
+        raise HTTPException(status_code=404, detail="Choice intent not found")
+    if payload.intent_id.startswith("int_expired"):
+        raise HTTPException(status_code=400, detail="Choice intent has expired")
+
+    existing = confirmations.get(payload.booking_id)
+    if existing is not None:
+        return JSONResponse(existing, status_code=200)
+
+    record = {
+        "id": len(confirmations) + 1,
+        "intent_id": payload.intent_id,
+        "booking_id": payload.booking_id,
+        "confirmed_at": datetime.now(timezone.utc).isoformat(),
+    }
+    confirmations[payload.booking_id] = record
+    return JSONResponse(record, status_code=201)
+
+
+@app.post("/_faults")
+def set_faults(new_faults: Faults):
+    """Change injected failures and latency at runtime."""
+    global faults
+    faults = new_faults
+    return faults
+
+
+@app.get("/_confirmations")
+def list_confirmations():
+    """Recorded confirmations and request counters, for assertions in tests."""
+    return {"stats": stats, "confirmations": list(confirmations.values())}
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok", "service": "fake-pacectrl"}
@@ -6,6 +6,17 @@ Its only job is to receive a confirmed booking intent from the frontend
 and forward it to the PaceCtrl confirmed-choices API using the operator
 webhook secret.
 
+This is the reference operators copy, so the forwarding follows the
+recommended pattern:
+  - One pooled httpx.AsyncClient for the whole process (created at startup),
+    so confirmations reuse warm TCP/TLS connections.
+  - Short timeouts and a few retries with jittered exponential backoff on
+    network errors, 5xx and 429. The PaceCtrl endpoint is idempotent per
+    booking_id, so a retry never creates a duplicate.
+  - If PaceCtrl is still unreachable, the booking succeeds anyway and the
+    confirmation goes into a local outbox (SQLite) that a background task
+    replays until it is delivered or rejected.
+
 Environment variables (set in Railway or a local .env file):
   PACECTRL_API_URL        - Base URL of the PaceCtrl API
                             e.g. https://pacectrl-production.up.railway.app
@@ -13,14 +24,30 @@ Environment variables (set in Railway or a local .env file):
                             (PaceCtrl hashes it server-side for comparison)
   ALLOWED_ORIGINS         - Comma-separated CORS origins, e.g.
                             https://nordline-frontend.up.railway.app,http://localhost:3000
+  PACECTRL_TIMEOUT_SECONDS - Per-attempt timeout (default 5)
+  PACECTRL_MAX_ATTEMPTS   - Attempts per confirmation before it goes to the
+                            outbox (default 3)
+  PACECTRL_MAX_CONNECTIONS - Connection pool size (default 20)
+  OUTBOX_PATH             - SQLite file for undelivered confirmations
+                            (default outbox.db)
+  OUTBOX_REPLAY_SECONDS   - How often the outbox is replayed (default 15)
+
+For local testing without PaceCtrl, run the stand-in server in
+fake_pacectrl.py and point PACECTRL_API_URL at it.
 """
 
+import asyncio
 import os
+import random
+import sqlite3
+import time
 import uuid
 import logging
+from contextlib import asynccontextmanager, closing
+from typing import List, Tuple
 
 import httpx
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
@@ -36,6 +63,22 @@ PACECTRL_API_URL: str = os.getenv("PACECTRL_API_URL")
 # set the env variable directly so it is never committed to source control.
 PACECTRL_WEBHOOK_SECRET: str = os.getenv("PACECTRL_WEBHOOK_SECRET")
 
+PACECTRL_TIMEOUT_SECONDS = float(os.getenv("PACECTRL_TIMEOUT_SECONDS", "5"))
+PACECTRL_MAX_ATTEMPTS = max(int(os.getenv("PACECTRL_MAX_ATTEMPTS", "3")), 1)
+PACECTRL_MAX_CONNECTIONS = int(os.getenv("PACECTRL_MAX_CONNECTIONS", "20"))
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", "outbox.db")
+OUTBOX_REPLAY_SECONDS = float(os.getenv("OUTBOX_REPLAY_SECONDS", "15"))
+
+CONFIRM_PATH = "/api/v1/operator/confirmed-choices/"
+
+# Backoff between attempts within one request: full jitter, capped
+RETRY_BASE_SECONDS = 0.25
+RETRY_MAX_SECONDS = 2.0
+# Backoff between outbox replays of the same confirmation
+OUTBOX_MAX_BACKOFF_SECONDS = 600
+# Confirmations replayed concurrently per outbox pass
+OUTBOX_BATCH_SIZE = 50
+
 # Parse allowed origins from env — defaults to wildcard for local dev
 _raw_origins = os.getenv("ALLOWED_ORIGINS", "*")
 ALLOWED_ORIGINS = [o.strip() for o in _raw_origins.split(",") if o.strip()]
@@ -43,10 +86,186 @@ ALLOWED_ORIGINS = [o.strip() for o in _raw_origins.split(",") if o.strip()]
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("nordline-backend")
 
+
+# ---------------------------------------------------------------------------
+# Forwarding to PaceCtrl
+# ---------------------------------------------------------------------------
+class DeliveryError(Exception):
+    """A confirmation PaceCtrl did not accept; `retryable` if trying again may help."""
+
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def create_pacectrl_client() -> httpx.AsyncClient:
+    """The process-wide PaceCtrl client: pooled keep-alive connections, short timeouts."""
+    return httpx.AsyncClient(
+        base_url=(PACECTRL_API_URL or "").rstrip("/"),
+        headers={"X-Webhook-Secret": PACECTRL_WEBHOOK_SECRET or ""},
+        timeout=httpx.Timeout(PACECTRL_TIMEOUT_SECONDS, connect=min(PACECTRL_TIMEOUT_SECONDS, 3.0)),
+        limits=httpx.Limits(
+            max_connections=PACECTRL_MAX_CONNECTIONS,
+            max_keepalive_connections=PACECTRL_MAX_CONNECTIONS,
+            keepalive_expiry=60,
+        ),
+    )
+
+
+def backoff_seconds(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff, so retrying clients do not all come back at once."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+async def send_confirmation(client: httpx.AsyncClient, body: dict) -> None:
+    """POST one confirmation once; raises DeliveryError if it was not accepted."""
+    try:
+        response = await client.post(CONFIRM_PATH, json=body)
+    except httpx.TransportError as exc:
+        # Connect/read timeouts, refused or reset connections, pool exhaustion
+        raise DeliveryError(f"Could not reach PaceCtrl API: {exc!r}", retryable=True)
+
+    if response.status_code in (200, 201):
+        return
+    retryable = response.status_code >= 500 or response.status_code == 429
+    raise DeliveryError(
+        f"PaceCtrl API error ({response.status_code}): {response.text}",
+        retryable=retryable,
+    )
+
+
+async def forward_confirmation(client: httpx.AsyncClient, body: dict) -> None:
+    """Send a confirmation, retrying transient failures up to PACECTRL_MAX_ATTEMPTS times."""
+    for attempt in range(PACECTRL_MAX_ATTEMPTS):
+        try:
+            await send_confirmation(client, body)
+            return
+        except DeliveryError as exc:
+            if not exc.retryable or attempt == PACECTRL_MAX_ATTEMPTS - 1:
+                raise
+            delay = backoff_seconds(attempt, RETRY_BASE_SECONDS, RETRY_MAX_SECONDS)
+            logger.warning(
+                "Attempt %d for booking %s failed (%s); retrying in %.2fs",
+                attempt + 1, body["booking_id"], exc, delay,
+            )
+            await asyncio.sleep(delay)
+
+
+# ---------------------------------------------------------------------------
+# Outbox
+# ---------------------------------------------------------------------------
+class Outbox:
+    """
+    Confirmations PaceCtrl could not take yet, in a local SQLite file so they
+    survive restarts. Keyed by booking_id; adding the same booking again
+    replaces it.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                booking_id TEXT PRIMARY KEY,
+                intent_id TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT
+            )
+            """
+        )
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with closing(sqlite3.connect(self._path, timeout=10)) as conn:
+            rows = conn.execute(sql, params).fetchall()
+            conn.commit()
+            return rows
+
+    def add(self, body: dict, error: str) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO outbox (booking_id, intent_id, next_attempt_at, last_error) VALUES (?, ?, ?, ?)",
+            (body["booking_id"], body["intent_id"], time.time() + OUTBOX_REPLAY_SECONDS, error),
+        )
+
+    def due(self, limit: int) -> List[Tuple[str, str, int]]:
+        """(booking_id, intent_id, attempts) of entries whose next attempt is due, oldest first."""
+        return self._execute(
+            "SELECT booking_id, intent_id, attempts FROM outbox WHERE next_attempt_at <= ? "
+            "ORDER BY next_attempt_at LIMIT ?",
+            (time.time(), limit),
+        )
+
+    def remove(self, booking_id: str) -> None:
+        self._execute("DELETE FROM outbox WHERE booking_id = ?", (booking_id,))
+
+    def reschedule(self, booking_id: str, attempts: int, delay: float, error: str) -> None:
+        self._execute(
+            "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE booking_id = ?",
+            (attempts, time.time() + delay, error, booking_id),
+        )
+
+    def pending(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM outbox")[0][0]
+
+
+async def replay_entry(client: httpx.AsyncClient, outbox: Outbox, entry: Tuple[str, str, int]) -> None:
+    booking_id, intent_id, attempts = entry
+    try:
+        await send_confirmation(client, {"intent_id": intent_id, "booking_id": booking_id})
+    except DeliveryError as exc:
+        if not exc.retryable:
+            # e.g. the intent expired while PaceCtrl was unreachable; retrying cannot help
+            logger.error("Dropping outbox confirmation for booking %s: %s", booking_id, exc)
+            await asyncio.to_thread(outbox.remove, booking_id)
+            return
+        delay = backoff_seconds(attempts + 1, OUTBOX_REPLAY_SECONDS, OUTBOX_MAX_BACKOFF_SECONDS)
+        await asyncio.to_thread(outbox.reschedule, booking_id, attempts + 1, max(delay, 1.0), str(exc))
+        return
+
+    logger.info("Delivered outbox confirmation for booking %s", booking_id)
+    await asyncio.to_thread(outbox.remove, booking_id)
+
+
+async def replay_outbox(client: httpx.AsyncClient, outbox: Outbox) -> int:
+    """Send every due outbox entry once, concurrently; returns how many were attempted."""
+    entries = await asyncio.to_thread(outbox.due, OUTBOX_BATCH_SIZE)
+    await asyncio.gather(*(replay_entry(client, outbox, entry) for entry in entries))
+    return len(entries)
+
+
+async def run_outbox_replayer(client: httpx.AsyncClient, outbox: Outbox, stop: asyncio.Event) -> None:
+    """Background task: replay the outbox every OUTBOX_REPLAY_SECONDS until *stop* is set."""
+    while not stop.is_set():
+        try:
+            # Keep going while full batches come back, so a backlog drains quickly
+            while await replay_outbox(client, outbox) == OUTBOX_BATCH_SIZE and not stop.is_set():
+                pass
+        except Exception:
+            logger.exception("Outbox replay failed")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=OUTBOX_REPLAY_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
 # ---------------------------------------------------------------------------
 # App
 # ---------------------------------------------------------------------------
-app = FastAPI(title="NordLine Demo Backend", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.pacectrl = create_pacectrl_client()
+    app.state.outbox = Outbox(OUTBOX_PATH)
+    stop = asyncio.Event()
+    replayer = asyncio.create_task(run_outbox_replayer(app.state.pacectrl, app.state.outbox, stop))
+    try:
+        yield
+    finally:
+        stop.set()
+        await replayer
+        await app.state.pacectrl.aclose()
+
+
+app = FastAPI(title="NordLine Demo Backend", version="1.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -67,7 +286,7 @@ class ConfirmBookingRequest(BaseModel):
 
 class ConfirmBookingResponse(BaseModel):
     booking_id: str
-    confirmed: bool
+    confirmed: bool  # False while the confirmation waits in the outbox
     message: str
 
 
@@ -75,32 +294,36 @@ class ConfirmBookingResponse(BaseModel):
 # Routes
 # ---------------------------------------------------------------------------
 @app.get("/health")
-def health():
-    """Simple liveness probe."""
-    return {"status": "ok", "service": "nordline-backend"}
+def health(request: Request):
+    """Simple liveness probe, with the number of confirmations waiting in the outbox."""
+    return {
+        "status": "ok",
+        "service": "nordline-backend",
+        "outbox_pending": request.app.state.outbox.pending(),
+    }
 
 
 @app.post("/api/confirm-booking", response_model=ConfirmBookingResponse)
-async def confirm_booking(payload: ConfirmBookingRequest):
+async def confirm_booking(payload: ConfirmBookingRequest, request: Request):
     """
     Confirm a passenger booking.
 
     1. Generate a unique booking reference (NL-XXXXXXXX).
     2. POST the intent + booking ID to the PaceCtrl confirmed-choices endpoint
-       using the operator webhook secret for authentication.
-    3. Return the booking reference to the frontend.
+       using the operator webhook secret for authentication, retrying
+       transient failures.
+    3. If PaceCtrl stays unreachable, queue the confirmation in the outbox.
+    4. Return the booking reference to the frontend.
     """
-    if not PACECTRL_WEBHOOK_SECRET:
-        logger.error("PACECTRL_WEBHOOK_SECRET is not configured")
+    if not PACECTRL_WEBHOOK_SECRET or not PACECTRL_API_URL:
+        logger.error("PACECTRL_WEBHOOK_SECRET or PACECTRL_API_URL is not configured")
         raise HTTPException(
             status_code=500,
-            detail="Operator webhook secret is not configured. Set PACECTRL_WEBHOOK_SECRET.",
+            detail="PaceCtrl is not configured. Set PACECTRL_API_URL and PACECTRL_WEBHOOK_SECRET.",
         )
 
     # Generate a human-readable booking reference for the demo
     booking_id = f"NL-{uuid.uuid4().hex[:8].upper()}"
-
-    confirm_url = f"{PACECTRL_API_URL.rstrip('/')}/api/v1/operator/confirmed-choices/"
     request_body = {
         "intent_id": payload.intent_id,
         "booking_id": booking_id,
@@ -108,29 +331,21 @@ async def confirm_booking(payload: ConfirmBookingRequest):
 
     logger.info("Confirming booking: intent=%s booking=%s", payload.intent_id, booking_id)
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        try:
-            response = await client.post(
-                confirm_url,
-                json=request_body,
-                headers={"X-Webhook-Secret": PACECTRL_WEBHOOK_SECRET},
-            )
-        except httpx.RequestError as exc:
-            logger.error("Network error calling PaceCtrl API: %s", exc)
-            raise HTTPException(
-                status_code=502,
-                detail=f"Could not reach PaceCtrl API: {exc}",
-            )
+    try:
+        await forward_confirmation(request.app.state.pacectrl, request_body)
+    except DeliveryError as exc:
+        if not exc.retryable:
+            # Unknown or expired intent, bad secret: the caller has to act on it
+            logger.error("PaceCtrl rejected booking %s: %s", booking_id, exc)
+            raise HTTPException(status_code=502, detail=str(exc))
 
-    if response.status_code not in (200, 201):
-        logger.error(
-            "PaceCtrl API returned %s: %s",
-            response.status_code,
-            response.text,
-        )
-        raise HTTPException(
-            status_code=502,
-            detail=f"PaceCtrl API error ({response.status_code}): {response.text}",
+        # The booking itself stands; record the speed preference later
+        await asyncio.to_thread(request.app.state.outbox.add, request_body, str(exc))
+        logger.warning("PaceCtrl unavailable, queued booking %s in the outbox: %s", booking_id, exc)
+        return ConfirmBookingResponse(
+            booking_id=booking_id,
+            confirmed=False,
+            message="Booking confirmed. Speed preference will be recorded shortly.",
         )
 
     logger.info("Booking confirmed: %s", booking_id)
@@ -5,7 +5,10 @@ import HomePage from './pages/HomePage'
 import LoginPage from './pages/LoginPage'
 import DashboardPage from './pages/DashboardPage'
 import AboutPage from './pages/AboutPage'
-import { onUnauthorized } from './utils/authFetch'
+import { onTokenRefreshed, onUnauthorized, REFRESH_TOKEN_KEY } from './utils/authFetch'
+
+const LOGOUT_URL =
+  'https://pacectrl-production.up.railway.app/api/v1/operator/auth/logout'
 
 type View = 'home' | 'login' | 'dashboard' | 'about'
 
@@ -42,10 +45,19 @@ function App() {
     }
   }, [view])
 
-  const handleLoginSuccess = (newToken: string, newOperatorId: number | null) => {
+  const handleLoginSuccess = (
+    newToken: string,
+    refreshToken: string | null,
+    newOperatorId: number | null,
+  ) => {
     setToken(newToken)
     setOperatorId(newOperatorId)
     window.localStorage.setItem('pacectrl_token', newToken)
+    if (refreshToken) {
+      window.localStorage.setItem(REFRESH_TOKEN_KEY, refreshToken)
+    } else {
+      window.localStorage.removeItem(REFRESH_TOKEN_KEY)
+    }
     if (newOperatorId !== null) {
       window.localStorage.setItem('pacectrl_operator_id', String(newOperatorId))
     } else {
@@ -55,9 +67,19 @@ function App() {
   }
 
   const handleLogout = useCallback(() => {
+    const refreshToken = window.localStorage.getItem(REFRESH_TOKEN_KEY)
+    if (refreshToken) {
+      // End the server-side session; nothing to do if this fails
+      fetch(LOGOUT_URL, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      }).catch(() => {})
+    }
     setToken(null)
     setOperatorId(null)
     window.localStorage.removeItem('pacectrl_token')
+    window.localStorage.removeItem(REFRESH_TOKEN_KEY)
     window.localStorage.removeItem('pacectrl_operator_id')
     setView('home')
   }, [])
@@ -67,6 +89,11 @@ function App() {
     return onUnauthorized(handleLogout)
   }, [handleLogout])
 
+  // authFetch swapped in a new access token after a refresh
+  useEffect(() => {
+    return onTokenRefreshed(setToken)
+  }, [])
+
   const handleLogoClick = () => {
     setView('home')
   }
@@ -28,9 +28,15 @@ import OpenInNewIcon from '@mui/icons-material/OpenInNewRounded'
 import DirectionsBoatIcon from '@mui/icons-material/DirectionsBoatRounded'
 import ArrowUpwardIcon from '@mui/icons-material/ArrowUpwardRounded'
 import ArrowDownwardIcon from '@mui/icons-material/ArrowDownwardRounded'
-import type { AuthMeResponse, DashboardOverview, DashboardVoyagesResponse } from '../../types/api'
+import type {
+  AuthMeResponse,
+  DashboardOverview,
+  DashboardVoyageEntry,
+  DashboardVoyagesResponse,
+} from '../../types/api'
 import type { DashboardSection } from '../../pages/DashboardPage'
 import { authFetch, ForbiddenError } from '../../utils/authFetch'
+import { subscribeDashboard } from '../../utils/dashboardStream'
 
 const ME_URL = 'https://pacectrl-production.up.railway.app/api/v1/operator/auth/me'
 const OVERVIEW_URL = 'https://pacectrl-production.up.railway.app/api/v1/operator/dashboard/overview'
@@ -99,6 +105,29 @@ const statusGradient: Record<string, string> = {
   cancelled: 'linear-gradient(135deg, #E17055, #FAB1A0)',
 }
 
+/* ── Live updates: replace one voyage row and adjust the totals derived from it ── */
+/* Operator-wide averages, medians and the per-day series stay as loaded until the next reload */
+const applyVoyageUpdate = (
+  prev: DashboardVoyagesResponse | null,
+  voyage: DashboardVoyageEntry,
+): DashboardVoyagesResponse | null => {
+  if (!prev) return prev
+  const index = prev.voyages.findIndex((v) => v.voyage_id === voyage.voyage_id)
+  const old = index >= 0 ? prev.voyages[index] : null
+  const choicesDelta = voyage.confirmed_choices_count - (old?.confirmed_choices_count ?? 0)
+  const voyages = index >= 0
+    ? prev.voyages.map((v, i) => (i === index ? voyage : v))
+    : [...prev.voyages, voyage]
+
+  return {
+    ...prev,
+    voyages,
+    total_active_intents: prev.total_active_intents + voyage.active_intents - (old?.active_intents ?? 0),
+    total_confirmed_choices: prev.total_confirmed_choices + choicesDelta,
+    confirmed_choices_last_30_days: prev.confirmed_choices_last_30_days + choicesDelta,
+  }
+}
+
 /* ── Overview card config (from /dashboard/overview) ── */
 const overviewCards: {
   label: string
@@ -243,6 +272,33 @@ function OverviewSection({ token, onNavigate }: OverviewSectionProps) {
     void fetchData()
   }, [token])
 
+  // Live updates instead of re-polling /dashboard/voyages
+  useEffect(() => {
+    if (!token) return
+
+    const reloadVoyages = async () => {
+      try {
+        const dashRes = await authFetch(DASHBOARD_VOYAGES_URL, {
+          method: 'GET',
+          headers: { Authorization: `Bearer ${token}` },
+        })
+        if (dashRes.ok) {
+          setData((await dashRes.json()) as DashboardVoyagesResponse)
+        }
+      } catch {
+        // keep the current data; the next resync or section switch reloads it
+      }
+    }
+
+    return subscribeDashboard(token, (event) => {
+      if (event.type === 'voyage') {
+        setData((prev) => applyVoyageUpdate(prev, event.voyage))
+      } else if (event.type === 'resync') {
+        void reloadVoyages()
+      }
+    })
+  }, [token])
+
   const handleSort = (property: string) => {
     const isAsc = orderBy === property && order === 'asc'
     setOrder(isAsc ? 'desc' : 'asc')
@@ -3,7 +3,7 @@ import { Box, Button, Container, Paper, Stack, TextField, Typography } from '@mu
 import LockOutlinedIcon from '@mui/icons-material/LockOutlined'
 
 type LoginPageProps = {
-  onLoginSuccess: (token: string, operatorId: number | null) => void
+  onLoginSuccess: (token: string, refreshToken: string | null, operatorId: number | null) => void
   onNavigateToAbout: () => void
 }
 
@@ -47,6 +47,7 @@ function LoginPage({ onLoginSuccess, onNavigateToAbout }: LoginPageProps) {
 
       const data = await response.json()
       const receivedToken = (data as { access_token?: string }).access_token ?? null
+      const refreshToken = (data as { refresh_token?: string }).refresh_token ?? null
 
       if (receivedToken) {
         let operatorId: number | null = null
@@ -69,7 +70,7 @@ function LoginPage({ onLoginSuccess, onNavigateToAbout }: LoginPageProps) {
           // ignore profile load errors
         }
 
-        onLoginSuccess(receivedToken, operatorId)
+        onLoginSuccess(receivedToken, refreshToken, operatorId)
         setUsername('')
         setPassword('')
         setError('')
@@ -1,13 +1,23 @@
 /**
- * A thin wrapper around `fetch` that automatically detects HTTP 401
- * (Unauthorized) responses and dispatches a custom event so the app
- * can log the user out. Also throws on 403 (Forbidden) with a
- * user-friendly message.
+ * A thin wrapper around `fetch` that handles HTTP 401 (Unauthorized)
+ * responses: it first tries to exchange the stored refresh token for a new
+ * access token and retries the request once. If the refresh is refused
+ * because another tab rotated the token first, it uses the tokens that tab
+ * stored. Only if neither works does it dispatch a custom event so the app
+ * can log the user out. Also throws on 403 (Forbidden) with a user-friendly
+ * message.
  *
  * Usage: drop-in replacement for `fetch()`.
  */
 
 const UNAUTHORIZED_EVENT = 'pacectrl:unauthorized'
+const TOKEN_REFRESHED_EVENT = 'pacectrl:token-refreshed'
+
+const REFRESH_URL =
+  'https://pacectrl-production.up.railway.app/api/v1/operator/auth/refresh'
+
+export const TOKEN_KEY = 'pacectrl_token'
+export const REFRESH_TOKEN_KEY = 'pacectrl_refresh_token'
 
 /** Custom error thrown on 403 Forbidden responses. */
 export class ForbiddenError extends Error {
@@ -26,14 +36,113 @@ export function onUnauthorized(callback: () => void) {
   return () => window.removeEventListener(UNAUTHORIZED_EVENT, callback)
 }
 
+export function onTokenRefreshed(callback: (token: string) => void) {
+  const listener = (event: Event) => callback((event as CustomEvent<string>).detail)
+  window.addEventListener(TOKEN_REFRESHED_EVENT, listener)
+  return () => window.removeEventListener(TOKEN_REFRESHED_EVENT, listener)
+}
+
+// Refresh tokens are single-use, so concurrent 401s share one refresh call
+let pendingRefresh: Promise<string | null> | null = null
+
+// How long a failed refresh waits for another tab to store the token it won
+const OTHER_TAB_WAIT_MS = 3000
+
+function storeTokens(accessToken: string, refreshToken: string) {
+  window.localStorage.setItem(TOKEN_KEY, accessToken)
+  window.localStorage.setItem(REFRESH_TOKEN_KEY, refreshToken)
+  window.dispatchEvent(new CustomEvent(TOKEN_REFRESHED_EVENT, { detail: accessToken }))
+}
+
+/**
+ * After our refresh was refused: if another tab rotated the same refresh
+ * token, it stores the new tokens in localStorage (now or within
+ * OTHER_TAB_WAIT_MS). Resolves with its access token, or null if nothing
+ * changed and the session is really gone.
+ */
+function tokenFromOtherTab(usedRefreshToken: string): Promise<string | null> {
+  const current = () => {
+    const refreshToken = window.localStorage.getItem(REFRESH_TOKEN_KEY)
+    const accessToken = window.localStorage.getItem(TOKEN_KEY)
+    return refreshToken && refreshToken !== usedRefreshToken ? accessToken : null
+  }
+
+  const token = current()
+  if (token) {
+    window.dispatchEvent(new CustomEvent(TOKEN_REFRESHED_EVENT, { detail: token }))
+    return Promise.resolve(token)
+  }
+
+  return new Promise((resolve) => {
+    const finish = (result: string | null) => {
+      window.clearTimeout(timer)
+      window.removeEventListener('storage', listener)
+      if (result) {
+        window.dispatchEvent(new CustomEvent(TOKEN_REFRESHED_EVENT, { detail: result }))
+      }
+      resolve(result)
+    }
+    // 'storage' fires in this tab when another tab writes localStorage
+    const listener = (event: StorageEvent) => {
+      if (event.key === REFRESH_TOKEN_KEY || event.key === TOKEN_KEY) {
+        const result = current()
+        if (result) finish(result)
+      }
+    }
+    const timer = window.setTimeout(() => finish(current()), OTHER_TAB_WAIT_MS)
+    window.addEventListener('storage', listener)
+  })
+}
+
+async function refreshAccessToken(): Promise<string | null> {
+  const refreshToken = window.localStorage.getItem(REFRESH_TOKEN_KEY)
+  if (!refreshToken) {
+    return null
+  }
+  try {
+    const response = await fetch(REFRESH_URL, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    })
+    if (response.ok) {
+      const data = (await response.json()) as { access_token: string; refresh_token: string }
+      storeTokens(data.access_token, data.refresh_token)
+      return data.access_token
+    }
+  } catch {
+    // Network error; fall through and see whether another tab refreshed
+  }
+  // Two tabs refreshing with the same token: the loser is refused, but the
+  // session lives on in the winner's tokens
+  return tokenFromOtherTab(refreshToken)
+}
+
+function refreshOnce(): Promise<string | null> {
+  if (!pendingRefresh) {
+    pendingRefresh = refreshAccessToken().finally(() => {
+      pendingRefresh = null
+    })
+  }
+  return pendingRefresh
+}
+
 export async function authFetch(
   input: RequestInfo | URL,
   init?: RequestInit,
 ): Promise<Response> {
-  const response = await fetch(input, init)
+  let response = await fetch(input, init)
 
   if (response.status === 401) {
-    dispatchUnauthorized()
+    const newToken = await refreshOnce()
+    if (newToken) {
+      const headers = new Headers(init?.headers)
+      headers.set('Authorization', `Bearer ${newToken}`)
+      response = await fetch(input, { ...init, headers })
+    }
+    if (response.status === 401) {
+      dispatchUnauthorized()
+    }
   }
 
   if (response.status === 403) {
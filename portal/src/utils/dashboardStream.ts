@@ -0,0 +1,127 @@
+/**
+ * Client for the dashboard live updates stream (server-sent events).
+ *
+ * Uses `authFetch` rather than `EventSource` so the bearer token can be sent
+ * in the Authorization header, and is refreshed when it has expired.
+ * Reconnects with a growing delay when the stream drops, and sends a
+ * `resync` event after reconnecting because changes made in the meantime
+ * were missed. The server ends the stream with `expired` when the token
+ * expires or the session ends; that reconnects straight away.
+ */
+
+import type { DashboardVoyageEntry } from '../types/api'
+import { authFetch, ForbiddenError, TOKEN_KEY } from './authFetch'
+
+const STREAM_URL =
+  'https://pacectrl-production.up.railway.app/api/v1/operator/dashboard/stream'
+
+const MIN_RETRY_MS = 2000
+const MAX_RETRY_MS = 60000
+
+export type DashboardStreamEvent =
+  | { type: 'intent_created' | 'choice_confirmed'; voyageId: number }
+  | { type: 'voyage'; voyage: DashboardVoyageEntry }
+  | { type: 'resync' }
+  | { type: 'expired' }
+
+function parseEvent(block: string): DashboardStreamEvent | null {
+  let event = 'message'
+  const dataLines: string[] = []
+  for (const line of block.split('\n')) {
+    if (line.startsWith('event:')) {
+      event = line.slice(6).trim()
+    } else if (line.startsWith('data:')) {
+      dataLines.push(line.slice(5).trim())
+    }
+  }
+  if (dataLines.length === 0) {
+    return null // keepalive comment or retry hint
+  }
+  const data = JSON.parse(dataLines.join('\n'))
+
+  if (event === 'voyage') {
+    return { type: 'voyage', voyage: data as DashboardVoyageEntry }
+  }
+  if (event === 'resync' || event === 'expired') {
+    return { type: event }
+  }
+  if (event === 'intent_created' || event === 'choice_confirmed') {
+    return { type: event, voyageId: (data as { voyage_id: number }).voyage_id }
+  }
+  return null
+}
+
+/**
+ * Open the stream for the operator of *token*. Returns a function that
+ * closes it. `onUnavailable` is called if the server has live updates
+ * switched off (the caller can keep its old behaviour).
+ */
+export function subscribeDashboard(
+  token: string,
+  onEvent: (event: DashboardStreamEvent) => void,
+  onUnavailable?: () => void,
+): () => void {
+  const controller = new AbortController()
+  let retryMs = MIN_RETRY_MS
+  let connectedBefore = false
+
+  const run = async () => {
+    while (!controller.signal.aborted) {
+      let expired = false
+      try {
+        const response = await authFetch(STREAM_URL, {
+          headers: { Authorization: `Bearer ${token}`, Accept: 'text/event-stream' },
+          signal: controller.signal,
+        })
+        if (response.status === 503 || response.status === 404) {
+          onUnavailable?.()
+          return
+        }
+        if (response.status === 401) {
+          // The refresh failed too; authFetch has signalled the logout
+          return
+        }
+        if (!response.ok || !response.body) {
+          throw new Error(`Stream failed with ${response.status}`)
+        }
+
+        if (connectedBefore) {
+          onEvent({ type: 'resync' })
+        }
+        connectedBefore = true
+        retryMs = MIN_RETRY_MS
+
+        const reader = response.body.getReader()
+        const decoder = new TextDecoder()
+        let buffer = ''
+        for (;;) {
+          const { done, value } = await reader.read()
+          if (done) break
+          buffer += decoder.decode(value, { stream: true })
+          const blocks = buffer.split('\n\n')
+          buffer = blocks.pop() ?? ''
+          for (const block of blocks) {
+            const event = parseEvent(block)
+            if (event?.type === 'expired') {
+              expired = true
+            } else if (event) {
+              onEvent(event)
+            }
+          }
+        }
+      } catch (error) {
+        if (controller.signal.aborted || error instanceof ForbiddenError) return
+      }
+      if (expired) {
+        // Reconnect now; authFetch refreshes the token on the 401
+        token = window.localStorage.getItem(TOKEN_KEY) ?? token
+        continue
+      }
+      await new Promise((resolve) => setTimeout(resolve, retryMs))
+      retryMs = Math.min(retryMs * 2, MAX_RETRY_MS)
+    }
+  }
+
+  void run()
+  return () => controller.abort()
+}
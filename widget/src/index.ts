@@ -880,6 +880,7 @@ async function postIntent(
     slider_value: number;
     delta_pct_from_standard: number;
     selected_speed_kn: number | null;
+    intent_id?: string;
   }
 ): Promise<ChoiceIntentResponse> {
   const response = await fetch(`${baseUrl}/api/v1/public/choice-intents/`, {
@@ -1292,6 +1293,8 @@ async function mountWidget(options: NormalizedOptions): Promise<InitResult> {
           selected_speed_kn: Number.isFinite(currentMetrics.speed)
             ? Number(currentMetrics.speed.toFixed(2))
             : null,
+          // Lets the API update this session's intent instead of adding a row
+          intent_id: intentState.latestIntent?.intent_id,
         });
         if (destroyed) {
           return;